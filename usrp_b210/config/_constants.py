@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ISAC配置共用常數
+B210ISACConfig與HardwareVerifiedConfig共用的唯讀陣列
+作者: TMYTEK ISAC Lab
+"""
+
+import numpy as np
+
+# === Beam掃描角度 (±45度，10度間隔) ===
+SCAN_ANGLES_DEG = np.arange(-45, 46, 10, dtype=np.float32)
+SCAN_ANGLES_RAD = np.deg2rad(SCAN_ANGLES_DEG)
+
+# === CFAR視窗 ===
+CFAR_GUARD = np.array([2, 2], dtype=np.int32)       # CFAR保護區域
+CFAR_TRAINING = np.array([8, 8], dtype=np.int32)    # CFAR訓練區域
+
+# 共用陣列設為唯讀，避免任一實例意外修改
+for _array in (SCAN_ANGLES_DEG, SCAN_ANGLES_RAD, CFAR_GUARD, CFAR_TRAINING):
+    _array.setflags(write=False)
@@ -7,18 +7,231 @@ USRP B210 ISAC系統配置檔案
 作者: TMYTEK ISAC Lab
 """
 
+import json
+import functools
 import numpy as np
 import os
+import platform
+import socket
+import sys
+from dataclasses import dataclass, asdict
 from pathlib import Path
 
+from _constants import SCAN_ANGLES_DEG, SCAN_ANGLES_RAD, CFAR_GUARD, CFAR_TRAINING
+
+# 優先使用orjson (C實作，原生支援numpy)，否則退回標準json
+try:
+    import orjson
+    
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_default(obj):
+        if isinstance(obj, (np.ndarray, np.generic)):
+            return obj.tolist()
+        raise TypeError(f"無法序列化的型別: {type(obj).__name__}")
+    
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False,
+                          default=_json_default).encode('utf-8')
+    
+    _json_loads = json.loads
+
+# 建議的核心socket緩衝設定 (sysctl)
+KERNEL_BUFFER_SYSCTL = (
+    "net.core.rmem_default=26214400",
+    "net.core.rmem_max=104857600",
+    "net.core.wmem_default=26214400",
+    "net.core.wmem_max=104857600",
+)
+_kernel_buffer_warned = False
+
+# 平台名稱 (整個行程只查詢一次)
+_SYSTEM = platform.system().lower()
+
+def _use_unicode_icons():
+    """是否輸出emoji圖示 (ISAC_LOG_UNICODE=0 或非UTF-8終端時使用ASCII)"""
+    encoding = getattr(sys.stdout, 'encoding', None) or ''
+    return os.getenv("ISAC_LOG_UNICODE", "1") == "1" and 'utf' in encoding.lower()
+
+# 輸出圖示 (cp1252等終端編碼emoji很慢，改用ASCII)
+if _use_unicode_icons():
+    ICONS = {'ok': '✅', 'warn': '⚠️ ', 'err': '❌', 'tool': '🔧', 'device': '📱',
+             'spec': '⚙️ ', 'target': '🎯'}
+else:
+    ICONS = {'ok': '[OK]', 'warn': '[WARN]', 'err': '[ERR]', 'tool': '[*]', 'device': '[*]',
+             'spec': '[*]', 'target': '[*]'}
+
+# 常用FFT長度的Hanning窗查找表 (float32)
+HANN_WINDOW_LOOKUP_TABLE = {
+    n: np.hanning(n).astype(np.float32) for n in (256, 512, 1024, 2048, 4096)
+}
+for _window in HANN_WINDOW_LOOKUP_TABLE.values():
+    _window.setflags(write=False)
+
+def _next_fast_len(n):
+    """取得>=n且適合FFT的長度 (只含2、3、5質因數)"""
+    def is_5_smooth(m):
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        return m == 1
+    
+    while not is_5_smooth(n):
+        n += 1
+    return n
+
+# 各(長度, 複數dtype)的FFT函式快取 (計畫只建立一次)
+_FFT_PLANS = {}
+
+def _make_fft_plan(n, dtype):
+    """建立長度為n、精度為dtype的FFT函式 (pyfftw計畫 > scipy.fft多執行緒 > numpy)"""
+    # 延遲匯入：scipy.fft/pyfftw匯入成本高，只在第一次需要FFT時載入
+    try:
+        import scipy.fft
+        fallback = functools.partial(scipy.fft.fft, n=n, workers=-1)
+    except ImportError:
+        fallback = functools.partial(np.fft.fft, n=n)
+    try:
+        import pyfftw.builders
+    except ImportError:
+        return fallback
+    plan = pyfftw.builders.fft(pyfftw.empty_aligned(n, dtype=dtype),
+                               threads=os.cpu_count() or 1)
+    
+    def fft(x):
+        # pyfftw計畫只接受長度n的一維輸入，且會轉成計畫的dtype；
+        # 其他形狀或精度交給fallback，維持與scipy/numpy相同的n=語意 (補零/截斷)
+        x = np.asarray(x)
+        if x.shape == (n,) and np.result_type(x.dtype, np.complex64) == dtype:
+            return plan(x)
+        return fallback(x)
+    return fft
+
+class _ParamsView:
+    """參數物件的dict風格存取 (向後兼容)"""
+    __slots__ = ()
+    
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def to_dict(self):
+        """轉換為dict (供JSON序列化)"""
+        return asdict(self)
+
+@dataclass(frozen=True, slots=True)
+class ChirpParams(_ParamsView):
+    """Chirp信號參數"""
+    duration: float
+    bandwidth: float
+    sample_rate: float
+    start_freq: float
+    stop_freq: float
+    samples: int
+    fft_samples: int
+
+@dataclass(frozen=True, slots=True)
+class CFARParams(_ParamsView):
+    """CFAR參數"""
+    guard: np.ndarray
+    training: np.ndarray
+    pfa: float
+
+@dataclass(frozen=True, slots=True)
+class RadarParams(_ParamsView):
+    """雷達參數"""
+    range_resolution: float
+    max_range: float
+    range_bins: int
+    doppler_bins: int
+    cfar_params: CFARParams
+
+@dataclass(frozen=True, slots=True)
+class BeamParams(_ParamsView):
+    """Beam forming參數"""
+    scan_enabled: bool
+    scan_angles: np.ndarray
+    dwell_time: float
+    total_scan_time: float
+
+@dataclass(frozen=True, slots=True)
+class USRPParams(_ParamsView):
+    """USRP參數"""
+    device_args: str
+    sample_rate: float
+    center_freq: float
+    tx_gain: float
+    rx_gain: float
+    tx_antenna: str
+    rx_antenna: str
+    platform_args: dict
+
+@dataclass(frozen=True, slots=True)
+class CommunicationParams(_ParamsView):
+    """通訊參數"""
+    modulation: str
+    data_rate: float
+    frame_size: int
+    error_correction: bool
+    bandwidth_efficiency: float
+
 class B210ISACConfig:
     """USRP B210 ISAC系統配置類別"""
     
+    # 已建立過目錄的base_path (避免重複的檔案系統呼叫)
+    _dirs_created = set()
+    
+    __slots__ = (
+        # 硬體參數與限制
+        'device_args', 'sample_rate', 'center_freq_if', 'center_freq_rf',
+        'max_sample_rate', 'practical_sample_rate', 'max_bandwidth',
+        'max_tx_power', 'max_rx_gain', 'max_tx_gain', 'safe_tx_gain', 'safe_rx_gain',
+        # UHD傳輸參數
+        'num_recv_frames', 'recv_frame_size', 'num_send_frames',
+        'send_frame_size', 'wire_bytes_per_sample', 'socket_rmem', 'socket_wmem',
+        # ISAC / 工作模式
+        'chirp_duration', 'chirp_bandwidth', 'range_resolution',
+        'mode', 'radar_duty_cycle', 'comm_duty_cycle',
+        # Beam Forming
+        'beam_scan_enabled', 'scan_angles', 'scan_angles_rad', 'beam_dwell_time',
+        # 信號處理 / 雷達 / 通訊
+        'fft_size', 'overlap_factor', 'window_type',
+        'range_bins', 'doppler_bins', 'cfar_guard', 'cfar_training', 'cfar_pfa',
+        'modulation', 'data_rate', 'error_correction', 'frame_size',
+        # 衍生參數
+        'chirp_samples', 'chirp_samples_fft', 'max_range', 'total_scan_time', 'bandwidth_efficiency',
+        # 路徑與平台
+        'base_path', 'log_path', 'data_path', 'temp_path', 'platform', 'uhd_args',
+        # 快取
+        '_validation', '_chirp_lut', '_hann_lut', '_chirp_params', '_radar_params',
+        '_beam_params', '_usrp_params', '_communication_params', '_ready',
+    )
+    
+    # 由基本參數推導的欄位 (設定這些欄位不會觸發重算)
+    _DERIVED_FIELDS = frozenset((
+        'safe_tx_gain', 'safe_rx_gain', 'range_resolution',
+        'chirp_samples', 'chirp_samples_fft', 'max_range', 'total_scan_time', 'bandwidth_efficiency',
+        '_validation', '_chirp_lut', '_hann_lut', '_chirp_params', '_radar_params',
+        '_beam_params', '_usrp_params', '_communication_params', '_ready',
+    ))
+    
+    # 影響UHD device_args的欄位
+    _TRANSPORT_FIELDS = frozenset((
+        'device_args', 'num_recv_frames', 'recv_frame_size', 'num_send_frames',
+        'send_frame_size', 'socket_rmem', 'socket_wmem',
+    ))
+    
     def __init__(self):
         # === 基本硬體參數 ===
         self.device_args = "type=b200"
-        self.sample_rate = 30e6         # 30 Msps (B210最佳性能)
-        self.center_freq_if = 2e9       # 2 GHz IF頻率
+        # 數值參數使用numpy純量，DSP運算時dtype一致不被意外提升
+        self.sample_rate = np.float64(30e6)     # 30 Msps (B210最佳性能)
+        self.center_freq_if = np.float64(2e9)   # 2 GHz IF頻率
         self.center_freq_rf = 28e9      # 28 GHz RF頻率 (透過up/down converter)
         
         # === B210硬體限制 ===
@@ -29,10 +242,18 @@ class B210ISACConfig:
         self.max_rx_gain = 76           # dB
         self.max_tx_gain = 89.8         # dB
         
+        # === UHD傳輸參數 (USB串流，由UHD從device_args解析) ===
+        self.num_recv_frames = 1900     # 接收幀數 (30 Msps無overflow)
+        self.recv_frame_size = 11000    # 接收幀大小 (bytes)
+        self.num_send_frames = 1900     # 發送幀數
+        self.send_frame_size = 11000    # 發送幀大小 (bytes)
+        self.wire_bytes_per_sample = 4  # sc16線上格式
+        self.socket_rmem = 33554432     # SO_RCVBUF (32 MB)
+        self.socket_wmem = 33554432     # SO_SNDBUF (32 MB)
+        
         # === ISAC系統參數 ===
-        self.chirp_duration = 100e-6    # 100μs Chirp持續時間
-        self.chirp_bandwidth = 20e6     # 20 MHz頻寬
-        self.range_resolution = 3e8 / (2 * self.chirp_bandwidth)  # 7.5米
+        self.chirp_duration = np.float64(100e-6)  # 100μs Chirp持續時間
+        self.chirp_bandwidth = np.float64(20e6)   # 20 MHz頻寬
         
         # === 工作模式配置 ===
         self.mode = "hybrid"            # radar, communication, hybrid
@@ -41,7 +262,8 @@ class B210ISACConfig:
         
         # === Beam Forming參數 ===
         self.beam_scan_enabled = True
-        self.scan_angles = list(range(-45, 46, 10))  # ±45度，10度間隔
+        self.scan_angles = SCAN_ANGLES_DEG          # ±45度，10度間隔 (共用唯讀)
+        self.scan_angles_rad = SCAN_ANGLES_RAD      # 導向向量使用弧度
         self.beam_dwell_time = 100e-3   # 100ms每個beam
         
         # === 信號處理參數 ===
@@ -52,8 +274,8 @@ class B210ISACConfig:
         # === 雷達參數 ===
         self.range_bins = 512           # 距離bins (減少以適應B210)
         self.doppler_bins = 64          # 都卜勒bins
-        self.cfar_guard = [2, 2]        # CFAR保護區域
-        self.cfar_training = [8, 8]     # CFAR訓練區域
+        self.cfar_guard = CFAR_GUARD    # CFAR保護區域
+        self.cfar_training = CFAR_TRAINING  # CFAR訓練區域
         self.cfar_pfa = 1e-3            # 虛警機率
         
         # === 通訊參數 ===
@@ -75,93 +297,250 @@ class B210ISACConfig:
         self.platform = self._detect_platform()
         self.uhd_args = self._get_platform_specific_args()
         
+        # === 衍生參數與快取 (之後修改基本參數時自動更新) ===
+        self._invalidate()
+        self._ready = True
+    
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        # 修改基本參數後重算衍生參數，並清除依賴它的快取
+        if name not in self._DERIVED_FIELDS and getattr(self, '_ready', False):
+            if name in self._TRANSPORT_FIELDS:
+                self.uhd_args = self._get_platform_specific_args()
+            else:
+                self._invalidate()
+    
+    def _invalidate(self):
+        """重算衍生參數並清除快取 (波形、參數物件與驗證結果在下次取用時重建)"""
+        self._compute_derived()
+        self._hann_lut = self.get_hann_window(self.fft_size)
+        self._chirp_lut = None
+        self._chirp_params = None
+        self._validation = None
+        
     def _detect_platform(self):
         """偵測運行平台"""
-        import platform
-        return platform.system().lower()
+        return _SYSTEM
+    
+    def _get_transport_args(self):
+        """組合含傳輸參數的UHD device_args字串 (socket緩衝以recv/send_buff_size傳給UHD)"""
+        return (f"{self.device_args},"
+                f"num_recv_frames={self.num_recv_frames},"
+                f"recv_frame_size={self.recv_frame_size},"
+                f"num_send_frames={self.num_send_frames},"
+                f"send_frame_size={self.send_frame_size},"
+                f"recv_buff_size={self.socket_rmem},"
+                f"send_buff_size={self.socket_wmem}")
     
     def _get_platform_specific_args(self):
         """取得平台特定的UHD參數"""
         if self.platform == "linux":
             return {
-                "device_args": self.device_args,
+                "device_args": self._get_transport_args(),
                 "threading": "thread_priority_high",
-                "buffer_size": 16384,
-                "num_recv_frames": 32,
-                "num_send_frames": 32
+                "buffer_size": 16384
             }
         else:  # Windows
             return {
-                "device_args": self.device_args,
-                "buffer_size": 8192,
-                "num_recv_frames": 16,
-                "num_send_frames": 16
+                "device_args": self._get_transport_args(),
+                "buffer_size": 8192
             }
     
+    def tune_kernel_buffers(self, sock=None):
+        """
+        設定socket收發緩衝並檢查核心上限
+        
+        Parameters:
+        -----------
+        sock : socket.socket
+            串流使用的socket (可選)，有提供時套用SO_RCVBUF/SO_SNDBUF
+            
+        Returns:
+        --------
+        bool : 核心緩衝上限是否足夠
+        """
+        global _kernel_buffer_warned
+        
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.socket_rmem)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.socket_wmem)
+        
+        if self.platform != "linux":
+            return True
+        
+        try:
+            with open("/proc/sys/net/core/rmem_max") as f:
+                rmem_max = int(f.read())
+            with open("/proc/sys/net/core/wmem_max") as f:
+                wmem_max = int(f.read())
+        except (OSError, ValueError):
+            return True
+        
+        sufficient = rmem_max >= self.socket_rmem and wmem_max >= self.socket_wmem
+        if not sufficient and not _kernel_buffer_warned:
+            _kernel_buffer_warned = True
+            print(f"{ICONS['warn']} 核心socket緩衝不足 (rmem_max={rmem_max}, wmem_max={wmem_max})，建議設定:")
+            for line in KERNEL_BUFFER_SYSCTL:
+                print(f"  sudo sysctl -w {line}")
+        
+        return sufficient
+    
+    def _build_chirp_lut(self):
+        """產生基頻上行Chirp查找表 (complex64)"""
+        t = np.arange(self.chirp_samples, dtype=np.float64) / self.sample_rate
+        k = self.chirp_bandwidth / self.chirp_duration
+        lut = np.exp(1j * np.pi * k * t * t).astype(np.complex64)
+        lut.setflags(write=False)
+        return lut
+    
+    def get_chirp_waveform(self):
+        """取得預先計算的Chirp波形 (共用唯讀陣列)"""
+        if self._chirp_lut is None:
+            self._chirp_lut = self._build_chirp_lut()
+        return self._chirp_lut
+    
+    @staticmethod
+    def get_hann_window(n):
+        """取得長度為n的Hanning窗，優先使用查找表"""
+        window = HANN_WINDOW_LOOKUP_TABLE.get(n)
+        if window is None:
+            window = np.hanning(n).astype(np.float32)
+            window.setflags(write=False)
+            HANN_WINDOW_LOOKUP_TABLE[n] = window
+        return window
+    
+    def prepare_fft_plans(self, dtype=np.complex64):
+        """預先建立常用長度的FFT計畫 (串流開始前呼叫，避免第一幀的規劃延遲)"""
+        for n in {self.fft_size, self.chirp_samples_fft, self.range_bins, self.doppler_bins}:
+            self.get_fft(n, dtype)
+    
+    @staticmethod
+    def get_fft(size, dtype=np.complex64):
+        """
+        取得長度為size、輸入精度為dtype的FFT函式 (快取的計畫)
+        
+        實數dtype對應同精度的複數計畫 (float64 -> complex128)，不會降低精度；
+        使用pyfftw時回傳的是內部輸出緩衝，需保留結果請自行複製
+        """
+        key = (size, np.result_type(dtype, np.complex64))
+        plan = _FFT_PLANS.get(key)
+        if plan is None:
+            plan = _FFT_PLANS[key] = _make_fft_plan(*key)
+        return plan
+    
     def _create_directories(self):
         """建立必要的目錄"""
-        for path in [self.log_path, self.data_path, self.temp_path]:
-            path.mkdir(parents=True, exist_ok=True)
+        if self.base_path in self._dirs_created:
+            return
+        for path in (self.log_path, self.data_path, self.temp_path):
+            if not os.path.isdir(path):
+                os.makedirs(path, exist_ok=True)
+        self._dirs_created.add(self.base_path)
+    
+    def _compute_derived(self):
+        """計算衍生參數"""
+        self.safe_tx_gain = min(20.0, self.max_tx_gain)  # 安全增益值 (不超過硬體上限)
+        self.safe_rx_gain = min(20.0, self.max_rx_gain)
+        self.range_resolution = 3e8 / (2 * self.chirp_bandwidth)  # 20 MHz時為7.5米
+        self.chirp_samples = int(round(self.chirp_duration * self.sample_rate))
+        self.chirp_samples_fft = _next_fast_len(self.chirp_samples)  # FFT友善長度
+        self.max_range = self.range_resolution * self.range_bins
+        self.total_scan_time = len(self.scan_angles) * self.beam_dwell_time
+        self.bandwidth_efficiency = self.data_rate / self.chirp_bandwidth
+    
+    def _build_params(self):
+        """建立快取的參數物件"""
+        self._chirp_params = ChirpParams(
+            duration=self.chirp_duration,
+            bandwidth=self.chirp_bandwidth,
+            sample_rate=self.sample_rate,
+            start_freq=0,  # 相對於載波
+            stop_freq=self.chirp_bandwidth,
+            samples=self.chirp_samples,
+            fft_samples=self.chirp_samples_fft
+        )
+        self._radar_params = RadarParams(
+            range_resolution=self.range_resolution,
+            max_range=self.max_range,
+            range_bins=self.range_bins,
+            doppler_bins=self.doppler_bins,
+            cfar_params=CFARParams(
+                guard=self.cfar_guard,
+                training=self.cfar_training,
+                pfa=self.cfar_pfa
+            )
+        )
+        self._beam_params = BeamParams(
+            scan_enabled=self.beam_scan_enabled,
+            scan_angles=self.scan_angles,
+            dwell_time=self.beam_dwell_time,
+            total_scan_time=self.total_scan_time
+        )
+        self._usrp_params = USRPParams(
+            device_args=self.uhd_args['device_args'],
+            sample_rate=self.sample_rate,
+            center_freq=self.center_freq_if,
+            tx_gain=self.safe_tx_gain,
+            rx_gain=self.safe_rx_gain,
+            tx_antenna="TX/RX",
+            rx_antenna="RX2",
+            platform_args=self.uhd_args
+        )
+        self._communication_params = CommunicationParams(
+            modulation=self.modulation,
+            data_rate=self.data_rate,
+            frame_size=self.frame_size,
+            error_correction=self.error_correction,
+            bandwidth_efficiency=self.bandwidth_efficiency
+        )
+    
+    def _ensure_params(self):
+        """參數物件在參數變更後第一次取用時重建"""
+        if self._chirp_params is None:
+            self._build_params()
     
     def get_chirp_params(self):
         """取得Chirp信號參數"""
-        return {
-            'duration': self.chirp_duration,
-            'bandwidth': self.chirp_bandwidth,
-            'sample_rate': self.sample_rate,
-            'start_freq': 0,  # 相對於載波
-            'stop_freq': self.chirp_bandwidth,
-            'samples': int(self.chirp_duration * self.sample_rate)
-        }
+        self._ensure_params()
+        return self._chirp_params
     
     def get_radar_params(self):
         """取得雷達參數"""
-        return {
-            'range_resolution': self.range_resolution,
-            'max_range': self.range_resolution * self.range_bins,
-            'range_bins': self.range_bins,
-            'doppler_bins': self.doppler_bins,
-            'cfar_params': {
-                'guard': self.cfar_guard,
-                'training': self.cfar_training,
-                'pfa': self.cfar_pfa
-            }
-        }
+        self._ensure_params()
+        return self._radar_params
     
     def get_beam_params(self):
         """取得beam forming參數"""
-        return {
-            'scan_enabled': self.beam_scan_enabled,
-            'scan_angles': self.scan_angles,
-            'dwell_time': self.beam_dwell_time,
-            'total_scan_time': len(self.scan_angles) * self.beam_dwell_time
-        }
+        self._ensure_params()
+        return self._beam_params
     
     def get_usrp_params(self):
         """取得USRP參數"""
-        return {
-            'device_args': self.device_args,
-            'sample_rate': self.sample_rate,
-            'center_freq': self.center_freq_if,
-            'tx_gain': min(20.0, self.max_tx_gain),  # 安全增益值
-            'rx_gain': min(20.0, self.max_rx_gain),
-            'tx_antenna': "TX/RX",
-            'rx_antenna': "RX2",
-            'platform_args': self.uhd_args
-        }
+        self._ensure_params()
+        return self._usrp_params
+    
+    def get_usrp_params_mutable(self):
+        """取得可修改的USRP參數副本 (dict)"""
+        return self.get_usrp_params().to_dict()
     
     def get_communication_params(self):
         """取得通訊參數"""
-        return {
-            'modulation': self.modulation,
-            'data_rate': self.data_rate,
-            'frame_size': self.frame_size,
-            'error_correction': self.error_correction,
-            'bandwidth_efficiency': self.data_rate / self.chirp_bandwidth
-        }
+        self._ensure_params()
+        return self._communication_params
+    
+    @property
+    def validation(self):
+        """驗證結果 (參數不變時快取)"""
+        if self._validation is None:
+            self._validation = self._run_validation()
+        return self._validation
     
     def validate_config(self):
         """驗證配置參數合理性"""
+        return self.validation
+    
+    def _run_validation(self):
+        """執行配置驗證"""
         errors = []
         warnings = []
         
@@ -173,16 +552,26 @@ class B210ISACConfig:
         if self.chirp_bandwidth > self.max_bandwidth:
             errors.append(f"Chirp頻寬 {self.chirp_bandwidth/1e6:.1f} MHz 超過B210最大值 {self.max_bandwidth/1e6:.1f} MHz")
         
+        # 檢查UHD接收緩衝 (至少能緩衝10ms的串流)
+        recv_buffer_time = (self.num_recv_frames * self.recv_frame_size /
+                            (self.sample_rate * self.wire_bytes_per_sample))
+        if recv_buffer_time < 10e-3:
+            warnings.append(f"UHD接收緩衝僅 {recv_buffer_time*1e3:.1f} ms，高取樣率下可能overflow")
+        
         # 檢查Chirp參數
-        if self.chirp_duration * self.sample_rate < 10:
+        if self.chirp_samples < 10:
             warnings.append("Chirp持續時間過短，可能影響信號品質")
         
+        # 檢查FFT長度 (質數或大質因數長度的FFT很慢)
+        if self.chirp_samples_fft != self.chirp_samples:
+            warnings.append(f"Chirp樣本數 {self.chirp_samples} 不利FFT，建議補零至 {self.chirp_samples_fft}")
+        
         # 檢查距離解析度
         if self.range_resolution > 10:
             warnings.append(f"距離解析度 {self.range_resolution:.1f}米 較粗糙，可能影響雷達性能")
         
         # 檢查beam參數
-        if len(self.scan_angles) * self.beam_dwell_time > 5:
+        if self.total_scan_time > 5:
             warnings.append("Beam掃描時間過長，可能影響即時性")
         
         return {
@@ -196,103 +585,117 @@ class B210ISACConfig:
         if filename is None:
             filename = self.base_path / "config" / "current_config.json"
         
-        import json
-        config_dict = {
+        with open(filename, 'wb') as f:
+            f.write(_json_dumps(self._build_config_dict()))
+        
+        return filename
+    
+    def _build_config_dict(self):
+        """組合要儲存的配置內容"""
+        return {
             'hardware': {
                 'device_args': self.device_args,
                 'sample_rate': self.sample_rate,
                 'center_freq_if': self.center_freq_if,
                 'center_freq_rf': self.center_freq_rf
             },
-            'chirp': self.get_chirp_params(),
-            'radar': self.get_radar_params(),
-            'beam': self.get_beam_params(),
-            'usrp': self.get_usrp_params(),
-            'communication': self.get_communication_params(),
+            'chirp': self.get_chirp_params().to_dict(),
+            'radar': self.get_radar_params().to_dict(),
+            'beam': self.get_beam_params().to_dict(),
+            'usrp': self.get_usrp_params().to_dict(),
+            'communication': self.get_communication_params().to_dict(),
             'platform': self.platform
         }
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(config_dict, f, indent=2, ensure_ascii=False)
-        
-        return filename
     
     def load_config(self, filename):
         """從檔案載入配置"""
-        import json
-        
-        with open(filename, 'r', encoding='utf-8') as f:
-            config_dict = json.load(f)
+        with open(filename, 'rb') as f:
+            config_dict = _json_loads(f.read())
         
         # 更新參數
         if 'hardware' in config_dict:
             hw = config_dict['hardware']
-            self.sample_rate = hw.get('sample_rate', self.sample_rate)
-            self.center_freq_if = hw.get('center_freq_if', self.center_freq_if)
+            self.sample_rate = np.float64(hw.get('sample_rate', self.sample_rate))
+            self.center_freq_if = np.float64(hw.get('center_freq_if', self.center_freq_if))
             
-        # 可以根據需要添加更多載入邏輯
+        # 可以根據需要添加更多載入邏輯 (設定參數時會自動更新衍生參數與快取)
         
         return True
     
     def print_summary(self):
         """印出配置摘要"""
-        print("=" * 60)
-        print("USRP B210 ISAC系統配置摘要")
-        print("=" * 60)
-        
-        print(f"平台: {self.platform.upper()}")
-        print(f"設備: {self.device_args}")
-        print(f"取樣率: {self.sample_rate/1e6:.1f} Msps")
-        print(f"IF頻率: {self.center_freq_if/1e9:.1f} GHz")
-        print(f"RF頻率: {self.center_freq_rf/1e9:.1f} GHz")
-        
-        print(f"\nChirp參數:")
+        lines = []
+        lines.append("=" * 60)
+        lines.append("USRP B210 ISAC系統配置摘要")
+        lines.append("=" * 60)
+        
+        lines.append(f"平台: {self.platform.upper()}")
+        lines.append(f"設備: {self.device_args}")
+        lines.append(f"取樣率: {self.sample_rate/1e6:.1f} Msps")
+        lines.append(f"IF頻率: {self.center_freq_if/1e9:.1f} GHz")
+        lines.append(f"RF頻率: {self.center_freq_rf/1e9:.1f} GHz")
+        
+        lines.append(f"\nChirp參數:")
         chirp = self.get_chirp_params()
-        print(f"  持續時間: {chirp['duration']*1e6:.1f} μs")
-        print(f"  頻寬: {chirp['bandwidth']/1e6:.1f} MHz")
-        print(f"  樣本數: {chirp['samples']}")
+        lines.append(f"  持續時間: {chirp['duration']*1e6:.1f} μs")
+        lines.append(f"  頻寬: {chirp['bandwidth']/1e6:.1f} MHz")
+        lines.append(f"  樣本數: {chirp['samples']}")
         
-        print(f"\n雷達參數:")
+        lines.append(f"\n雷達參數:")
         radar = self.get_radar_params()
-        print(f"  距離解析度: {radar['range_resolution']:.1f} 米")
-        print(f"  最大距離: {radar['max_range']:.1f} 米")
-        print(f"  距離bins: {radar['range_bins']}")
+        lines.append(f"  距離解析度: {radar['range_resolution']:.1f} 米")
+        lines.append(f"  最大距離: {radar['max_range']:.1f} 米")
+        lines.append(f"  距離bins: {radar['range_bins']}")
         
-        print(f"\nBeam參數:")
+        lines.append(f"\nBeam參數:")
         beam = self.get_beam_params()
-        print(f"  掃描範圍: {min(beam['scan_angles'])}° ~ {max(beam['scan_angles'])}°")
-        print(f"  掃描點數: {len(beam['scan_angles'])}")
-        print(f"  總掃描時間: {beam['total_scan_time']*1000:.1f} ms")
+        lines.append(f"  掃描範圍: {beam['scan_angles'].min():.0f}° ~ {beam['scan_angles'].max():.0f}°")
+        lines.append(f"  掃描點數: {len(beam['scan_angles'])}")
+        lines.append(f"  總掃描時間: {beam['total_scan_time']*1000:.1f} ms")
         
-        print(f"\n通訊參數:")
+        lines.append(f"\n通訊參數:")
         comm = self.get_communication_params()
-        print(f"  調變方式: {comm['modulation']}")
-        print(f"  資料率: {comm['data_rate']/1e3:.1f} kbps")
-        print(f"  頻譜效率: {comm['bandwidth_efficiency']*1e3:.3f} bps/Hz")
+        lines.append(f"  調變方式: {comm['modulation']}")
+        lines.append(f"  資料率: {comm['data_rate']/1e3:.1f} kbps")
+        lines.append(f"  頻譜效率: {comm['bandwidth_efficiency']*1e3:.3f} bps/Hz")
         
         # 驗證結果
         validation = self.validate_config()
         if validation['errors']:
-            print(f"\n❌ 配置錯誤:")
+            lines.append(f"\n{ICONS['err']} 配置錯誤:")
             for error in validation['errors']:
-                print(f"  - {error}")
+                lines.append(f"  - {error}")
         
         if validation['warnings']:
-            print(f"\n⚠️  配置警告:")
+            lines.append(f"\n{ICONS['warn']} 配置警告:")
             for warning in validation['warnings']:
-                print(f"  - {warning}")
+                lines.append(f"  - {warning}")
         
         if validation['valid'] and not validation['warnings']:
-            print(f"\n✅ 配置驗證通過")
+            lines.append(f"\n{ICONS['ok']} 配置驗證通過")
         
-        print("=" * 60)
+        lines.append("=" * 60)
+        
+        sys.stdout.write("\n".join(lines) + "\n")
 
 # 建立全域配置實例
-CONFIG = B210ISACConfig()
+# 共用配置實例 (首次以shared=True取用時才建立，import時不建立配置)
+_SHARED_CONFIG = None
+
+def get_config(shared=False):
+    """取得配置實例 (預設回傳新實例；shared=True取得全域共用實例)"""
+    global _SHARED_CONFIG
+    if not shared:
+        return B210ISACConfig()
+    if _SHARED_CONFIG is None:
+        _SHARED_CONFIG = B210ISACConfig()
+    return _SHARED_CONFIG
 
-def get_config():
-    """取得配置實例"""
-    return CONFIG
+def __getattr__(name):
+    """相容舊的模組屬性CONFIG (即共用實例)"""
+    if name == 'CONFIG':
+        return get_config(shared=True)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     # 測試配置
@@ -6,14 +6,23 @@ USRP B210 ISAC系統 - 硬體驗證配置檔案
 作者: TMYTEK ISAC Lab
 """
 
-import numpy as np
-import os
-from pathlib import Path
+import sys
+from types import MappingProxyType
 
-class HardwareVerifiedConfig:
-    """基於硬體驗證的USRP B210 ISAC配置類別"""
+from b210_config import B210ISACConfig, ICONS
+
+class HardwareVerifiedConfig(B210ISACConfig):
+    """基於硬體驗證的USRP B210 ISAC配置類別
+    
+    系統參數沿用B210ISACConfig (單一來源)，此處只加入硬體驗證資訊，
+    並以唯讀dict視圖提供分組參數 (修改請設定對應的配置屬性，例如 config.range_bins)。
+    """
+    
+    __slots__ = ('device_info', 'hardware_specs', 'gnuradio_paths')
     
     def __init__(self):
+        super().__init__()
+        
         # === 硬體驗證參數 (基於實際測試) ===
         self.device_info = {
             'type': 'b200',
@@ -27,129 +36,108 @@ class HardwareVerifiedConfig:
         # === 硬體規格 (已驗證) ===
         self.hardware_specs = {
             'frequency_range': (50e6, 6e9),      # 50 MHz - 6 GHz
-            'max_sample_rate': 56e6,             # 56 Msps (理論最大值)
-            'verified_sample_rate': 30e6,        # 30 Msps (已驗證穩定)
-            'max_bandwidth': 20e6,               # 20 MHz (實際可用)
-            'tx_gain_range': (0.0, 89.8),       # TX增益範圍 (步長0.2 dB)
-            'rx_gain_range': (0.0, 76.0),       # RX增益範圍 (步長1.0 dB)
+            'max_sample_rate': self.max_sample_rate,          # 56 Msps (理論最大值)
+            'verified_sample_rate': self.practical_sample_rate,  # 30 Msps (已驗證穩定)
+            'max_bandwidth': self.max_bandwidth,  # 20 MHz (實際可用)
+            'tx_gain_range': (0.0, self.max_tx_gain),         # TX增益範圍 (步長0.2 dB)
+            'rx_gain_range': (0.0, float(self.max_rx_gain)),  # RX增益範圍 (步長1.0 dB)
             'usb_version': 'USB 3.0',
             'operating_mode': 'SuperSpeed'
         }
         
-        # === 當前工作配置 (已驗證) ===
-        self.current_config = {
-            'sample_rate': 30e6,                 # 30 Msps (已驗證)
-            'center_freq_if': 2e9,               # 2 GHz IF頻率
-            'center_freq_rf': 28e9,              # 28 GHz RF頻率 (目標)
-            'tx_gain': 20.0,                     # TX增益 (已驗證)
-            'rx_gain': 20.0,                     # RX增益 (已驗證)
-            'tx_antenna': 'TX/RX',               # TX天線 (已驗證)
-            'rx_antenna': 'RX2'                  # RX天線 (已驗證)
-        }
-        
-        # === ISAC系統參數 (基於硬體能力) ===
-        self.isac_params = {
-            'chirp_duration': 100e-6,            # 100μs Chirp持續時間
-            'chirp_bandwidth': 20e6,             # 20 MHz頻寬
-            'range_resolution': 7.5,              # 7.5米距離解析度
-            'mode': 'hybrid',                     # 混合模式
-            'radar_duty_cycle': 0.7,             # 雷達70%
-            'comm_duty_cycle': 0.3               # 通訊30%
-        }
-        
-        # === 向後兼容性屬性 ===
-        # 為了與現有腳本兼容，添加這些屬性
-        self.chirp_duration = self.isac_params['chirp_duration']
-        self.chirp_bandwidth = self.isac_params['chirp_bandwidth']
-        self.sample_rate = self.current_config['sample_rate']
-        
-        # === 雷達參數 (已驗證) ===
-        self.radar_params = {
-            'range_bins': 512,                   # 距離bins
-            'doppler_bins': 64,                  # 都卜勒bins
-            'cfar_guard': [2, 2],                # CFAR保護區域
-            'cfar_training': [8, 8],             # CFAR訓練區域
-            'cfar_pfa': 1e-3,                    # 虛警機率
-            'max_range': 3840.0                  # 最大檢測範圍
-        }
-        
-        # === Beam Forming參數 ===
-        self.beam_params = {
-            'scan_enabled': True,
-            'scan_angles': list(range(-45, 46, 10)),  # ±45度，10度間隔
-            'dwell_time': 100e-3,                # 100ms每個beam
-            'total_scan_time': 1.0               # 總掃描時間
-        }
-        
-        # === 通訊參數 ===
-        self.comm_params = {
-            'modulation': 'chirp_bpsk',          # Chirp調變
-            'data_rate': 200e3,                  # 200 kbps
-            'error_correction': True,            # 錯誤更正
-            'frame_size': 1024                   # 幀大小
-        }
-        
-        # === 信號處理參數 ===
-        self.signal_params = {
-            'fft_size': 1024,                    # FFT大小
-            'overlap_factor': 0.5,               # 重疊因子
-            'window_type': 'hanning',            # 窗函數
-            'buffer_size': 16384,                # 緩衝區大小 (Linux優化)
-            'num_recv_frames': 32,               # 接收幀數
-            'num_send_frames': 32                # 發送幀數
-        }
-        
-        # === 平台特定配置 ===
-        self.platform = self._detect_platform()
-        self.uhd_args = self._get_platform_specific_args()
-        
-        # === 檔案路徑配置 ===
-        self.base_path = Path(__file__).parent.parent
-        self.log_path = self.base_path / "logs"
-        self.data_path = self.base_path / "data"
-        self.temp_path = self.base_path / "temp"
-        
         # === GNU Radio路徑配置 ===
         self.gnuradio_paths = [
             "/usr/local/lib/python3.10/dist-packages",
             "/usr/lib/python3/dist-packages/gnuradio"
         ]
-        
-        # 確保目錄存在
-        self._create_directories()
     
-    def _detect_platform(self):
-        """偵測運行平台"""
-        import platform
-        return platform.system().lower()
+    # === 分組參數視圖 (由繼承的屬性組成，唯讀；寫入會拋出TypeError而非被忽略) ===
+    @property
+    def current_config(self):
+        """當前工作配置 (已驗證)"""
+        usrp = self.get_usrp_params()
+        return MappingProxyType({
+            'sample_rate': self.sample_rate,
+            'center_freq_if': self.center_freq_if,
+            'center_freq_rf': self.center_freq_rf,
+            'tx_gain': self.safe_tx_gain,
+            'rx_gain': self.safe_rx_gain,
+            'tx_antenna': usrp.tx_antenna,
+            'rx_antenna': usrp.rx_antenna
+        })
+    
+    @property
+    def isac_params(self):
+        """ISAC系統參數"""
+        return MappingProxyType({
+            'chirp_duration': self.chirp_duration,
+            'chirp_bandwidth': self.chirp_bandwidth,
+            'range_resolution': self.range_resolution,
+            'mode': self.mode,
+            'radar_duty_cycle': self.radar_duty_cycle,
+            'comm_duty_cycle': self.comm_duty_cycle
+        })
+    
+    @property
+    def radar_params(self):
+        """雷達參數"""
+        return MappingProxyType({
+            'range_bins': self.range_bins,
+            'doppler_bins': self.doppler_bins,
+            'cfar_guard': self.cfar_guard,
+            'cfar_training': self.cfar_training,
+            'cfar_pfa': self.cfar_pfa,
+            'max_range': self.max_range
+        })
+    
+    @property
+    def beam_params(self):
+        """Beam Forming參數"""
+        return MappingProxyType({
+            'scan_enabled': self.beam_scan_enabled,
+            'scan_angles': self.scan_angles,
+            'scan_angles_rad': self.scan_angles_rad,
+            'dwell_time': self.beam_dwell_time,
+            'total_scan_time': self.total_scan_time
+        })
     
-    def _get_platform_specific_args(self):
-        """取得平台特定的UHD參數"""
-        if self.platform == "linux":
-            return {
-                "device_args": f"type={self.device_info['type']}",
-                "threading": "thread_priority_high",
-                "buffer_size": self.signal_params['buffer_size'],
-                "num_recv_frames": self.signal_params['num_recv_frames'],
-                "num_send_frames": self.signal_params['num_send_frames']
-            }
-        else:  # Windows
-            return {
-                "device_args": f"type={self.device_info['type']}",
-                "buffer_size": 8192,
-                "num_recv_frames": 16,
-                "num_send_frames": 16
-            }
+    @property
+    def comm_params(self):
+        """通訊參數"""
+        return MappingProxyType({
+            'modulation': self.modulation,
+            'data_rate': self.data_rate,
+            'error_correction': self.error_correction,
+            'frame_size': self.frame_size
+        })
     
-    def _create_directories(self):
-        """創建必要的目錄"""
-        for path in [self.log_path, self.data_path, self.temp_path]:
-            path.mkdir(exist_ok=True)
+    @property
+    def signal_params(self):
+        """信號處理與串流參數"""
+        return MappingProxyType({
+            'fft_size': self.fft_size,
+            'overlap_factor': self.overlap_factor,
+            'window_type': self.window_type,
+            'buffer_size': self.uhd_args['buffer_size'],
+            'num_recv_frames': self.num_recv_frames,
+            'recv_frame_size': self.recv_frame_size,
+            'num_send_frames': self.num_send_frames,
+            'send_frame_size': self.send_frame_size,
+            'wire_bytes_per_sample': self.wire_bytes_per_sample,
+            'socket_rmem': self.socket_rmem,
+            'socket_wmem': self.socket_wmem
+        })
     
     def get_device_args(self):
         """獲取設備參數"""
         return f"type={self.device_info['type']}"
     
+    def _build_config_dict(self):
+        """組合要儲存的配置內容 (含設備資訊)"""
+        config_dict = super()._build_config_dict()
+        config_dict['hardware']['device_info'] = self.device_info
+        return config_dict
+    
     def get_verified_config(self):
         """獲取已驗證的配置"""
         return {
@@ -163,7 +151,7 @@ class HardwareVerifiedConfig:
             'platform': self.platform
         }
     
-    def validate_config(self):
+    def _run_validation(self):
         """驗證配置是否與硬體匹配"""
         validation_results = {
             'valid': True,
@@ -177,6 +165,14 @@ class HardwareVerifiedConfig:
                 f"取樣率 {self.current_config['sample_rate']/1e6:.1f} Msps 超過已驗證的穩定值"
             )
         
+        # 檢查UHD接收緩衝 (至少能緩衝10ms的串流)
+        recv_buffer_time = (self.num_recv_frames * self.recv_frame_size /
+                            (self.sample_rate * self.wire_bytes_per_sample))
+        if recv_buffer_time < 10e-3:
+            validation_results['warnings'].append(
+                f"UHD接收緩衝僅 {recv_buffer_time*1e3:.1f} ms，高取樣率下可能overflow"
+            )
+        
         # 檢查頻率
         if not (self.hardware_specs['frequency_range'][0] <= 
                 self.current_config['center_freq_if'] <= 
@@ -211,51 +207,68 @@ class HardwareVerifiedConfig:
     
     def print_summary(self):
         """印出配置摘要"""
-        print("=" * 60)
-        print("🔧 USRP B210 硬體驗證配置摘要")
-        print("=" * 60)
+        lines = []
+        lines.append("=" * 60)
+        lines.append(f"{ICONS['tool']} USRP B210 硬體驗證配置摘要")
+        lines.append("=" * 60)
         
-        print(f"📱 設備資訊:")
-        print(f"   類型: {self.device_info['type']}")
-        print(f"   名稱: {self.device_info['name']}")
-        print(f"   序列號: {self.device_info['serial']}")
-        print(f"   產品: {self.device_info['product']}")
-        print(f"   固件: v{self.device_info['firmware_version']}")
-        print(f"   FPGA: v{self.device_info['fpga_version']}")
+        lines.append(f"{ICONS['device']} 設備資訊:")
+        lines.append(f"   類型: {self.device_info['type']}")
+        lines.append(f"   名稱: {self.device_info['name']}")
+        lines.append(f"   序列號: {self.device_info['serial']}")
+        lines.append(f"   產品: {self.device_info['product']}")
+        lines.append(f"   固件: v{self.device_info['firmware_version']}")
+        lines.append(f"   FPGA: v{self.device_info['fpga_version']}")
         
-        print(f"\n⚙️  硬體規格:")
-        print(f"   頻率範圍: {self.hardware_specs['frequency_range'][0]/1e6:.0f} MHz - {self.hardware_specs['frequency_range'][1]/1e9:.1f} GHz")
-        print(f"   取樣率: {self.current_config['sample_rate']/1e6:.1f} Msps")
-        print(f"   頻寬: {self.isac_params['chirp_bandwidth']/1e6:.1f} MHz")
-        print(f"   距離解析度: {self.isac_params['range_resolution']:.1f} 米")
+        lines.append(f"\n{ICONS['spec']} 硬體規格:")
+        lines.append(f"   頻率範圍: {self.hardware_specs['frequency_range'][0]/1e6:.0f} MHz - {self.hardware_specs['frequency_range'][1]/1e9:.1f} GHz")
+        lines.append(f"   取樣率: {self.current_config['sample_rate']/1e6:.1f} Msps")
+        lines.append(f"   頻寬: {self.isac_params['chirp_bandwidth']/1e6:.1f} MHz")
+        lines.append(f"   距離解析度: {self.isac_params['range_resolution']:.1f} 米")
         
-        print(f"\n🎯 當前配置:")
-        print(f"   IF頻率: {self.current_config['center_freq_if']/1e9:.1f} GHz")
-        print(f"   RF頻率: {self.current_config['center_freq_rf']/1e9:.1f} GHz")
-        print(f"   TX增益: {self.current_config['tx_gain']:.1f} dB")
-        print(f"   RX增益: {self.current_config['rx_gain']:.1f} dB")
-        print(f"   平台: {self.platform}")
+        lines.append(f"\n{ICONS['target']} 當前配置:")
+        lines.append(f"   IF頻率: {self.current_config['center_freq_if']/1e9:.1f} GHz")
+        lines.append(f"   RF頻率: {self.current_config['center_freq_rf']/1e9:.1f} GHz")
+        lines.append(f"   TX增益: {self.current_config['tx_gain']:.1f} dB")
+        lines.append(f"   RX增益: {self.current_config['rx_gain']:.1f} dB")
+        lines.append(f"   平台: {self.platform}")
         
         # 驗證配置
         validation = self.validate_config()
-        print(f"\n✅ 配置驗證:")
+        lines.append(f"\n{ICONS['ok']} 配置驗證:")
         if validation['valid']:
-            print("   配置與硬體完全匹配 ✅")
+            lines.append(f"   配置與硬體完全匹配 {ICONS['ok']}")
         else:
-            print("   配置存在問題 ❌")
+            lines.append(f"   配置存在問題 {ICONS['err']}")
             for error in validation['errors']:
-                print(f"   ❌ {error}")
+                lines.append(f"   {ICONS['err']} {error}")
         
         if validation['warnings']:
-            print("   警告:")
+            lines.append("   警告:")
             for warning in validation['warnings']:
-                print(f"   ⚠️  {warning}")
+                lines.append(f"   {ICONS['warn']} {warning}")
         
-        print("=" * 60)
+        lines.append("=" * 60)
+        
+        sys.stdout.write("\n".join(lines) + "\n")
+
+# 共用配置實例 (首次以shared=True取用時才建立，import時不建立配置)
+_SHARED_CONFIG = None
+
+def get_config(shared=False):
+    """獲取配置實例 (預設回傳新實例；shared=True取得全域共用實例)"""
+    global _SHARED_CONFIG
+    if not shared:
+        return HardwareVerifiedConfig()
+    if _SHARED_CONFIG is None:
+        _SHARED_CONFIG = HardwareVerifiedConfig()
+    return _SHARED_CONFIG
 
-def get_config():
-    """獲取配置實例"""
-    return HardwareVerifiedConfig()
+def __getattr__(name):
+    """相容舊的模組屬性CONFIG (即共用實例)"""
+    if name == 'CONFIG':
+        return get_config(shared=True)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     config = get_config()
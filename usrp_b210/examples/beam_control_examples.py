@@ -6,6 +6,8 @@ Beam Control 模組使用範例
 作者: TMYTEK ISAC Lab
 """
 
+import functools
+import io
 import sys
 import time
 import numpy as np
@@ -17,16 +19,45 @@ sys.path.insert(0, str(scripts_path))
 
 from beam_control import create_isac_beam_interface, BeamControlConfig
 
+def _flush_log_after(func):
+    """範例方法結束時輸出緩衝的訊息"""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self._flush_log()
+    return wrapper
+
+# 功率掃描紀錄 (每點6 bytes)
+POWER_RECORD_DTYPE = np.dtype([('theta', '<i2'), ('power', '<f4')])
+
 class BeamControlExamples:
     """Beam Control使用範例類別"""
     
-    def __init__(self):
+    def __init__(self, verbose=True):
         self.interface = None
         self.config = None
+        self.verbose = verbose      # False時不輸出 (效能測試用)
+        self._log_buf = io.StringIO()
+    
+    def _log(self, msg=""):
+        """輸出訊息 (先寫入緩衝，階段結束時一次輸出)"""
+        if self.verbose:
+            self._log_buf.write(f"{msg}\n")
+    
+    def _flush_log(self):
+        """輸出緩衝的訊息"""
+        if self._log_buf.tell():
+            sys.stdout.write(self._log_buf.getvalue())
+            sys.stdout.flush()
+            self._log_buf.seek(0)
+            self._log_buf.truncate()
         
+    @_flush_log_after
     def setup_interface(self, custom_config=None):
         """設置介面"""
-        print("🔧 設置Beam Control介面...")
+        self._log("🔧 設置Beam Control介面...")
         
         if custom_config:
             self.config = custom_config
@@ -36,33 +67,35 @@ class BeamControlExamples:
             self.config.target_freq = 28.0
             self.config.scan_range = (-45, 45)
             self.config.max_log_files = 3  # 減少日誌檔案數量
+            self.config.beam_settle_time = 0.1  # 範例中每個角度停留0.1秒
         
         self.interface = create_isac_beam_interface(self.config)
         
         if self.interface.initialize():
-            print("✅ 介面初始化成功")
+            self._log("✅ 介面初始化成功")
             return True
         else:
-            print("❌ 介面初始化失敗")
+            self._log("❌ 介面初始化失敗")
             return False
     
+    @_flush_log_after
     def example_1_basic_control(self):
         """範例1: 基本波束控制"""
-        print("\n" + "="*50)
-        print("📚 範例1: 基本波束控制")
-        print("="*50)
+        self._log("\n" + "="*50)
+        self._log("📚 範例1: 基本波束控制")
+        self._log("="*50)
         
         if not self.interface:
-            print("❌ 介面未初始化")
+            self._log("❌ 介面未初始化")
             return False
         
         try:
             # 1. 設置TX模式
-            print("📡 設置TX模式...")
+            self._log("📡 設置TX模式...")
             if self.interface.set_bbox_mode("TX"):
-                print("✅ TX模式設置成功")
+                self._log("✅ TX模式設置成功")
             else:
-                print("❌ TX模式設置失敗")
+                self._log("❌ TX模式設置失敗")
                 return False
             
             # 2. 測試不同角度
@@ -75,188 +108,188 @@ class BeamControlExamples:
                 (0, 180),    # 後方
             ]
             
-            print("🎯 測試波束角度控制...")
+            self._log("🎯 測試波束角度控制...")
             for theta, phi in test_angles:
                 if self.interface.set_beam_angle(theta, phi):
-                    print(f"✅ 角度設置成功: θ={theta}°, φ={phi}°")
-                    time.sleep(0.1)  # 等待設置生效
+                    self._log(f"✅ 角度設置成功: θ={theta}°, φ={phi}°")
                 else:
-                    print(f"❌ 角度設置失敗: θ={theta}°, φ={phi}°")
+                    self._log(f"❌ 角度設置失敗: θ={theta}°, φ={phi}°")
             
             # 3. 獲取狀態
             status = self.interface.get_status()
-            print(f"📊 當前狀態: 模式={status['current_mode']}, "
-                  f"角度=({status['current_theta']}, {status['current_phi']})")
+            self._log(f"📊 當前狀態: 模式={status['current_mode']}, "
+                      f"角度=({status['current_theta']}, {status['current_phi']})")
             
             return True
             
         except Exception as e:
-            print(f"💥 基本控制範例執行失敗: {e}")
+            self._log(f"💥 基本控制範例執行失敗: {e}")
             return False
     
+    @_flush_log_after
     def example_2_power_measurement(self):
         """範例2: 功率測量掃描"""
-        print("\n" + "="*50)
-        print("📚 範例2: 功率測量掃描")
-        print("="*50)
+        self._log("\n" + "="*50)
+        self._log("📚 範例2: 功率測量掃描")
+        self._log("="*50)
         
         if not self.interface:
-            print("❌ 介面未初始化")
+            self._log("❌ 介面未初始化")
             return False
         
         try:
             # 設置RX模式進行功率測量
-            print("📡 設置RX模式...")
+            self._log("📡 設置RX模式...")
             if not self.interface.set_bbox_mode("RX"):
-                print("❌ RX模式設置失敗")
+                self._log("❌ RX模式設置失敗")
                 return False
             
-            # 執行角度掃描
-            theta_range = range(-30, 31, 5)  # -30° 到 +30°，步長5°
-            phi_values = [0]  # 只測試水平面
+            # 執行角度掃描 (批次測量)
+            thetas = np.arange(-30, 31, 5, dtype=np.int16)  # -30° 到 +30°，步長5°
+            results = np.empty(len(thetas), dtype=POWER_RECORD_DTYPE)
+            results['theta'] = thetas
             
-            print("🔍 開始功率掃描...")
-            power_results = {}
+            self._log("🔍 開始功率掃描...")
+            results['power'] = self.interface.measure_power_batch(thetas, np.zeros_like(thetas))
             
-            for theta in theta_range:
-                power = self.interface.measure_power(theta, 0)
-                if power is not None:
-                    power_results[theta] = power
-                    print(f"📊 θ={theta:3d}°: {power:6.2f} dBm")
+            for theta, power in results.tolist():
+                if np.isnan(power):
+                    self._log(f"⚠️ θ={theta:3d}°: 測量失敗")
                 else:
-                    print(f"⚠️ θ={theta:3d}°: 測量失敗")
-                
-                time.sleep(0.05)  # 短暫延遲
+                    self._log(f"📊 θ={theta:3d}°: {power:6.2f} dBm")
             
             # 分析結果
-            if power_results:
-                powers = list(power_results.values())
-                max_power = max(powers)
-                min_power = min(powers)
-                avg_power = np.mean(powers)
+            valid = ~np.isnan(results['power'])
+            if valid.any():
+                r = results[valid]
+                p = r['power']
+                max_i = p.argmax()
                 
-                print(f"\n📈 掃描結果分析:")
-                print(f"   最大功率: {max_power:.2f} dBm")
-                print(f"   最小功率: {min_power:.2f} dBm")
-                print(f"   平均功率: {avg_power:.2f} dBm")
-                print(f"   測量點數: {len(power_results)}")
+                self._log(f"\n📈 掃描結果分析:")
+                self._log(f"   最大功率: {p[max_i]:.2f} dBm")
+                self._log(f"   最小功率: {p.min():.2f} dBm")
+                self._log(f"   平均功率: {p.mean():.2f} dBm")
+                self._log(f"   測量點數: {p.size}")
                 
                 # 找到最大功率的角度
-                max_angle = max(power_results, key=power_results.get)
-                print(f"   最佳角度: θ={max_angle}°")
+                self._log(f"   最佳角度: θ={r['theta'][max_i]}°")
             
             return True
             
         except Exception as e:
-            print(f"💥 功率測量範例執行失敗: {e}")
+            self._log(f"💥 功率測量範例執行失敗: {e}")
             return False
     
+    @_flush_log_after
     def example_3_adaptive_scanning(self):
         """範例3: 自適應掃描"""
-        print("\n" + "="*50)
-        print("📚 範例3: 自適應掃描")
-        print("="*50)
+        self._log("\n" + "="*50)
+        self._log("📚 範例3: 自適應掃描")
+        self._log("="*50)
         
         if not self.interface:
-            print("❌ 介面未初始化")
+            self._log("❌ 介面未初始化")
             return False
         
         try:
             # 設置TX模式
             if not self.interface.set_bbox_mode("TX"):
-                print("❌ TX模式設置失敗")
+                self._log("❌ TX模式設置失敗")
                 return False
             
-            print("🎯 執行自適應掃描...")
+            self._log("🎯 執行自適應掃描...")
             
-            # 第一階段: 粗略掃描
-            print("🔍 第一階段: 粗略掃描 (±45°, 步長15°)")
-            coarse_angles = [-45, -30, -15, 0, 15, 30, 45]
-            coarse_results = {}
+            # 三個階段的角度一次下發
+            coarse_angles = [-45, -30, -15, 0, 15, 30, 45]  # 粗略掃描 (±45°, 步長15°)
+            fine_angles = list(range(-10, 11, 5))           # 精細掃描 (假設最佳角度在0°附近)
+            sequence = [(theta, 0) for theta in coarse_angles + fine_angles] + [(0, 0)]
+            results = self.interface.set_beam_angle_sequence(sequence)
+            coarse_ok = results[:len(coarse_angles)]
+            fine_ok = results[len(coarse_angles):-1]
             
-            for theta in coarse_angles:
-                if self.interface.set_beam_angle(theta, 0):
-                    print(f"✅ 粗略掃描: θ={theta}°")
-                    time.sleep(0.1)
+            # 第一階段: 粗略掃描
+            self._log("🔍 第一階段: 粗略掃描 (±45°, 步長15°)")
+            for theta, ok in zip(coarse_angles, coarse_ok):
+                if ok:
+                    self._log(f"✅ 粗略掃描: θ={theta}°")
                 else:
-                    print(f"❌ 粗略掃描失敗: θ={theta}°")
-            
-            # 第二階段: 精細掃描 (假設最佳角度在0°附近)
-            print("🔍 第二階段: 精細掃描 (0°附近, 步長5°)")
-            fine_angles = range(-10, 11, 5)
+                    self._log(f"❌ 粗略掃描失敗: θ={theta}°")
             
-            for theta in fine_angles:
-                if self.interface.set_beam_angle(theta, 0):
-                    print(f"✅ 精細掃描: θ={theta}°")
-                    time.sleep(0.1)
+            # 第二階段: 精細掃描
+            self._log("🔍 第二階段: 精細掃描 (0°附近, 步長5°)")
+            for theta, ok in zip(fine_angles, fine_ok):
+                if ok:
+                    self._log(f"✅ 精細掃描: θ={theta}°")
                 else:
-                    print(f"❌ 精細掃描失敗: θ={theta}°")
+                    self._log(f"❌ 精細掃描失敗: θ={theta}°")
             
             # 第三階段: 最終定位
-            print("🎯 第三階段: 最終定位 (0°)")
-            if self.interface.set_beam_angle(0, 0):
-                print("✅ 最終定位成功: θ=0°")
+            self._log("🎯 第三階段: 最終定位 (0°)")
+            if results[-1]:
+                self._log("✅ 最終定位成功: θ=0°")
             else:
-                print("❌ 最終定位失敗")
+                self._log("❌ 最終定位失敗")
             
             return True
             
         except Exception as e:
-            print(f"💥 自適應掃描範例執行失敗: {e}")
+            self._log(f"💥 自適應掃描範例執行失敗: {e}")
             return False
     
+    @_flush_log_after
     def example_4_safety_features(self):
         """範例4: 安全功能演示"""
-        print("\n" + "="*50)
-        print("📚 範例4: 安全功能演示")
-        print("="*50)
+        self._log("\n" + "="*50)
+        self._log("📚 範例4: 安全功能演示")
+        self._log("="*50)
         
         if not self.interface:
-            print("❌ 介面未初始化")
+            self._log("❌ 介面未初始化")
             return False
         
         try:
             # 設置一個非零角度
-            print("🎯 設置測試角度...")
+            self._log("🎯 設置測試角度...")
             if self.interface.set_beam_angle(25, 0):
-                print("✅ 測試角度設置成功: θ=25°")
+                self._log("✅ 測試角度設置成功: θ=25°")
             else:
-                print("❌ 測試角度設置失敗")
+                self._log("❌ 測試角度設置失敗")
                 return False
             
             # 獲取當前狀態
             status = self.interface.get_status()
-            print(f"📊 當前狀態: θ={status['current_theta']}°, φ={status['current_phi']}°")
+            self._log(f"📊 當前狀態: θ={status['current_theta']}°, φ={status['current_phi']}°")
             
             # 演示緊急停止
-            print("🛑 執行緊急停止...")
+            self._log("🛑 執行緊急停止...")
             if self.interface.emergency_stop():
-                print("✅ 緊急停止執行成功")
+                self._log("✅ 緊急停止執行成功")
                 
                 # 檢查停止後的狀態
                 new_status = self.interface.get_status()
-                print(f"📊 停止後狀態: θ={new_status['current_theta']}°, φ={new_status['current_phi']}°")
+                self._log(f"📊 停止後狀態: θ={new_status['current_theta']}°, φ={new_status['current_phi']}°")
             else:
-                print("❌ 緊急停止執行失敗")
+                self._log("❌ 緊急停止執行失敗")
             
             return True
             
         except Exception as e:
-            print(f"💥 安全功能範例執行失敗: {e}")
+            self._log(f"💥 安全功能範例執行失敗: {e}")
             return False
     
+    @_flush_log_after
     def example_5_error_handling(self):
         """範例5: 錯誤處理和重試機制"""
-        print("\n" + "="*50)
-        print("📚 範例5: 錯誤處理和重試機制")
-        print("="*50)
+        self._log("\n" + "="*50)
+        self._log("📚 範例5: 錯誤處理和重試機制")
+        self._log("="*50)
         
         if not self.interface:
-            print("❌ 介面未初始化")
+            self._log("❌ 介面未初始化")
             return False
         
         try:
-            print("🔄 演示錯誤處理和重試機制...")
+            self._log("🔄 演示錯誤處理和重試機制...")
             
             # 測試超出範圍的角度
             invalid_angles = [
@@ -266,28 +299,30 @@ class BeamControlExamples:
                 (0, 270),    # 不支援的phi角度
             ]
             
-            for theta, phi in invalid_angles:
-                print(f"🧪 測試無效角度: θ={theta}°, φ={phi}°")
-                result = self.interface.set_beam_angle(theta, phi)
+            # 先以向量化檢查過濾，無效角度不會送到硬體
+            thetas, phis = np.array(invalid_angles, dtype=np.int16).T
+            mask = self.interface.validate_angles(thetas, phis)
+            
+            for theta, phi, valid in zip(thetas.tolist(), phis.tolist(), mask.tolist()):
+                self._log(f"🧪 測試無效角度: θ={theta}°, φ={phi}°")
+                result = valid and self.interface.set_beam_angle(theta, phi)
                 if result:
-                    print(f"⚠️ 意外成功: θ={theta}°, φ={phi}°")
+                    self._log(f"⚠️ 意外成功: θ={theta}°, φ={phi}°")
                 else:
-                    print(f"✅ 正確拒絕: θ={theta}°, φ={phi}°")
-                
-                time.sleep(0.1)
+                    self._log(f"✅ 正確拒絕: θ={theta}°, φ={phi}°")
             
             # 測試穩健的角度設置
-            print("\n🔄 測試穩健的角度設置...")
+            self._log("\n🔄 測試穩健的角度設置...")
             success = self._robust_angle_setting(20, 0, max_retries=3)
             if success:
-                print("✅ 穩健角度設置成功")
+                self._log("✅ 穩健角度設置成功")
             else:
-                print("❌ 穩健角度設置失敗")
+                self._log("❌ 穩健角度設置失敗")
             
             return True
             
         except Exception as e:
-            print(f"💥 錯誤處理範例執行失敗: {e}")
+            self._log(f"💥 錯誤處理範例執行失敗: {e}")
             return False
     
     def _robust_angle_setting(self, theta, phi, max_retries=3):
@@ -295,74 +330,84 @@ class BeamControlExamples:
         for attempt in range(max_retries):
             try:
                 if self.interface.set_beam_angle(theta, phi):
-                    print(f"✅ 第{attempt+1}次嘗試成功: θ={theta}°, φ={phi}°")
+                    self._log(f"✅ 第{attempt+1}次嘗試成功: θ={theta}°, φ={phi}°")
                     return True
                 else:
-                    print(f"⚠️ 第{attempt+1}次嘗試失敗")
+                    self._log(f"⚠️ 第{attempt+1}次嘗試失敗")
                     
             except Exception as e:
-                print(f"💥 第{attempt+1}次嘗試發生錯誤: {e}")
+                self._log(f"💥 第{attempt+1}次嘗試發生錯誤: {e}")
             
             if attempt < max_retries - 1:
-                print(f"⏳ 等待重試... ({attempt+1}/{max_retries})")
+                self._log(f"⏳ 等待重試... ({attempt+1}/{max_retries})")
                 time.sleep(0.5)  # 等待0.5秒後重試
         
-        print(f"❌ 角度設置失敗，已重試{max_retries}次")
+        self._log(f"❌ 角度設置失敗，已重試{max_retries}次")
         return False
     
+    @_flush_log_after
     def run_all_examples(self):
         """執行所有範例"""
-        print("🚀 開始執行所有Beam Control範例...")
+        self._log("🚀 開始執行所有Beam Control範例...")
         
+        # (名稱, 函數, 執行時的BBox模式)；範例4、5本身不切換模式，沿用原順序中範例3設定的TX
         examples = [
-            ("基本波束控制", self.example_1_basic_control),
-            ("功率測量掃描", self.example_2_power_measurement),
-            ("自適應掃描", self.example_3_adaptive_scanning),
-            ("安全功能演示", self.example_4_safety_features),
-            ("錯誤處理機制", self.example_5_error_handling),
+            ("基本波束控制", self.example_1_basic_control, "TX"),
+            ("功率測量掃描", self.example_2_power_measurement, "RX"),
+            ("自適應掃描", self.example_3_adaptive_scanning, "TX"),
+            ("安全功能演示", self.example_4_safety_features, "TX"),
+            ("錯誤處理機制", self.example_5_error_handling, "TX"),
         ]
         
+        # 相同模式的範例排在一起，減少TX/RX切換 (穩定排序保留原順序)
+        mode_order = {}
+        for _, _, mode in examples:
+            mode_order.setdefault(mode, len(mode_order))
+        examples.sort(key=lambda example: mode_order[example[2]])
+        
         results = {}
-        for name, func in examples:
-            print(f"\n{'='*20} 執行: {name} {'='*20}")
+        for name, func, _ in examples:
+            self._log(f"\n{'='*20} 執行: {name} {'='*20}")
             try:
                 result = func()
                 results[name] = result
                 if result:
-                    print(f"✅ {name} 執行成功")
+                    self._log(f"✅ {name} 執行成功")
                 else:
-                    print(f"❌ {name} 執行失敗")
+                    self._log(f"❌ {name} 執行失敗")
             except Exception as e:
-                print(f"💥 {name} 執行異常: {e}")
+                self._log(f"💥 {name} 執行異常: {e}")
                 results[name] = False
         
         # 總結結果
-        print("\n" + "="*60)
-        print("📊 範例執行總結")
-        print("="*60)
+        self._log("\n" + "="*60)
+        self._log("📊 範例執行總結")
+        self._log("="*60)
         
-        success_count = sum(1 for result in results.values() if result)
-        total_count = len(results)
+        oks = np.fromiter((bool(result) for result in results.values()), dtype=bool, count=len(results))
+        success_count = int(oks.sum())
+        total_count = oks.size
         
-        for name, result in results.items():
-            status = "✅ 成功" if result else "❌ 失敗"
-            print(f"{name:15s}: {status}")
+        for name, ok in zip(results, oks):
+            status = "✅ 成功" if ok else "❌ 失敗"
+            self._log(f"{name:15s}: {status}")
         
-        print(f"\n總體結果: {success_count}/{total_count} 個範例成功")
+        self._log(f"\n總體結果: {success_count}/{total_count} 個範例成功")
         
         if success_count == total_count:
-            print("🎉 所有範例執行成功！")
+            self._log("🎉 所有範例執行成功！")
         else:
-            print("⚠️ 部分範例執行失敗，請檢查錯誤信息")
+            self._log("⚠️ 部分範例執行失敗，請檢查錯誤信息")
         
         return results
     
+    @_flush_log_after
     def cleanup(self):
         """清理資源"""
         if self.interface:
-            print("🧹 清理資源...")
+            self._log("🧹 清理資源...")
             self.interface.cleanup()
-            print("✅ 資源清理完成")
+            self._log("✅ 資源清理完成")
 
 def main():
     """主函數"""
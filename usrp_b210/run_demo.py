@@ -23,7 +23,7 @@ def main():
         results = run_comprehensive_demo()
         
         # 根據結果提供建議
-        successful = sum(1 for r in results.values() if r['success'])
+        successful = sum(r.success for r in results)
         total = len(results)
         
         if successful == total:
@@ -9,10 +9,14 @@ Beam Control Module for USRP B210 ISAC System
 
 import sys
 import time
+import atexit
 import threading
 import logging
 import logging.handlers
 import os
+import queue
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, Tuple, Dict, List, Union
 import numpy as np
@@ -35,6 +39,62 @@ except ImportError as e:
     print(f"⚠️ TMYTEK Beam Control庫導入失敗: {e}")
     print("將在模擬模式下運行")
 
+class _BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """帶寫入緩衝的RotatingFileHandler - 累積多筆紀錄才flush"""
+    
+    flush_every = 64        # 每64筆紀錄flush一次
+    flush_interval = 1.0    # 或距上次flush超過1秒
+    
+    def __init__(self, *args, **kwargs):
+        self._since_flush = 0
+        self._last_flush = time.monotonic()
+        self._size = 0
+        self._pending_len = 0
+        self._pending_record = None  # shouldRollover已格式化的紀錄，emit時沿用
+        self._pending_msg = None
+        super().__init__(*args, **kwargs)
+    
+    def _open(self):
+        stream = open(self.baseFilename, self.mode, buffering=64 * 1024,
+                      encoding=self.encoding, errors=self.errors)
+        self._size = os.path.getsize(self.baseFilename)
+        return stream
+    
+    def shouldRollover(self, record):
+        # 自行累計檔案大小，避免每筆紀錄stat/tell強制寫出緩衝
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes > 0:
+            msg = super().format(record)
+            self._pending_record, self._pending_msg = record, msg
+            # 以實際寫入的位元組數累計 (非ASCII字元佔多個位元組)
+            self._pending_len = (len(msg.encode(self.encoding or 'utf-8', self.errors or 'strict'))
+                                 + len(self.terminator))
+            return self._size + self._pending_len >= self.maxBytes
+        return False
+    
+    def format(self, record):
+        # 同一筆紀錄只格式化一次
+        if record is self._pending_record:
+            return self._pending_msg
+        return super().format(record)
+    
+    def emit(self, record):
+        try:
+            super().emit(record)
+            self._size += self._pending_len
+        finally:
+            self._pending_record = self._pending_msg = None
+            self._pending_len = 0
+    
+    def flush(self):
+        self._since_flush += 1
+        now = time.monotonic()
+        if self._since_flush >= self.flush_every or now - self._last_flush > self.flush_interval:
+            super().flush()
+            self._since_flush = 0
+            self._last_flush = now
+
 class SmartLogHandler:
     """智能日誌處理器 - 防止日誌過度增長"""
     
@@ -60,7 +120,7 @@ class SmartLogHandler:
         self.log_file = self.log_dir / "beam_control.log"
         
         # 創建日誌處理器
-        self.handler = logging.handlers.RotatingFileHandler(
+        self.handler = _BufferedRotatingFileHandler(
             self.log_file,
             maxBytes=max_file_size,
             backupCount=max_files,
@@ -74,9 +134,18 @@ class SmartLogHandler:
         self.handler.setFormatter(formatter)
         self.handler.setLevel(log_level)
         
+        # 檔案寫入交給背景執行緒，呼叫端只做記憶體內的enqueue
+        self._queue = queue.SimpleQueue()
+        self.queue_handler = logging.handlers.QueueHandler(self._queue)
+        self._listener = logging.handlers.QueueListener(
+            self._queue, self.handler, respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self.close)  # 未呼叫cleanup時也寫完佇列
+        
         # 創建logger
         self.logger = logging.getLogger('BeamControl')
-        self.logger.addHandler(self.handler)
+        self.logger.addHandler(self.queue_handler)
         self.logger.setLevel(log_level)
         
         # 防止日誌重複
@@ -94,6 +163,15 @@ class SmartLogHandler:
             return logging.getLogger(f'BeamControl.{name}')
         return self.logger
     
+    def close(self):
+        """停止背景寫入並關閉日誌檔案 (會先寫完佇列中的紀錄)"""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._listener = None
+        self.logger.removeHandler(self.queue_handler)
+        self.handler.close()
+    
     def cleanup_old_logs(self):
         """清理舊的日誌檔案"""
         try:
@@ -117,6 +195,7 @@ class BeamControlConfig:
         # 基本參數
         self.target_freq = 28.0  # GHz
         self.scan_range = (-45, 45)  # 掃描範圍 (度) - 水平掃描左右各45度
+        self.allowed_phi = (0, 180)  # 支援的phi角度
         self.default_gain = 15.0  # 預設增益
         
         # 日誌配置
@@ -127,7 +206,58 @@ class BeamControlConfig:
         # 安全參數
         self.max_retries = 3
         self.retry_delay = 0.01
+        self.beam_settle_time = 0.01  # 波束角度設置生效時間 (秒)
         self.operation_timeout = 5.0
+        
+        # 掃描網格快取 (scan_range/allowed_phi變更時重建)
+        self._grid_key = None
+        self._theta_grid = None
+        self._phi_grid = None
+    
+    def _update_grids(self):
+        """依目前的scan_range與allowed_phi建立角度網格"""
+        key = (tuple(self.scan_range), tuple(self.allowed_phi))
+        if key != self._grid_key:
+            self._theta_grid = np.arange(self.scan_range[0], self.scan_range[1] + 1, dtype=np.float32)
+            self._phi_grid = np.array(self.allowed_phi, dtype=np.float32)
+            self._theta_grid.setflags(write=False)
+            self._phi_grid.setflags(write=False)
+            self._grid_key = key
+    
+    @property
+    def theta_grid(self) -> np.ndarray:
+        """掃描範圍內的theta網格 (1度間隔，float32唯讀)"""
+        self._update_grids()
+        return self._theta_grid
+    
+    @property
+    def phi_grid(self) -> np.ndarray:
+        """支援的phi角度 (float32唯讀)"""
+        self._update_grids()
+        return self._phi_grid
+
+def _unwrap(ret) -> Tuple[bool, object]:
+    """解析TLKCore回傳值，回傳 (是否成功, RetData)"""
+    try:
+        return ret.RetCode == RetCode.OK, ret.RetData
+    except AttributeError:
+        return False, None
+
+@dataclass(slots=True)
+class DeviceInfo:
+    """掃描到的設備資訊"""
+    sn: str
+    type: str
+    address: str
+    devtype: int
+    in_dfu: bool
+
+# 設備類型關鍵字 -> (角色屬性, 角色名稱, 是否保留第一個)
+_DEVICE_ROLES = (
+    ("PD", "pd_sn", "Power Detector", False),
+    ("BBox", "bbox_sn", "Beamformer", True),
+    ("RIS", "ris_sn", "RIS", False),
+)
 
 class BeamDeviceManager:
     """Beam設備管理器"""
@@ -147,6 +277,19 @@ class BeamDeviceManager:
         # 設備狀態
         self.device_status = {}
         
+        # 不變的設備查詢結果 (頻率列表、校準版本、增益範圍)，重新掃描時清除
+        self._query_cache = {}
+        
+    def query_cached(self, method: str, sn: str, *args):
+        """呼叫TLKCoreService查詢並快取成功的結果"""
+        key = (method, sn) + args
+        ret = self._query_cache.get(key)
+        if ret is None:
+            ret = getattr(self.service, method)(sn, *args)
+            if _unwrap(ret)[0]:
+                self._query_cache[key] = ret
+        return ret
+    
     def init_service(self) -> bool:
         """初始化TLKCoreService"""
         try:
@@ -169,7 +312,7 @@ class BeamDeviceManager:
             self.logger.error(f"初始化TLKCoreService失敗: {e}")
             return False
     
-    def scan_devices(self) -> List[Dict]:
+    def scan_devices(self) -> List[DeviceInfo]:
         """掃描連接的設備"""
         if not self.service:
             self.logger.error("服務未初始化")
@@ -180,7 +323,7 @@ class BeamDeviceManager:
             interface = DevInterface.ALL
             
             ret = self.service.scanDevices(interface=interface)
-            if not hasattr(ret, 'RetData') or ret.RetCode != RetCode.OK:
+            if not _unwrap(ret)[0]:
                 self.logger.error("設備掃描失敗")
                 return []
                 
@@ -191,6 +334,7 @@ class BeamDeviceManager:
                 
             scan_dict = scan_info.RetData
             self.device_list = []
+            self._query_cache.clear()
             
             for sn, (addr, devtype, in_dfu) in scan_dict.items():
                 if in_dfu:
@@ -207,30 +351,18 @@ class BeamDeviceManager:
                 dev_type_ret = self.service.getDevTypeName(sn)
                 dev_type = dev_type_ret.RetData if hasattr(dev_type_ret, 'RetData') else str(dev_type_ret)
                 
-                device_info = {
-                    'sn': sn,
-                    'type': dev_type,
-                    'address': addr,
-                    'devtype': devtype,
-                    'in_dfu': in_dfu
-                }
-                
-                self.device_list.append(device_info)
-                self.logger.info(f"發現設備: {dev_type} ({sn})")
+                self.device_list.append(DeviceInfo(sn, dev_type, addr, devtype, in_dfu))
+                self.logger.info("發現設備: %s (%s)", dev_type, sn)
                 
                 # 自動分配設備角色
-                if "PD" in dev_type:
-                    self.pd_sn = sn
-                    self.logger.info(f"分配為Power Detector: {sn}")
-                elif "BBox" in dev_type:
-                    if not self.bbox_sn:
-                        self.bbox_sn = sn
-                        self.logger.info(f"分配為Beamformer: {sn}")
-                elif "RIS" in dev_type:
-                    self.ris_sn = sn
-                    self.logger.info(f"分配為RIS: {sn}")
-            
-            self.logger.info(f"設備掃描完成，發現 {len(self.device_list)} 個設備")
+                for keyword, attr, role, keep_first in _DEVICE_ROLES:
+                    if keyword in dev_type:
+                        if not (keep_first and getattr(self, attr)):
+                            setattr(self, attr, sn)
+                            self.logger.info("分配為%s: %s", role, sn)
+                        break
+            
+            self.logger.info("設備掃描完成，發現 %d 個設備", len(self.device_list))
             return self.device_list
             
         except Exception as e:
@@ -249,7 +381,7 @@ class BeamDeviceManager:
                 return None
                 
             # 2. 獲取頻率列表
-            freq_ret = self.service.getFrequencyList(sn)
+            freq_ret = self.query_cached('getFrequencyList', sn)
             if not hasattr(freq_ret, 'RetData') or not freq_ret.RetData:
                 self.logger.error(f"無法獲取頻率列表: {sn}")
                 return None
@@ -272,7 +404,7 @@ class BeamDeviceManager:
             
             # 4. 載入校準檔案
             try:
-                cali_ver = self.service.queryCaliTableVer(sn)
+                cali_ver = self.query_cached('queryCaliTableVer', sn)
                 if hasattr(cali_ver, 'RetData'):
                     self.logger.info(f"校準版本: {cali_ver.RetData}")
                 else:
@@ -281,7 +413,7 @@ class BeamDeviceManager:
                 self.logger.warning(f"校準版本查詢失敗: {e}")
             
             # 5. 獲取增益範圍
-            rng_ret = self.service.getDR(sn, mode)
+            rng_ret = self.query_cached('getDR', sn, mode)
             if rng_ret.RetCode != RetCode.OK:
                 self.logger.error(f"獲取增益範圍失敗: {rng_ret.RetMsg}")
                 return None
@@ -371,9 +503,17 @@ class ISACBeamInterface:
         self.current_mode = None  # TX/RX/STANDBY
         self.current_theta = 0
         self.current_phi = 0
+        self._applied_beam = None  # 硬體上已生效的(theta, phi)，相同角度不重複下發
+        self._next_ready = 0.0     # 波束穩定的時間點 (time.monotonic)
         self.gain_max = None
         self.is_initialized = False
         
+        # 熱路徑使用的設備參照 (initialize後綁定)
+        self._svc = None
+        self._bbox = None
+        self._pd = None
+        self._target_freq_int = int(self.config.target_freq)
+        
         # 通信鎖
         self.comm_lock = threading.Lock()
         
@@ -422,6 +562,7 @@ class ISACBeamInterface:
                 self.logger.error("配置驗證失敗")
                 return False
                 
+            self._bind_hot_paths()
             self.is_initialized = True
             self.logger.info("ISAC-Beam整合系統初始化成功")
             return True
@@ -430,6 +571,23 @@ class ISACBeamInterface:
             self.logger.error(f"系統初始化失敗: {e}")
             return False
     
+    @contextmanager
+    def _comm(self):
+        """取得通信鎖，超過operation_timeout拋出BeamControlError"""
+        if not self.comm_lock.acquire(timeout=self.config.operation_timeout):
+            raise BeamControlError(f"等待設備通信鎖逾時 ({self.config.operation_timeout}s)")
+        try:
+            yield
+        finally:
+            self.comm_lock.release()
+    
+    def _bind_hot_paths(self):
+        """綁定熱路徑常用的設備參照，減少逐次的屬性鏈查找"""
+        self._svc = self.device_manager.service
+        self._bbox = self.device_manager.bbox_sn
+        self._pd = self.device_manager.pd_sn
+        self._target_freq_int = int(self.config.target_freq)
+    
     def _validate_configuration(self) -> bool:
         """驗證配置是否正確"""
         try:
@@ -456,7 +614,7 @@ class ISACBeamInterface:
             # 檢查校準檔案
             if self.device_manager.bbox_sn:
                 try:
-                    cali_ver = self.device_manager.service.queryCaliTableVer(self.device_manager.bbox_sn)
+                    cali_ver = self.device_manager.query_cached('queryCaliTableVer', self.device_manager.bbox_sn)
                     checks.append(cali_ver is not None)
                     self.logger.info("校準檔案驗證通過")
                 except:
@@ -471,7 +629,7 @@ class ISACBeamInterface:
     
     def set_bbox_mode(self, mode: str) -> bool:
         """設置BBox模式 (TX/RX)"""
-        if not self.is_initialized or not self.device_manager.bbox_sn:
+        if not self.is_initialized or not self._bbox:
             self.logger.error("系統未初始化或BBox設備不可用")
             return False
             
@@ -483,19 +641,25 @@ class ISACBeamInterface:
             else:
                 self.logger.error(f"不支援的模式: {mode}")
                 return False
+            
+            # 模式未變更時不重複切換 (BBox切換模式耗時)
+            if self.current_mode == mode.upper():
+                return True
                 
-            with self.comm_lock:
-                ret = self.device_manager.service.setRFMode(self.device_manager.bbox_sn, rf_mode)
+            with self._comm():
+                ret = self._svc.setRFMode(self._bbox, rf_mode)
                 if ret.RetCode != RetCode.OK:
                     self.logger.error(f"設置RF模式失敗: {ret.RetMsg}")
                     return False
                     
                 self.current_mode = mode.upper()
-                self.logger.info(f"BBox模式設置為: {mode}")
+                self._applied_beam = None  # 切換模式後重新下發波束角度
+                self.logger.info("BBox模式設置為: %s", mode)
                 
                 # 更新設備狀態
-                if self.device_manager.bbox_sn in self.device_manager.device_status:
-                    self.device_manager.device_status[self.device_manager.bbox_sn]['mode'] = mode.upper()
+                device_status = self.device_manager.device_status
+                if self._bbox in device_status:
+                    device_status[self._bbox]['mode'] = mode.upper()
                 
                 return True
                 
@@ -503,46 +667,131 @@ class ISACBeamInterface:
             self.logger.error(f"設置BBox模式失敗: {e}")
             return False
     
-    def set_beam_angle(self, theta: float, phi: float) -> bool:
-        """設定波束角度"""
-        if not self.is_initialized or not self.device_manager.bbox_sn:
+    def _check_angle(self, theta: float, phi: float) -> bool:
+        """角度範圍檢查"""
+        if not (self.config.scan_range[0] <= theta <= self.config.scan_range[1]):
+            self.logger.error(f"角度 {theta} 超出範圍 {self.config.scan_range}")
+            return False
+            
+        if phi not in self.config.allowed_phi:
+            self.logger.error(f"Phi角度 {phi} 不支援，支援的角度: {list(self.config.allowed_phi)}")
+            return False
+        
+        return True
+    
+    def validate_angles(self, thetas, phis) -> np.ndarray:
+        """向量化角度檢查，回傳各角度是否可下發 (bool陣列)"""
+        thetas = np.asarray(thetas)
+        phis = np.broadcast_to(phis, thetas.shape)
+        low, high = self.config.scan_range
+        return (thetas >= low) & (thetas <= high) & np.isin(phis, self.config.allowed_phi)
+    
+    def _pace(self, settle_s: float):
+        """記錄波束穩定的截止時間 (等待與其他工作重疊)"""
+        self._next_ready = time.monotonic() + settle_s
+    
+    def _wait_ready(self):
+        """等待上一次波束設置生效"""
+        remaining = self._next_ready - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+    
+    def set_beam_angle(self, theta: float, phi: float, force: bool = False) -> bool:
+        """設定波束角度 (force=True時即使角度相同也重新下發)"""
+        if not self.is_initialized or not self._bbox:
             self.logger.error("系統未初始化或BBox設備不可用")
             return False
             
         try:
-            # 角度範圍檢查
-            if not (self.config.scan_range[0] <= theta <= self.config.scan_range[1]):
-                self.logger.error(f"角度 {theta} 超出範圍 {self.config.scan_range}")
-                return False
-                
-            if phi not in [0, 180]:
-                self.logger.error(f"Phi角度 {phi} 不支援，支援的角度: [0, 180]")
+            if not self._check_angle(theta, phi):
                 return False
             
+            # 角度未變更時不重複下發 (掃描網格常重複相同角度)
+            if not force and self._applied_beam == (theta, phi):
+                return True
+            
+            # 等待上一個角度穩定後再下發
+            self._wait_ready()
+            
             # 設置波束角度
-            with self.comm_lock:
-                ret = self.device_manager.service.setBeamAngle(
-                    self.device_manager.bbox_sn, 
+            with self._comm():
+                ret = self._svc.setBeamAngle(
+                    self._bbox, 
                     self.gain_max, 
                     theta, phi
                 )
                 
                 if ret.RetCode != RetCode.OK:
                     self.logger.error(f"設置波束角度失敗: {ret.RetMsg}")
+                    self._applied_beam = None
                     return False
                     
                 self.current_theta = theta
                 self.current_phi = phi
-                self.logger.info(f"波束角度設置成功: θ={theta}°, φ={phi}°")
+                self._applied_beam = (theta, phi)
+                self._pace(self.config.beam_settle_time)
+                self.logger.info("波束角度設置成功: θ=%s°, φ=%s°", theta, phi)
                 return True
                 
         except Exception as e:
             self.logger.error(f"設置波束角度時發生錯誤: {e}")
             return False
     
+    def set_beam_angle_sequence(self, angles: List[Tuple[float, float]],
+                                dwell_s: Optional[float] = None) -> np.ndarray:
+        """
+        依序設定多個波束角度，每個角度停留dwell_s秒
+        
+        整個序列只取得一次通信鎖，停留時間以截止時間排程
+        
+        Returns:
+        --------
+        np.ndarray : 各角度是否設置成功 (bool)
+        """
+        results = np.zeros(len(angles), dtype=bool)
+        if not self.is_initialized or not self._bbox:
+            self.logger.error("系統未初始化或BBox設備不可用")
+            return results
+        
+        if dwell_s is None:
+            dwell_s = self.config.beam_settle_time
+        service = self._svc
+        bbox_sn = self._bbox
+        
+        valid = self.validate_angles([a[0] for a in angles], [a[1] for a in angles])
+        if not valid.all():
+            self.logger.error(f"{np.count_nonzero(~valid)} 個角度超出範圍或不支援，已略過")
+        
+        try:
+            with self._comm():
+                for i, (theta, phi) in enumerate(angles):
+                    if not valid[i]:
+                        continue
+                    
+                    self._wait_ready()
+                    if self._applied_beam != (theta, phi):
+                        ret = service.setBeamAngle(bbox_sn, self.gain_max, theta, phi)
+                        if ret.RetCode != RetCode.OK:
+                            self.logger.error(f"設置波束角度失敗: {ret.RetMsg}")
+                            self._applied_beam = None
+                            continue
+                        self.current_theta = theta
+                        self.current_phi = phi
+                        self._applied_beam = (theta, phi)
+                    
+                    self._pace(dwell_s)
+                    results[i] = True
+            
+            self.logger.info("波束角度序列完成: %d/%d 個角度", results.sum(), len(angles))
+            
+        except Exception as e:
+            self.logger.error(f"設置波束角度序列時發生錯誤: {e}")
+        
+        return results
+    
     def measure_power(self, theta: float, phi: float) -> Optional[float]:
         """測量功率"""
-        if not self.is_initialized or not self.device_manager.pd_sn:
+        if not self.is_initialized or not self._pd:
             self.logger.error("系統未初始化或Power Detector設備不可用")
             return None
             
@@ -552,31 +801,107 @@ class ISACBeamInterface:
                 return None
                 
             # 等待角度設置生效
-            time.sleep(0.01)
+            self._wait_ready()
             
             # 測量功率
-            with self.comm_lock:
-                power_ret = self.device_manager.service.getPowerValue(
-                    self.device_manager.pd_sn, 
-                    int(self.config.target_freq)
+            with self._comm():
+                power_ret = self._svc.getPowerValue(
+                    self._pd, 
+                    self._target_freq_int
                 )
                 
-                if not power_ret or power_ret.RetCode != RetCode.OK:
-                    self.logger.error(f"功率測量失敗: {power_ret.RetMsg if hasattr(power_ret, 'RetMsg') else 'Unknown error'}")
+                ok, power = _unwrap(power_ret)
+                if not ok:
+                    self.logger.error(f"功率測量失敗: {getattr(power_ret, 'RetMsg', 'Unknown error')}")
                     return None
                     
-                if not hasattr(power_ret, 'RetData'):
-                    self.logger.error("功率返回值無效")
-                    return None
-                    
-                power = power_ret.RetData
-                self.logger.debug(f"功率測量: θ={theta}°, φ={phi}°, Power={power} dBm")
+                self.logger.debug("功率測量: θ=%s°, φ=%s°, Power=%s dBm", theta, phi, power)
                 return power
                 
         except Exception as e:
             self.logger.error(f"功率測量時發生錯誤: {e}")
             return None
     
+    def measure_power_batch(self, thetas, phis) -> np.ndarray:
+        """
+        批次測量多個角度的功率
+        
+        整個掃描只取得一次通信鎖，省去逐點呼叫的往返開銷
+        
+        Returns:
+        --------
+        np.ndarray : 各角度功率 (dBm, float32)，測量失敗的點為NaN
+        """
+        thetas = np.asarray(thetas)
+        phis = np.broadcast_to(phis, thetas.shape)
+        powers = np.full(thetas.shape, np.nan, dtype=np.float32)
+        
+        if not self.is_initialized or not self._bbox or not self._pd:
+            self.logger.error("系統未初始化或BBox/Power Detector設備不可用")
+            return powers
+        
+        valid = self.validate_angles(thetas, phis)
+        if not valid.all():
+            self.logger.error(f"{np.count_nonzero(~valid)} 個角度超出範圍或不支援，已略過")
+        
+        service = self._svc
+        bbox_sn = self._bbox
+        pd_sn = self._pd
+        freq = self._target_freq_int
+        
+        try:
+            with self._comm():
+                for i in np.flatnonzero(valid).tolist():
+                    theta, phi = thetas[i].item(), phis[i].item()
+                    
+                    if self._applied_beam != (theta, phi):
+                        self._wait_ready()
+                        ret = service.setBeamAngle(bbox_sn, self.gain_max, theta, phi)
+                        if ret.RetCode != RetCode.OK:
+                            self.logger.error(f"設置波束角度失敗: {ret.RetMsg}")
+                            self._applied_beam = None
+                            continue
+                        self.current_theta = theta
+                        self.current_phi = phi
+                        self._applied_beam = (theta, phi)
+                        self._pace(self.config.beam_settle_time)
+                    
+                    # 等待角度設置生效
+                    self._wait_ready()
+                    
+                    ok, power = _unwrap(service.getPowerValue(pd_sn, freq))
+                    if ok:
+                        powers[i] = power
+                    else:
+                        self.logger.error("功率測量失敗: θ=%s°, φ=%s°", theta, phi)
+            
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("批次功率測量完成: %d/%d 點",
+                                  np.count_nonzero(~np.isnan(powers)), powers.size)
+            
+        except Exception as e:
+            self.logger.error(f"批次功率測量時發生錯誤: {e}")
+        
+        return powers
+    
+    def sweep_power(self, theta_indices: Optional[np.ndarray] = None,
+                    phi_index: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        在預先計算的角度網格上掃描功率
+        
+        Args:
+            theta_indices: config.theta_grid的索引 (None表示整個掃描範圍)
+            phi_index: config.phi_grid的索引
+            
+        Returns:
+            (thetas, powers) : 掃描角度與對應功率 (失敗的點為NaN)
+        """
+        thetas = self.config.theta_grid
+        if theta_indices is not None:
+            thetas = thetas[theta_indices]
+        phi = self.config.phi_grid[phi_index]
+        return thetas, self.measure_power_batch(thetas, phi)
+    
     def get_status(self) -> Dict:
         """獲取系統狀態"""
         status = {
@@ -596,7 +921,7 @@ class ISACBeamInterface:
         """緊急停止 - 將波束設為安全角度"""
         try:
             self.logger.warning("執行緊急停止程序")
-            return self.set_beam_angle(0, 0)  # 設為0度
+            return self.set_beam_angle(0, 0, force=True)  # 設為0度 (不依賴快取，一定下發)
         except Exception as e:
             self.logger.error(f"緊急停止失敗: {e}")
             return False
@@ -615,6 +940,8 @@ class ISACBeamInterface:
             
         except Exception as e:
             self.logger.error(f"清理過程中發生錯誤: {e}")
+        finally:
+            self.log_handler.close()
 
 # 便捷函數
 def create_isac_beam_interface(config: Optional[BeamControlConfig] = None) -> ISACBeamInterface:
@@ -10,12 +10,17 @@ Chirp信號產生器模組
 import numpy as np
 import matplotlib.pyplot as plt
 from pathlib import Path
+import base64
+import importlib.util
 import json
 import time
+from contextlib import contextmanager
 
 # 添加config路徑以便導入
 import sys
-sys.path.append(str(Path(__file__).parent.parent / "config"))
+_config_dir = str(Path(__file__).parent.parent / "config")
+if _config_dir not in sys.path:  # 重複匯入時不再加長sys.path
+    sys.path.append(_config_dir)
 
 try:
     from hardware_verified_config import get_config
@@ -35,15 +40,177 @@ except ImportError:
         
         CONFIG = DefaultConfig()
 
+# === 可選：Numba融合核心 (chirp_kernels，首次使用時才匯入以免拖慢載入) ===
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+_KERNELS = {}  # 已載入的核心
+
+def get_numba_kernel(name):
+    """取得chirp_kernels中的Numba核心，numba不可用時回傳None"""
+    global NUMBA_AVAILABLE
+    kernel = _KERNELS.get(name)
+    if kernel is None and NUMBA_AVAILABLE:
+        try:
+            import chirp_kernels
+            kernel = _KERNELS[name] = getattr(chirp_kernels, name)
+        except ImportError:
+            NUMBA_AVAILABLE = False
+    return kernel
+
+# 波形精度: B210 DAC僅12-bit，預設單精度即足夠
+PRECISIONS = {
+    'single': (np.complex64, np.float32),
+    'double': (np.complex128, np.float64),
+}
+
+# 非線性chirp類型 -> nonlinear_chirp_kernel的類型代碼
+_NONLINEAR_KINDS = {'quadratic': 0, 'logarithmic': 1, 'exponential': 2}
+
+def _phasor(phase, dtype=np.complex128, out=None):
+    """以cos/sin直接寫入複數陣列，取代np.exp(1j*phase)的複數指數運算"""
+    if out is None:
+        out = np.empty(phase.shape, dtype=dtype)
+    np.cos(phase, out=out.real)
+    np.sin(phase, out=out.imag)
+    return out
+
+# === 可選：CuPy GPU核心 (多重chirp模板庫，首次使用時才匯入) ===
+_GPU_CHIRP = None
+
+def _get_gpu_chirp():
+    """取得(cupy模組, GPU chirp核心)，CuPy或CUDA不可用時回傳None"""
+    global _GPU_CHIRP
+    if _GPU_CHIRP is None:
+        try:
+            import cupy
+            cupy.cuda.runtime.getDeviceCount()
+            kernel = cupy.ElementwiseKernel(
+                'float64 t, float64 f0, float64 k',
+                'T sig',
+                'double ph = 2.0 * M_PI * t * (f0 + 0.5 * k * t); sig = T(cos(ph), sin(ph));',
+                'isac_linear_chirp'
+            )
+            _GPU_CHIRP = (cupy, kernel)
+        except Exception:
+            # 未安裝CuPy或沒有CUDA裝置
+            _GPU_CHIRP = False
+    return _GPU_CHIRP or None
+
+def _batch_fft(frames, onesided=False):
+    """沿最後一軸對多幀同時做FFT (scipy.fft可用時多執行緒)"""
+    try:
+        import scipy.fft as fft_module
+        kwargs = {'workers': -1}
+    except ImportError:
+        fft_module = np.fft
+        kwargs = {}
+    if onesided:
+        return fft_module.rfft(frames, axis=-1, **kwargs)
+    return fft_module.fft(frames, axis=-1, **kwargs)
+
+def _tone_phasors(freqs, samples, dt, dtype):
+    """
+    產生 exp(j2π f n dt) 矩陣 (每個頻率一列)
+    
+    n = h*B + l 拆成兩張長度約√N的短查找表相乘，每列只需約2√N次三角函數
+    """
+    block = max(int(np.ceil(np.sqrt(samples))), 1)
+    n_blocks = -(-samples // block)
+    f = 2 * np.pi * np.asarray(freqs, dtype=np.float64)[:, None] * dt
+    low = _phasor(f * np.arange(block), dtype)                 # (M, B)
+    high = _phasor(f * (np.arange(n_blocks) * block), dtype)   # (M, N/B)
+    tones = high[:, :, None] * low[:, None, :]
+    return tones.reshape(len(f), -1)[:, :samples]
+
+def _freeze_arrays(result):
+    """將巢狀dict中的陣列設為唯讀 (快取的分析結果不可被就地修改)"""
+    for value in result.values():
+        if isinstance(value, dict):
+            _freeze_arrays(value)
+        elif isinstance(value, np.ndarray):
+            value.flags.writeable = False
+
+def _copy_analysis(result):
+    """複製巢狀dict (唯讀陣列直接共用)，呼叫端修改dict不影響快取"""
+    return {key: _copy_analysis(value) if isinstance(value, dict) else value
+            for key, value in result.items()}
+
+class ChirpBank:
+    """
+    多個chirp的SoA容器：信號為 (N, samples) 連續陣列，參數為平行的一維陣列
+    
+    以索引取得單一chirp時才組成與generate_linear_chirp相同格式的dict (信號為列視圖)
+    """
+    
+    __slots__ = ('signals', 'windowed_signals', 'instantaneous_freqs', 'time',
+                 'start_freqs', 'chirp_rates', 'directions',
+                 'duration', 'bandwidth', 'sample_rate')  # bandwidth可為純量或逐列陣列
+    
+    def __init__(self, signals, windowed_signals, instantaneous_freqs, time,
+                 start_freqs, chirp_rates, directions, duration, bandwidth, sample_rate):
+        self.signals = signals
+        self.windowed_signals = windowed_signals
+        self.instantaneous_freqs = instantaneous_freqs
+        self.time = time
+        self.start_freqs = start_freqs
+        self.chirp_rates = chirp_rates
+        self.directions = directions  # +1 上行, -1 下行
+        self.duration = duration
+        self.bandwidth = bandwidth
+        self.sample_rate = sample_rate
+    
+    def __len__(self):
+        return len(self.start_freqs)
+    
+    def __getitem__(self, i):
+        direction = self.directions[i]
+        bandwidth = self.bandwidth if np.ndim(self.bandwidth) == 0 else self.bandwidth[i]
+        return {
+            'signal': self.signals[i],
+            'windowed_signal': self.windowed_signals[i],
+            'time': self.time,
+            'instantaneous_freq': self.instantaneous_freqs[i],
+            'parameters': {
+                'duration': self.duration,
+                'bandwidth': bandwidth,
+                'start_freq': self.start_freqs[i],
+                'stop_freq': self.start_freqs[i] + direction * bandwidth,
+                'sample_rate': self.sample_rate,
+                'samples': self.signals.shape[1],
+                'chirp_rate': self.chirp_rates[i],
+                'direction': "up" if direction > 0 else "down"
+            }
+        }
+
 class ChirpGenerator:
     """Chirp信號產生器類別"""
     
-    def __init__(self, config=None):
+    ANALYSIS_CACHE_SIZE = 32  # analyze_chirp結果快取上限
+    
+    def __init__(self, config=None, precision="single", seed=None):
+        if precision not in PRECISIONS:
+            raise ValueError(f"不支援的精度: {precision}")
         self.config = config or CONFIG
         self.signal_cache = {}  # 信號快取
+        self._analysis_cache = {}  # (id(唯讀信號), 參數, ...) -> (信號, 分析結果)
+        # 輸出波形精度 (相位一律以float64計算)
+        self.dtype, self.real_dtype = PRECISIONS[precision]
+        # SFC64亂數產生器 (雜訊用，比PCG64/MT19937更快)；指定seed可重現雜訊
+        self._rng = np.random.Generator(np.random.SFC64(seed))
+        self._buffer_pool = {}  # 取樣數 -> 可重用的輸出緩衝
         
+    def _get_window(self, samples):
+        """取得長度為samples的Hanning窗 (快取於signal_cache，唯讀)"""
+        key = ('hann', samples)
+        window = self.signal_cache.get(key)
+        if window is None:
+            window = np.hanning(samples).astype(self.real_dtype)
+            window.setflags(write=False)
+            self.signal_cache[key] = window
+        return window
+    
     def generate_linear_chirp(self, duration=None, bandwidth=None, 
-                            start_freq=0, sample_rate=None, direction="up"):
+                            start_freq=0, sample_rate=None, direction="up",
+                            return_time=True, out=None, phase_offset=0.0):
         """
         產生線性調頻Chirp信號
         
@@ -59,6 +226,14 @@ class ChirpGenerator:
             取樣率 (Hz)
         direction : str
             "up" 為上行chirp, "down" 為下行chirp
+        return_time : bool
+            是否在回傳中附上時間軸 'time' (預設附上；不需要時設為False省去配置，
+            之後可用 chirp_time_axis() 產生)
+        out : tuple
+            (signal, windowed_signal, instantaneous_freq) 預先配置的輸出緩衝，
+            長度需 >= 取樣數，回傳其前段視圖 (可由 pool() 借用)
+        phase_offset : float
+            初始相位 (弧度)，在同一次相位計算中加入 (如BPSK的π)，不需額外乘法
             
         Returns:
         --------
@@ -69,9 +244,7 @@ class ChirpGenerator:
         bandwidth = bandwidth or self.config.chirp_bandwidth
         sample_rate = sample_rate or self.config.sample_rate
         
-        # 產生時間軸
         samples = int(duration * sample_rate)
-        t = np.linspace(0, duration, samples, endpoint=False)
         
         # 計算頻率參數
         if direction == "up":
@@ -81,23 +254,46 @@ class ChirpGenerator:
             stop_freq = start_freq - bandwidth
             k = -bandwidth / duration  # 負斜率
         
-        # 瞬時頻率: f(t) = start_freq + k*t
-        instantaneous_freq = start_freq + k * t
-        
-        # 相位積分: φ(t) = 2π∫f(t)dt = 2π(start_freq*t + 0.5*k*t²)
-        phase = 2 * np.pi * (start_freq * t + 0.5 * k * t**2)
-        
-        # 複數信號
-        signal = np.exp(1j * phase)
+        if out is None:
+            signal = np.empty(samples, dtype=self.dtype)
+            windowed_signal = np.empty(samples, dtype=self.dtype)
+            instantaneous_freq = np.empty(samples, dtype=self.real_dtype)
+        else:
+            if min(len(buf) for buf in out) < samples:
+                raise ValueError(f"輸出緩衝長度不足: 需要 {samples} 樣本")
+            signal, windowed_signal, instantaneous_freq = (buf[:samples] for buf in out)
         
-        # 添加窗函數以減少頻譜洩漏
-        window = np.hanning(samples)
-        windowed_signal = signal * window
+        kernel = get_numba_kernel('linear_chirp_kernel') if samples > 1 else None
+        if kernel is not None:
+            # 融合核心：一次掃過全部輸出陣列
+            kernel(duration / samples, start_freq, k, phase_offset,
+                   instantaneous_freq, signal, windowed_signal)
+        else:
+            # 產生時間軸
+            t = np.linspace(0, duration, samples, endpoint=False)
+            
+            # 瞬時頻率: f(t) = start_freq + k*t
+            np.multiply(t, k, out=instantaneous_freq)
+            instantaneous_freq += start_freq
+            
+            # 相位積分: φ(t) = 2π∫f(t)dt = 2πt(start_freq + 0.5*k*t)，原地計算減少暫存陣列
+            phase = t * (0.5 * k)
+            phase += start_freq
+            phase *= t
+            phase *= 2 * np.pi
+            if phase_offset:
+                phase += phase_offset
+            
+            # 複數信號
+            _phasor(phase, out=signal)
+            
+            # 添加窗函數以減少頻譜洩漏
+            window = self._get_window(samples)
+            np.multiply(signal, window, out=windowed_signal)
         
-        return {
+        chirp = {
             'signal': signal,
             'windowed_signal': windowed_signal,
-            'time': t,
             'instantaneous_freq': instantaneous_freq,
             'parameters': {
                 'duration': duration,
@@ -107,9 +303,41 @@ class ChirpGenerator:
                 'sample_rate': sample_rate,
                 'samples': samples,
                 'chirp_rate': k,
-                'direction': direction
+                'direction': direction,
+                'phase_offset': phase_offset
             }
         }
+        if return_time:
+            chirp['time'] = self.chirp_time_axis(chirp)
+        return chirp
+    
+    @contextmanager
+    def pool(self, samples):
+        """
+        借用長度為samples的輸出緩衝 (離開時歸還，串流迴圈中重複使用)
+        
+        用法: with gen.pool(n) as buffers: gen.generate_linear_chirp(out=buffers, return_time=False)
+        """
+        free = self._buffer_pool.setdefault(samples, [])
+        if free:
+            buffers = free.pop()
+        else:
+            buffers = (np.empty(samples, dtype=self.dtype),
+                       np.empty(samples, dtype=self.dtype),
+                       np.empty(samples, dtype=self.real_dtype))
+        try:
+            yield buffers
+        finally:
+            free.append(buffers)
+    
+    def chirp_time_axis(self, chirp_data):
+        """取得chirp的時間軸 (未附帶時依取樣數與持續時間產生)"""
+        t = chirp_data.get('time')
+        if t is None:
+            params = chirp_data['parameters']
+            t = np.arange(params['samples'], dtype=self.real_dtype)
+            t *= params['duration'] / params['samples']
+        return t
     
     def generate_nonlinear_chirp(self, duration=None, bandwidth=None,
                                 chirp_type="quadratic", alpha=2.0):
@@ -128,35 +356,62 @@ class ChirpGenerator:
         sample_rate = self.config.sample_rate
         
         samples = int(duration * sample_rate)
+        
+        if chirp_type not in _NONLINEAR_KINDS:
+            raise ValueError(f"不支援的chirp類型: {chirp_type}")
+        
+        kernel = get_numba_kernel('nonlinear_chirp_kernel') if samples > 1 else None
+        if kernel is not None:
+            # 融合核心：一次迴圈寫出時間軸、瞬時頻率與信號
+            if chirp_type == "quadratic":
+                k = bandwidth / (duration ** alpha)
+            elif chirp_type == "logarithmic":
+                k = bandwidth / np.log1p(alpha * duration)
+            else:
+                k = bandwidth / (np.exp(alpha * duration) - 1)
+            t = np.empty(samples, dtype=np.float64)
+            instantaneous_freq = np.empty(samples, dtype=np.float64)
+            signal = np.empty(samples, dtype=self.dtype)
+            kernel(_NONLINEAR_KINDS[chirp_type], duration / samples, k, alpha,
+                   t, instantaneous_freq, signal)
+            return self._nonlinear_result(signal, t, instantaneous_freq,
+                                          chirp_type, duration, bandwidth, alpha, samples)
+        
         t = np.linspace(0, duration, samples, endpoint=False)
         
         if chirp_type == "quadratic":
             # 二次chirp: f(t) = f0 + k*t²
             k = bandwidth / (duration ** alpha)
-            instantaneous_freq = k * (t ** alpha)
-            phase = 2 * np.pi * k * (t ** (alpha + 1)) / (alpha + 1)
+            t_alpha = t ** alpha  # t^α 與 t^(α+1) 共用
+            instantaneous_freq = k * t_alpha
+            phase = (2 * np.pi * k / (alpha + 1)) * (t_alpha * t)
             
         elif chirp_type == "logarithmic":
             # 對數chirp: f(t) = f0 + k*log(1 + α*t)
-            k = bandwidth / np.log(1 + alpha * duration)
-            instantaneous_freq = k * np.log(1 + alpha * t)
-            phase = 2 * np.pi * k * ((1 + alpha * t) * np.log(1 + alpha * t) - alpha * t) / alpha
+            k = bandwidth / np.log1p(alpha * duration)
+            alpha_t = alpha * t
+            log_term = np.log1p(alpha_t)
+            instantaneous_freq = k * log_term
+            phase = (2 * np.pi * k / alpha) * ((1 + alpha_t) * log_term - alpha_t)
             
         elif chirp_type == "exponential":
             # 指數chirp: f(t) = f0 + k*(e^(α*t) - 1)
             k = bandwidth / (np.exp(alpha * duration) - 1)
-            instantaneous_freq = k * (np.exp(alpha * t) - 1)
-            phase = 2 * np.pi * k * (np.exp(alpha * t) / alpha - t)
-            
-        else:
-            raise ValueError(f"不支援的chirp類型: {chirp_type}")
-        
-        signal = np.exp(1j * phase)
+            exp_term = np.exp(alpha * t)
+            instantaneous_freq = k * (exp_term - 1)
+            phase = (2 * np.pi * k) * (exp_term / alpha - t)
         
+        signal = _phasor(phase, self.dtype)
+        return self._nonlinear_result(signal, t, instantaneous_freq,
+                                      chirp_type, duration, bandwidth, alpha, samples)
+    
+    def _nonlinear_result(self, signal, t, instantaneous_freq,
+                          chirp_type, duration, bandwidth, alpha, samples):
+        """組合generate_nonlinear_chirp的回傳dict"""
         return {
             'signal': signal,
-            'time': t,
-            'instantaneous_freq': instantaneous_freq,
+            'time': t.astype(self.real_dtype, copy=False),
+            'instantaneous_freq': instantaneous_freq.astype(self.real_dtype, copy=False),
             'parameters': {
                 'type': chirp_type,
                 'duration': duration,
@@ -166,7 +421,7 @@ class ChirpGenerator:
             }
         }
     
-    def generate_multi_chirp(self, num_chirps=4, spacing="equal"):
+    def generate_multi_chirp(self, num_chirps=4, spacing="equal", device="cpu"):
         """
         產生多重Chirp信號組合
         
@@ -176,32 +431,63 @@ class ChirpGenerator:
             Chirp數量
         spacing : str
             "equal" 等間距, "random" 隨機間距
+        device : str
+            "cpu" 或 "cuda" (需CuPy，信號陣列留在GPU記憶體；不可用時退回CPU)
         """
         total_bandwidth = self.config.chirp_bandwidth
         chirp_bandwidth = total_bandwidth / num_chirps
+        duration = self.config.chirp_duration
+        sample_rate = self.config.sample_rate
+        samples = int(duration * sample_rate)
         
-        signals = []
-        for i in range(num_chirps):
-            if spacing == "equal":
-                start_freq = i * chirp_bandwidth - total_bandwidth/2
-            else:  # random
-                start_freq = np.random.uniform(-total_bandwidth/2, total_bandwidth/2)
-            
-            chirp = self.generate_linear_chirp(
-                start_freq=start_freq,
-                bandwidth=chirp_bandwidth,
-                direction="up" if i % 2 == 0 else "down"
-            )
-            signals.append(chirp)
+        # 各chirp的起始頻率與斜率 (偶數上行、奇數下行)
+        index = np.arange(num_chirps)
+        if spacing == "equal":
+            start_freqs = index * chirp_bandwidth - total_bandwidth/2
+        else:  # random
+            start_freqs = self._rng.uniform(-total_bandwidth/2, total_bandwidth/2, num_chirps)
+        directions = np.where(index % 2 == 0, 1.0, -1.0)
+        chirp_rates = directions * chirp_bandwidth / duration
+        
+        gpu = _get_gpu_chirp() if device == "cuda" else None
+        if gpu is not None:
+            # GPU：逐元素核心直接產生 (num_chirps, samples) 信號矩陣
+            xp, kernel = gpu
+            t = xp.linspace(0, duration, samples, endpoint=False)
+            rates = xp.asarray(chirp_rates)[:, None]
+            starts = xp.asarray(start_freqs)[:, None]
+            signal_matrix = kernel(t, starts, rates,
+                                   xp.empty((num_chirps, samples), dtype=self.dtype))
+        else:
+            # 一次廣播計算 (num_chirps, samples) 的相位矩陣
+            xp = np
+            t = np.linspace(0, duration, samples, endpoint=False)
+            rates = chirp_rates[:, None]
+            starts = start_freqs[:, None]
+            phase = np.multiply.outer(0.5 * chirp_rates, t)
+            phase += starts
+            phase *= t
+            phase *= 2 * np.pi
+            signal_matrix = _phasor(phase, self.dtype)
+        windowed_matrix = signal_matrix * xp.asarray(self._get_window(samples))
+        freq_matrix = (rates * t).astype(self.real_dtype)
+        freq_matrix += starts
+        t = t.astype(self.real_dtype, copy=False)
+        
+        bank = ChirpBank(signal_matrix, windowed_matrix, freq_matrix, t,
+                         start_freqs, chirp_rates, directions,
+                         duration, chirp_bandwidth, sample_rate)
         
         # 組合信號
-        combined_signal = np.zeros_like(signals[0]['signal'])
-        for sig in signals:
-            combined_signal += sig['signal']
+        combined_signal = signal_matrix.sum(axis=0)
         
         return {
             'combined_signal': combined_signal,
-            'individual_signals': signals,
+            'signals': signal_matrix,
+            'start_freqs': start_freqs,
+            'chirp_rates': chirp_rates,
+            'directions': directions,
+            'individual_signals': bank,
             'parameters': {
                 'num_chirps': num_chirps,
                 'individual_bandwidth': chirp_bandwidth,
@@ -210,7 +496,89 @@ class ChirpGenerator:
             }
         }
     
-    def encode_data_in_chirp(self, data_bits, encoding="direction"):
+    def generate_chirp_bank(self, reference, freq_offsets, rate_offsets=None):
+        """
+        由單一參考chirp調變出一組相近參數的chirp (模板庫)
+        
+        s_i(t) = s_ref(t) * exp(j2πΔf_i t) * exp(jπΔk_i t²)，
+        參考chirp的完整相位只算一次，頻率偏移以短查找表相乘產生
+        
+        Parameters:
+        -----------
+        reference : dict
+            generate_linear_chirp()的回傳值
+        freq_offsets : array_like
+            各模板的起始頻率偏移 Δf (Hz)
+        rate_offsets : array_like
+            各模板的調頻斜率偏移 Δk (Hz/s)，None表示與參考相同
+        
+        Returns:
+        --------
+        ChirpBank : 各模板的信號 (N, samples) 與參數
+        """
+        params = reference['parameters']
+        samples = params['samples']
+        duration = params['duration']
+        dt = duration / samples
+        freq_offsets = np.atleast_1d(np.asarray(freq_offsets, dtype=np.float64))
+        
+        signals = _tone_phasors(freq_offsets, samples, dt, self.dtype)
+        signals *= reference['signal']
+        
+        t = np.arange(samples) * dt
+        if rate_offsets is None:
+            rate_offsets = np.zeros_like(freq_offsets)
+        else:
+            rate_offsets = np.broadcast_to(np.asarray(rate_offsets, dtype=np.float64),
+                                           freq_offsets.shape)
+            if np.any(rate_offsets):
+                # 斜率偏移: exp(jπΔk t²) (t²無法拆成查找表，直接計算)
+                signals *= _phasor(np.multiply.outer(np.pi * rate_offsets, t * t), self.dtype)
+        
+        start_freqs = params['start_freq'] + freq_offsets
+        chirp_rates = params['chirp_rate'] + rate_offsets
+        freq_matrix = (chirp_rates[:, None] * t).astype(self.real_dtype)
+        freq_matrix += start_freqs[:, None]
+        
+        return ChirpBank(signals, signals * self._get_window(samples), freq_matrix,
+                         t.astype(self.real_dtype), start_freqs, chirp_rates,
+                         np.where(chirp_rates >= 0, 1.0, -1.0),
+                         duration, np.abs(chirp_rates) * duration, params['sample_rate'])
+    
+    def _generate_symbol_chirp(self, symbol, encoding):
+        """產生單一符號(0/1)對應的chirp"""
+        if encoding == "direction":
+            # 方向編碼: 0=上行, 1=下行
+            direction = "up" if symbol == 0 else "down"
+            return self.generate_linear_chirp(direction=direction)
+        
+        elif encoding == "frequency":
+            # 頻率編碼: 0=低頻, 1=高頻
+            start_freq = 0 if symbol == 0 else self.config.chirp_bandwidth/2
+            return self.generate_linear_chirp(start_freq=start_freq)
+        
+        elif encoding == "phase":
+            # 相位編碼: 0=0°, 1=180° (相位直接在產生時加入，信號與加窗信號一致)
+            return self.generate_linear_chirp(phase_offset=np.pi if symbol == 1 else 0.0)
+        
+        elif encoding == "duration":
+            # 持續時間編碼: 0=短, 1=長
+            duration = self.config.chirp_duration if symbol == 0 else self.config.chirp_duration * 1.5
+            return self.generate_linear_chirp(duration=duration)
+        
+        raise ValueError(f"不支援的編碼方式: {encoding}")
+    
+    def _bpsk_templates(self):
+        """相位編碼的兩個符號模板：chirp只產生一次，180°符號由取負得到"""
+        base = self.generate_linear_chirp()
+        # 以base為底只替換取負的信號，其餘鍵 (如'time') 與base一致
+        flipped = dict(base,
+                       signal=-base['signal'],
+                       windowed_signal=-base['windowed_signal'],
+                       parameters=dict(base['parameters'], phase_offset=np.pi))
+        return [base, flipped]
+    
+    def encode_data_in_chirp(self, data_bits, encoding="direction", stacked=False):
         """
         將數據編碼到Chirp參數中
         
@@ -220,41 +588,58 @@ class ChirpGenerator:
             要編碼的數據位元 (0或1)
         encoding : str
             編碼方式: "direction", "frequency", "phase", "duration"
+        stacked : bool
+            True時回傳 (N_bits, samples) 的二維信號陣列 'signals'，
+            取代逐位元的dict列表 (duration編碼長度不一，不支援)
+        
+        註：每種編碼只有兩種符號，相同符號的chirp共用同一組信號陣列，
+        呼叫端請勿原地修改回傳的信號。
         """
+        bit_rate = len(data_bits) / (len(data_bits) * self.config.chirp_duration)
+        
+        if stacked:
+            if encoding == "duration":
+                raise ValueError("duration編碼的chirp長度不一，無法堆疊為二維陣列")
+            symbols = (np.asarray(data_bits) != 0).astype(np.intp)
+            if encoding == "phase":
+                # BPSK: 單一模板乘上 ±1 符號向量，一次寫入 (N_bits, samples) 緩衝
+                templates = self._bpsk_templates()
+                template = templates[0]['signal']
+                signs = (1 - 2 * symbols).astype(self.real_dtype)
+                signals = np.empty((len(symbols), len(template)), dtype=self.dtype)
+                np.multiply(template, signs[:, None], out=signals)
+            else:
+                templates = [self._generate_symbol_chirp(symbol, encoding) for symbol in (0, 1)]
+                signals = np.stack([chirp['signal'] for chirp in templates])[symbols]
+            params = [chirp['parameters'] for chirp in templates]
+            return {
+                'signals': signals,
+                'start_freqs': np.array([p['start_freq'] for p in params])[symbols],
+                'directions': np.array([1.0 if p['direction'] == "up" else -1.0 for p in params])[symbols],
+                'durations': np.array([p['duration'] for p in params])[symbols],
+                'templates': templates,
+                'data_bits': data_bits,
+                'encoding_type': encoding,
+                'bit_rate': bit_rate
+            }
+        
         encoded_signals = []
+        # 符號(0/1) -> 已產生的chirp (相位編碼兩個符號共用一次產生)
+        templates = dict(enumerate(self._bpsk_templates())) if encoding == "phase" else {}
         
         for bit in data_bits:
-            if encoding == "direction":
-                # 方向編碼: 0=上行, 1=下行
-                direction = "up" if bit == 0 else "down"
-                chirp = self.generate_linear_chirp(direction=direction)
-                
-            elif encoding == "frequency":
-                # 頻率編碼: 0=低頻, 1=高頻
-                start_freq = 0 if bit == 0 else self.config.chirp_bandwidth/2
-                chirp = self.generate_linear_chirp(start_freq=start_freq)
-                
-            elif encoding == "phase":
-                # 相位編碼: 0=0°, 1=180°
-                chirp = self.generate_linear_chirp()
-                phase_shift = 0 if bit == 0 else np.pi
-                chirp['signal'] *= np.exp(1j * phase_shift)
-                
-            elif encoding == "duration":
-                # 持續時間編碼: 0=短, 1=長
-                duration = self.config.chirp_duration if bit == 0 else self.config.chirp_duration * 1.5
-                chirp = self.generate_linear_chirp(duration=duration)
-                
-            else:
-                raise ValueError(f"不支援的編碼方式: {encoding}")
-            
-            encoded_signals.append(chirp)
+            symbol = 0 if bit == 0 else 1
+            chirp = templates.get(symbol)
+            if chirp is None:
+                chirp = self._generate_symbol_chirp(symbol, encoding)
+                templates[symbol] = chirp
+            encoded_signals.append(dict(chirp))
         
         return {
             'encoded_signals': encoded_signals,
             'data_bits': data_bits,
             'encoding_type': encoding,
-            'bit_rate': len(data_bits) / (len(data_bits) * self.config.chirp_duration)
+            'bit_rate': bit_rate
         }
     
     def add_noise(self, signal, snr_db=20):
@@ -268,13 +653,13 @@ class ChirpGenerator:
         snr_db : float
             信號雜訊比 (dB)
         """
-        signal_power = np.mean(np.abs(signal) ** 2)
+        n = len(signal)
+        signal_power = np.vdot(signal, signal).real / n
         noise_power = signal_power / (10 ** (snr_db / 10))
         
-        # 產生複數高斯雜訊
-        noise_real = np.random.normal(0, np.sqrt(noise_power/2), len(signal))
-        noise_imag = np.random.normal(0, np.sqrt(noise_power/2), len(signal))
-        noise = noise_real + 1j * noise_imag
+        # 產生複數高斯雜訊 (實部/虛部一次抽樣，交錯排列後視為複數)
+        noise = self._rng.standard_normal(2 * n, dtype=self.real_dtype).view(self.dtype)
+        noise *= np.sqrt(noise_power / 2)
         
         noisy_signal = signal + noise
         
@@ -286,7 +671,41 @@ class ChirpGenerator:
             'noise_power': noise_power
         }
     
-    def analyze_chirp(self, chirp_data, plot=False):
+    def add_noise_batch(self, signal, snr_db=20, num_trials=1):
+        """
+        一次產生多次試驗的加雜訊信號 (蒙地卡羅SNR/BER掃描用)
+        
+        Parameters:
+        -----------
+        signal : np.array
+            原始信號 (長度N)
+        snr_db : float or array_like
+            信號雜訊比 (dB)，可為長度num_trials的陣列 (每列一個SNR)
+        num_trials : int
+            試驗次數
+            
+        Returns:
+        --------
+        dict : 'noisy_signal'/'noise' 為 (num_trials, N) 陣列，其餘同add_noise
+        """
+        n = len(signal)
+        signal_power = np.vdot(signal, signal).real / n
+        snr = np.broadcast_to(np.asarray(snr_db, dtype=np.float64), (num_trials,))
+        noise_power = signal_power / (10 ** (snr / 10))
+        
+        # 全部試驗的雜訊一次抽樣
+        noise = self._rng.standard_normal((num_trials, 2 * n), dtype=self.real_dtype).view(self.dtype)
+        noise *= np.sqrt(noise_power / 2)[:, None]
+        
+        return {
+            'noisy_signal': noise + signal,
+            'noise': noise,
+            'snr_db': snr_db,
+            'signal_power': signal_power,
+            'noise_power': noise_power
+        }
+    
+    def analyze_chirp(self, chirp_data, plot=False, fast_spectrum=False):
         """
         分析Chirp信號特性
         
@@ -296,28 +715,64 @@ class ChirpGenerator:
             generate_*_chirp()的回傳值
         plot : bool
             是否繪製分析圖
+        fast_spectrum : bool
+            以 rfft(real + imag) 的單邊譜近似頻譜包絡 (約快2倍)；
+            正負頻率成分會疊在一起，只適合粗估頻寬，不可用於精確頻譜
         """
         signal = chirp_data['signal']
-        time = chirp_data['time']
         params = chirp_data['parameters']
+        n = len(signal)
+        
+        if 'time' in chirp_data:
+            duration = chirp_data['time'][-1] - chirp_data['time'][0]
+        else:
+            duration = (n - 1) * params['duration'] / params['samples']
         
-        # 時域分析
+        # 唯讀信號 (如快取的chirp模板) 內容不會改變，信號與參數相同時可重用先前的分析結果
+        cache_key = None
+        if not plot and not signal.flags.writeable:
+            try:
+                cache_key = (id(signal), fast_spectrum, duration, frozenset(params.items()))
+                hash(cache_key)
+            except TypeError:  # 參數含不可雜湊的值時不快取
+                cache_key = None
+            else:
+                cached = self._analysis_cache.get(cache_key)
+                if cached is not None and cached[0] is signal:
+                    return _copy_analysis(cached[1])
+        
+        # 時域分析 (|signal|只算一次，功率以vdot計算不產生暫存陣列)
+        amplitude = np.abs(signal)
         time_analysis = {
-            'duration': time[-1] - time[0],
-            'samples': len(signal),
-            'amplitude_max': np.max(np.abs(signal)),
-            'amplitude_mean': np.mean(np.abs(signal)),
-            'power': np.mean(np.abs(signal) ** 2)
+            'duration': duration,
+            'samples': n,
+            'amplitude_max': amplitude.max(),
+            'amplitude_mean': amplitude.mean(),
+            'power': np.vdot(signal, signal).real / n
         }
         
         # 頻域分析
-        fft_signal = np.fft.fft(signal)
-        freqs = np.fft.fftfreq(len(signal), 1/params['sample_rate'])
+        if fast_spectrum:
+            fft_signal = _batch_fft(signal.real + signal.imag, onesided=True)
+            freqs = np.fft.rfftfreq(n, 1/params['sample_rate'])
+        else:
+            fft_signal = self._fft(signal)
+            freqs = np.fft.fftfreq(n, 1/params['sample_rate'])
+        
+        freq_stats = get_numba_kernel('freq_stats')
+        if freq_stats is not None:
+            # 融合核心：單次迴圈求峰值與質心，再由兩端掃描3dB頻寬
+            peak_freq, bandwidth_3db, centroid = freq_stats(fft_signal, freqs)
+        else:
+            magnitude = np.abs(fft_signal)
+            peak_freq = freqs[np.argmax(magnitude)]
+            bandwidth_3db = self._measure_bandwidth(freqs, magnitude)
+            centroid = np.dot(freqs, magnitude) / magnitude.sum()
         
         freq_analysis = {
-            'peak_freq': freqs[np.argmax(np.abs(fft_signal))],
-            'bandwidth_3db': self._measure_bandwidth(freqs, np.abs(fft_signal)),
-            'spectral_centroid': np.sum(freqs * np.abs(fft_signal)) / np.sum(np.abs(fft_signal))
+            'peak_freq': peak_freq,
+            'bandwidth_3db': bandwidth_3db,
+            'spectral_centroid': centroid
         }
         
         # 時頻分析 (簡化版)
@@ -327,41 +782,90 @@ class ChirpGenerator:
             'time_domain': time_analysis,
             'frequency_domain': freq_analysis,
             'spectrogram': spectrogram,
+            'spectrum': {'frequencies': freqs, 'fft': fft_signal},
             'parameters': params
         }
         
         if plot:
             self._plot_chirp_analysis(chirp_data, analysis)
         
+        if cache_key is not None:
+            if len(self._analysis_cache) >= self.ANALYSIS_CACHE_SIZE:
+                # 移除最早加入的項目
+                del self._analysis_cache[next(iter(self._analysis_cache))]
+            # 同時保存信號參照，避免信號被回收後id被重用；快取的陣列設為唯讀，呼叫端拿到的是副本
+            _freeze_arrays(analysis)
+            self._analysis_cache[cache_key] = (signal, analysis)
+            return _copy_analysis(analysis)
+        
         return analysis
     
+    def _fft(self, signal):
+        """計算FFT，配置提供快取的FFT計畫時優先使用"""
+        get_fft = getattr(self.config, 'get_fft', None)
+        if get_fft is None:
+            return np.fft.fft(signal)
+        # pyfftw計畫回傳內部緩衝，需複製保留
+        return np.array(get_fft(len(signal), signal.dtype)(signal))
+    
     def _measure_bandwidth(self, freqs, spectrum):
         """測量3dB頻寬"""
         peak_power = np.max(spectrum)
         half_power = peak_power / np.sqrt(2)  # -3dB
         
-        # 找到半功率點
-        indices = np.where(spectrum >= half_power)[0]
-        if len(indices) > 0:
-            return freqs[indices[-1]] - freqs[indices[0]]
-        else:
+        # 找到第一個與最後一個半功率點 (argmax於第一個True即停止，不建立索引陣列)
+        above = spectrum >= half_power
+        first = above.argmax()
+        if not above[first]:
             return 0
+        last = len(above) - 1 - above[::-1].argmax()
+        return freqs[last] - freqs[first]
+    
+    def _get_stft_window(self, nperseg):
+        """取得頻譜圖用的Tukey(0.25)窗 (與scipy.signal.spectrogram預設相同，快取唯讀)"""
+        key = ('tukey', nperseg)
+        window = self.signal_cache.get(key)
+        if window is None:
+            try:
+                from scipy.signal import get_window
+                window = get_window(('tukey', 0.25), nperseg).astype(self.real_dtype)
+                window.setflags(write=False)
+            except ImportError:
+                # 如果沒有scipy，改用Hanning窗
+                window = self._get_window(nperseg)
+            self.signal_cache[key] = window
+        return window
     
     def _compute_spectrogram(self, signal, sample_rate, nperseg=256):
-        """計算頻譜圖"""
-        from scipy import signal as scipy_signal
+        """計算頻譜圖 (零複製分幀 + 批次FFT，參數與scipy.signal.spectrogram預設相同)"""
+        nperseg = min(nperseg, len(signal))
+        hop = nperseg - nperseg // 8
+        window = self._get_stft_window(nperseg)
         
-        try:
-            f, t, Sxx = scipy_signal.spectrogram(signal, sample_rate, nperseg=nperseg)
-            return {'frequencies': f, 'times': t, 'spectrogram': Sxx}
-        except ImportError:
-            # 如果沒有scipy，使用簡化版本
-            return {'frequencies': [], 'times': [], 'spectrogram': []}
+        # 滑動視窗視圖分幀，去除各幀直流後加窗
+        frames = np.lib.stride_tricks.sliding_window_view(signal, nperseg)[::hop]
+        frames = frames - frames.mean(axis=-1, keepdims=True)
+        frames *= window
+        
+        onesided = not np.iscomplexobj(signal)
+        spectrum = _batch_fft(frames, onesided)
+        Sxx = spectrum.real ** 2
+        Sxx += spectrum.imag ** 2
+        Sxx *= 1.0 / (sample_rate * np.dot(window, window))  # 功率譜密度
+        if onesided:
+            # 單邊譜：除直流 (與偶數長度的Nyquist) 外能量加倍
+            Sxx[:, 1:nperseg - nperseg // 2 if nperseg % 2 == 0 else None] *= 2
+            freqs = np.fft.rfftfreq(nperseg, 1/sample_rate)
+        else:
+            freqs = np.fft.fftfreq(nperseg, 1/sample_rate)
+        times = (np.arange(len(frames)) * hop + nperseg / 2) / sample_rate
+        
+        return {'frequencies': freqs, 'times': times, 'spectrogram': Sxx.T}
     
     def _plot_chirp_analysis(self, chirp_data, analysis):
         """繪製Chirp分析圖"""
         signal = chirp_data['signal']
-        time = chirp_data['time']
+        time = self.chirp_time_axis(chirp_data)
         
         fig, axes = plt.subplots(2, 2, figsize=(12, 8))
         
@@ -374,9 +878,9 @@ class ChirpGenerator:
         axes[0, 0].legend()
         axes[0, 0].grid(True)
         
-        # 振幅頻譜
-        fft_signal = np.fft.fft(signal)
-        freqs = np.fft.fftfreq(len(signal), 1/chirp_data['parameters']['sample_rate'])
+        # 振幅頻譜 (沿用analyze_chirp的FFT結果)
+        fft_signal = analysis['spectrum']['fft']
+        freqs = analysis['spectrum']['frequencies']
         axes[0, 1].plot(freqs/1e6, 20*np.log10(np.abs(fft_signal)))
         axes[0, 1].set_xlabel('頻率 (MHz)')
         axes[0, 1].set_ylabel('幅度 (dB)')
@@ -413,7 +917,8 @@ class ChirpGenerator:
         filename : str
             檔案名稱
         format : str
-            "npy", "wav", "mat", "json"
+            "npy", "npz", "mat", "json"
+            (json中的陣列以base64原始位元組儲存，可用load_signal()讀回)
         """
         if filename is None:
             timestamp = int(time.time())
@@ -426,16 +931,24 @@ class ChirpGenerator:
         filepath = data_dir / f"{filename}.{format}"
         
         if format == "npy":
-            np.save(filepath, signal_data['signal'])
+            np.save(filepath, signal_data['signal'], allow_pickle=False)
+        
+        elif format == "npz":
+            # 壓縮保存所有陣列欄位
+            arrays = {key: value for key, value in signal_data.items()
+                      if isinstance(value, np.ndarray)}
+            np.savez_compressed(filepath, **arrays)
             
         elif format == "json":
-            # 轉換為可序列化的格式
+            # 轉換為可序列化的格式 (陣列整塊編碼，避免逐樣本轉成Python物件)
             serializable_data = {}
             for key, value in signal_data.items():
                 if isinstance(value, np.ndarray):
+                    value = np.ascontiguousarray(value)
                     serializable_data[key] = {
-                        'real': value.real.tolist(),
-                        'imag': value.imag.tolist() if np.iscomplexobj(value) else None
+                        'dtype': value.dtype.str,
+                        'shape': value.shape,
+                        'data_b64': base64.b64encode(value.tobytes()).decode('ascii')
                     }
                 else:
                     serializable_data[key] = value
@@ -453,6 +966,25 @@ class ChirpGenerator:
         
         print(f"信號已儲存至: {filepath}")
         return filepath
+    
+    @staticmethod
+    def load_signal(filepath):
+        """讀回save_signal()儲存的json信號檔 (兼容舊版real/imag列表格式)"""
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        
+        for key, value in data.items():
+            if not isinstance(value, dict):
+                continue
+            if 'data_b64' in value:
+                raw = bytearray(base64.b64decode(value['data_b64']))  # 可寫入的緩衝
+                data[key] = np.frombuffer(raw, dtype=value['dtype']).reshape(value['shape'])
+            elif 'real' in value:
+                array = np.asarray(value['real'])
+                if value.get('imag') is not None:
+                    array = array + 1j * np.asarray(value['imag'])
+                data[key] = array
+        return data
 
 def demo_chirp_generator():
     """演示Chirp產生器功能"""
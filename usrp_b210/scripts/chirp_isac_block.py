@@ -10,9 +10,13 @@ ChirpISAC自定義GNU Radio Block
 import numpy as np
 from pathlib import Path
 import json
+import logging
 import threading
 import time
 from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
 
 # 在腳本開始時就設置GNU Radio路徑
 import sys
@@ -66,26 +70,133 @@ except ImportError as e:
             sync_block = MockGRBlock
             io_signature = lambda x, y, z: None
 
+# FFT後端：scipy.fft可多執行緒，否則使用numpy
+try:
+    import scipy.fft as _fft
+    _FFT_KWARGS = {'workers': -1}
+    _next_fast_len = _fft.next_fast_len
+except ImportError:
+    _fft = np.fft
+    _FFT_KWARGS = {}
+    
+    def _next_fast_len(n):
+        """numpy沒有next_fast_len，改用2的冪次"""
+        return 1 << (n - 1).bit_length()
+
+# === 可選：CuPy GPU FFT (長序列匹配濾波，首次使用時才匯入) ===
+_GPU_FFT = None
+
+def _get_gpu_fft():
+    """取得(cupy模組, |X|²核心)，CuPy或CUDA不可用時回傳None"""
+    global _GPU_FFT
+    if _GPU_FFT is None:
+        try:
+            import cupy
+            cupy.cuda.runtime.getDeviceCount()
+            magsq = cupy.ElementwiseKernel(
+                'T x', 'F y',
+                'y = x.real() * x.real() + x.imag() * x.imag();',
+                'isac_magsq'
+            )
+            _GPU_FFT = (cupy, magsq)
+        except Exception:
+            # 未安裝CuPy或沒有CUDA裝置
+            _GPU_FFT = False
+    return _GPU_FFT or None
+
+try:
+    from scipy.signal import find_peaks
+except ImportError:
+    find_peaks = None
+
 # 導入配置和Chirp產生器
 sys_path = Path(__file__).parent.parent
-import sys
-sys.path.append(str(sys_path / "config"))
-sys.path.append(str(sys_path / "scripts"))
+for _dir in (str(sys_path / "config"), str(sys_path / "scripts")):
+    if _dir not in sys.path:  # 避免重複路徑讓每次import多掃描一次
+        sys.path.append(_dir)
 
 try:
     from hardware_verified_config import get_config
-    from chirp_generator import ChirpGenerator
+    from chirp_generator import ChirpGenerator, get_numba_kernel
     CONFIG = get_config()
 except ImportError:
     # 如果無法導入新配置，嘗試舊配置
     try:
         from b210_config import get_config
-        from chirp_generator import ChirpGenerator
+        from chirp_generator import ChirpGenerator, get_numba_kernel
         CONFIG = get_config()
     except ImportError as e:
         print(f"警告: 無法導入配置模組: {e}")
         CONFIG = None
 
+logger = logging.getLogger("ChirpISAC")
+
+_PACKET_KEYS = ('signal', 'parameters', 'n_samples')
+
+@dataclass(frozen=True, slots=True, eq=False)  # 含numpy陣列欄位，不由dataclass產生__eq__/__hash__
+class ChirpPacket(Mapping):
+    """快取的chirp模板 (唯讀complex64信號與產生參數)，可當作唯讀dict使用"""
+    signal: np.ndarray
+    parameters: dict
+    n_samples: int
+    
+    # === Mapping介面 (向後兼容 chirp['signal']、'signal' in chirp、dict(chirp)) ===
+    def __getitem__(self, key):
+        if key in _PACKET_KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def __iter__(self):
+        return iter(_PACKET_KEYS)
+    
+    def __len__(self):
+        return len(_PACKET_KEYS)
+    
+    def __eq__(self, other):
+        # 與dict相同的比較語意，信號陣列以內容比較 (Mapping預設的比較遇到陣列會出錯)
+        if self is other:
+            return True
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return (set(other) == set(_PACKET_KEYS)
+                and np.array_equal(self.signal, other['signal'])
+                and self.parameters == other['parameters']
+                and self.n_samples == other['n_samples'])
+    
+    __hash__ = None  # 與dict一樣不可雜湊
+    
+    def as_dict(self):
+        """轉換為dict (與Mapping視圖的鍵相同)"""
+        return {key: getattr(self, key) for key in _PACKET_KEYS}
+
+# generate_batch()的每chirp中繼資料
+_MODE_CODES = {'radar': 0, 'communication': 1}
+CHIRP_META_DTYPE = np.dtype([('mode', np.int8), ('angle', np.float32), ('bit', np.int8)])
+
+@dataclass(frozen=True, slots=True)
+class SourceStats:
+    """ChirpISAC信號源統計快照"""
+    chirps_generated: int
+    data_bits_sent: int
+    beam_scans: int
+    start_time: float
+    runtime_seconds: float
+    chirp_rate: float
+    data_rate: float
+    current_mode: str
+    beam_angle: float
+    
+    def __getitem__(self, key):
+        """dict風格存取 (向後兼容)"""
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def to_dict(self):
+        """轉換為dict"""
+        return asdict(self)
+
 class ChirpISACSource(gr.gr.sync_block):
     """
     ChirpISAC信號源Block
@@ -123,13 +234,18 @@ class ChirpISACSource(gr.gr.sync_block):
         self.sample_rate = sample_rate
         self.chirp_duration = chirp_duration
         self.bandwidth = bandwidth
-        self.mode = mode
+        self._apply_mode(mode)
         
         # 內部狀態
         self.chirp_generator = ChirpGenerator()
+        self._chirp_cache = {}  # 參數 -> 已產生的chirp (基頻樣本與beam角度無關)
         self.current_chirp = None
         self.chirp_index = 0
-        self.data_buffer = deque()
+        self._start_tick = time.monotonic()
+        self._last_tick = self._start_tick  # 混合模式時槽使用的時間 (work()內每次呼叫取樣一次)
+        self._bits = np.empty(0, dtype=np.uint8)  # 待傳送位元
+        self._bit_head = 0  # 下一個要傳送的位元索引
+        self._scan_idx = 0  # 下一個雷達chirp的掃描角度索引
         self.running = False
         
         # 模式特定參數
@@ -151,7 +267,7 @@ class ChirpISACSource(gr.gr.sync_block):
         """初始化雷達參數"""
         return {
             'scan_enabled': True,
-            'scan_angles': list(range(-45, 46, 10)),
+            'scan_angles': np.arange(-45, 46, 10, dtype=np.int16),
             'current_angle': 0,
             'dwell_time': 100e-3,
             'cfar_enabled': True
@@ -178,15 +294,38 @@ class ChirpISACSource(gr.gr.sync_block):
     def set_mode(self, mode):
         """設定工作模式"""
         if mode in ["radar", "communication", "hybrid"]:
-            self.mode = mode
-            print(f"模式切換至: {mode}")
+            self._apply_mode(mode)
+            logger.debug("模式切換至: %s", mode)
         else:
             raise ValueError(f"不支援的模式: {mode}")
     
-    def add_data_to_send(self, data_bits):
-        """添加要傳送的數據"""
-        self.data_buffer.extend(data_bits)
-        print(f"添加 {len(data_bits)} 位元到傳送緩衝區")
+    def _apply_mode(self, mode):
+        """設定模式並預先選好該模式的work()與chirp產生函數 (僅在模式切換時決定一次)"""
+        self.mode = mode
+        self._work_impl = self._work_radar_fast if mode == "radar" else self._work_generic
+        self._next_chirp = {
+            "radar": self._generate_radar_chirp,
+            "communication": self._generate_comm_chirp,
+            "hybrid": self._generate_hybrid_chirp,
+        }.get(mode, self._linear_chirp)  # 預設線性Chirp
+    
+    def add_data_to_send(self, data_bits, unpack_bytes=False):
+        """
+        添加要傳送的數據 (位元序列或uint8陣列)
+        
+        bytes預設與list相同，每個位元組為一個元素；unpack_bytes=True時才以MSB優先展開為8個位元
+        """
+        if isinstance(data_bits, (bytes, bytearray, memoryview)):
+            data = np.frombuffer(data_bits, dtype=np.uint8)
+            bits = np.unpackbits(data) if unpack_bytes else data.copy()
+        else:
+            bits = np.array(data_bits, dtype=np.uint8).ravel()  # 複製，避免與呼叫端共用記憶體
+        
+        # 丟棄已傳送的部分並附加新位元
+        pending = self._bits[self._bit_head:]
+        self._bits = np.concatenate((pending, bits)) if pending.size else bits
+        self._bit_head = 0
+        logger.debug("添加 %d 位元到傳送緩衝區", bits.size)
     
     def set_beam_angle(self, tx_angle, rx_angle=None):
         """設定beam角度"""
@@ -196,88 +335,136 @@ class ChirpISACSource(gr.gr.sync_block):
         else:
             self.beam_params['rx_beam_angle'] = tx_angle
         
-        print(f"Beam角度設定: TX={tx_angle}°, RX={self.beam_params['rx_beam_angle']}°")
+        # 雷達掃描時每個chirp都會呼叫，僅在DEBUG層級記錄
+        logger.debug("Beam角度設定: TX=%s°, RX=%s°", tx_angle, self.beam_params['rx_beam_angle'])
+    
+    def _cached_chirp(self, key, factory):
+        """取得快取的ChirpPacket，未快取時以factory()產生 (信號設為唯讀以保護快取)"""
+        chirp = self._chirp_cache.get(key)
+        if chirp is None:
+            generated = factory()
+            # 連續complex64，與輸出埠型別一致以便直接記憶體複製
+            signal = np.ascontiguousarray(generated['signal'], dtype=np.complex64)
+            signal.setflags(write=False)
+            chirp = self._chirp_cache[key] = ChirpPacket(
+                signal, generated.get('parameters', {}), len(signal))
+        return chirp
+    
+    def _linear_chirp(self, direction="up"):
+        """取得目前參數下的線性chirp (快取)"""
+        key = ('linear', direction, self.chirp_duration, self.bandwidth, self.sample_rate)
+        return self._cached_chirp(key, lambda: self.chirp_generator.generate_linear_chirp(
+            duration=self.chirp_duration,
+            bandwidth=self.bandwidth,
+            sample_rate=self.sample_rate,
+            direction=direction,
+            return_time=False  # ChirpPacket不含時間軸
+        ))
     
     def generate_next_chirp(self):
-        """產生下一個Chirp信號"""
-        if self.mode == "radar":
-            return self._generate_radar_chirp()
-        elif self.mode == "communication":
-            return self._generate_comm_chirp()
-        elif self.mode == "hybrid":
-            return self._generate_hybrid_chirp()
-        else:
-            # 預設線性Chirp
-            return self.chirp_generator.generate_linear_chirp(
-                duration=self.chirp_duration,
-                bandwidth=self.bandwidth,
-                sample_rate=self.sample_rate
-            )
+        """產生下一個Chirp信號 (回傳快取的ChirpPacket)"""
+        self._last_tick = time.monotonic()  # 直接呼叫時以當下時間決定混合模式時槽
+        return self._next_chirp()
     
     def _generate_radar_chirp(self):
         """產生雷達用Chirp"""
         # 根據beam掃描調整參數
-        if self.radar_params['scan_enabled']:
-            angle_idx = self.chirp_index % len(self.radar_params['scan_angles'])
-            current_angle = self.radar_params['scan_angles'][angle_idx]
-            self.set_beam_angle(current_angle)
+        self._advance_radar_beam()
         
         # 產生線性Chirp用於雷達
-        chirp = self.chirp_generator.generate_linear_chirp(
-            duration=self.chirp_duration,
-            bandwidth=self.bandwidth,
-            sample_rate=self.sample_rate,
-            direction="up"
-        )
+        chirp = self._linear_chirp("up")
         
         self.stats['beam_scans'] += 1
         return chirp
     
+    def _advance_radar_beam(self, steps=1):
+        """掃描前進steps個chirp，beam設為最後一個chirp的角度"""
+        if self.radar_params['scan_enabled']:
+            angles = self.radar_params['scan_angles']
+            idx = (self._scan_idx + steps - 1) % len(angles)
+            self._scan_idx = idx + 1 if idx + 1 < len(angles) else 0
+            self.set_beam_angle(int(angles[idx]))
+    
     def _generate_comm_chirp(self):
         """產生通訊用Chirp"""
-        if not self.data_buffer:
+        if self._bit_head >= len(self._bits):
             # 沒有數據時產生空載Chirp
-            return self.chirp_generator.generate_linear_chirp(
-                duration=self.chirp_duration,
-                bandwidth=self.bandwidth,
-                sample_rate=self.sample_rate
-            )
+            return self._linear_chirp()
         
         # 從緩衝區取得數據位元
-        data_bit = self.data_buffer.popleft()
+        data_bit = int(self._bits[self._bit_head])
+        self._bit_head += 1
         
         # 根據編碼方式產生Chirp
         if self.comm_params['encoding'] == 'direction':
             direction = "up" if data_bit == 0 else "down"
-            chirp = self.chirp_generator.generate_linear_chirp(
-                duration=self.chirp_duration,
-                bandwidth=self.bandwidth,
-                sample_rate=self.sample_rate,
-                direction=direction
-            )
+            chirp = self._linear_chirp(direction)
         else:
             # 其他編碼方式
-            encoded = self.chirp_generator.encode_data_in_chirp(
-                [data_bit], 
-                encoding=self.comm_params['encoding']
+            encoding = self.comm_params['encoding']
+            chirp = self._cached_chirp(
+                ('encoded', encoding, data_bit),
+                lambda: self.chirp_generator.encode_data_in_chirp(
+                    [data_bit], encoding=encoding)['encoded_signals'][0]
             )
-            chirp = encoded['encoded_signals'][0]
         
         self.stats['data_bits_sent'] += 1
         return chirp
     
-    def _generate_hybrid_chirp(self):
-        """產生混合模式Chirp"""
-        # 時分複用：根據時間決定是雷達還是通訊
-        current_time = time.time() - self.stats['start_time']
+    def _hybrid_slot(self):
+        """混合模式目前的時槽 (radar 或 communication)"""
+        # 時分複用：根據時間決定是雷達還是通訊 (使用最近一次取樣的時間)
+        current_time = self._last_tick - self._start_tick
         cycle_time = 100e-3  # 100ms週期
         phase = (current_time % cycle_time) / cycle_time
-        
-        if phase < 0.7:  # 70%時間用於雷達
+        return "radar" if phase < 0.7 else "communication"  # 雷達70%、通訊30%
+    
+    def _generate_hybrid_chirp(self):
+        """產生混合模式Chirp"""
+        if self._hybrid_slot() == "radar":
             return self._generate_radar_chirp()
-        else:  # 30%時間用於通訊
+        else:
             return self._generate_comm_chirp()
     
+    def generate_batch(self, num_chirps):
+        """
+        連續產生num_chirps個chirp，寫入單一連續的批次緩衝區 (SoA)
+        
+        Returns:
+        --------
+        signals : ndarray
+            (num_chirps, 樣本數) complex64，每列為一個chirp
+        meta : ndarray
+            CHIRP_META_DTYPE結構陣列：mode (0=雷達, 1=通訊, -1=預設)、
+            angle (雷達beam角度)、bit (傳送的位元，-1表示無)
+        """
+        meta = np.empty(num_chirps, dtype=CHIRP_META_DTYPE)
+        signals = None
+        for i in range(num_chirps):
+            self._last_tick = time.monotonic()
+            kind = self._hybrid_slot() if self.mode == "hybrid" else self.mode
+            bit = -1
+            if kind == "radar":
+                chirp = self._generate_radar_chirp()
+            elif kind == "communication":
+                if self._bit_head < len(self._bits):
+                    bit = self._bits[self._bit_head]
+                chirp = self._generate_comm_chirp()
+            else:
+                chirp = self._linear_chirp()
+            
+            signal = chirp.signal
+            if signals is None:
+                signals = np.empty((num_chirps, len(signal)), dtype=np.complex64)
+            elif len(signal) != signals.shape[1]:
+                raise ValueError(f"chirp長度不一致 ({len(signal)} != {signals.shape[1]})，無法組成批次")
+            signals[i] = signal
+            meta[i] = (_MODE_CODES.get(kind, -1), self.beam_params['tx_beam_angle'], bit)
+        
+        if signals is None:
+            signals = np.empty((0, self._linear_chirp().n_samples), dtype=np.complex64)
+        return signals, meta
+    
     def work(self, input_items, output_items):
         """
         GNU Radio work函數
@@ -287,59 +474,100 @@ class ChirpISACSource(gr.gr.sync_block):
             # 模擬模式下的簡單處理
             return self._mock_work(output_items)
         
-        output = output_items[0]
-        
-        # 如果沒有當前Chirp或已經用完，產生新的
-        if (self.current_chirp is None or 
-            self.chirp_index >= len(self.current_chirp['signal'])):
+        self._last_tick = time.monotonic()
+        return self._work_impl(output_items[0])
+    
+    def _work_generic(self, output):
+        """通用work實作：逐chirp呼叫generate_next_chirp()"""
+        filled = 0
+        
+        # 一次呼叫填滿整個輸出緩衝區 (跨越多個Chirp)
+        while filled < len(output):
+            # 如果沒有當前Chirp或已經用完，產生新的
+            if (self.current_chirp is None or
+                self.chirp_index >= len(self.current_chirp)):
+                
+                self.current_chirp = self._next_chirp().signal  # 時槽沿用work()取樣的時間
+                self.chirp_index = 0
+                self.stats['chirps_generated'] += 1
             
-            chirp_data = self.generate_next_chirp()
-            self.current_chirp = chirp_data['signal']
-            self.chirp_index = 0
-            self.stats['chirps_generated'] += 1
-        
-        # 填充輸出緩衝區
-        samples_to_output = min(len(output), 
-                              len(self.current_chirp) - self.chirp_index)
-        
-        output[:samples_to_output] = self.current_chirp[
-            self.chirp_index:self.chirp_index + samples_to_output
-        ]
-        
-        self.chirp_index += samples_to_output
-        
-        return samples_to_output
+            samples_to_output = min(len(output) - filled,
+                                    len(self.current_chirp) - self.chirp_index)
+            
+            np.copyto(output[filled:filled + samples_to_output],
+                      self.current_chirp[self.chirp_index:self.chirp_index + samples_to_output],
+                      casting='no')
+            
+            self.chirp_index += samples_to_output
+            filled += samples_to_output
+        
+        return filled
+    
+    def _work_radar_fast(self, output):
+        """雷達模式穩態：將同一個快取chirp重複鋪滿輸出 (純記憶體複製)"""
+        chirp = self._linear_chirp("up").signal
+        if self.current_chirp is not chirp:
+            # 剛切換模式，先由通用路徑收尾上一個chirp
+            return self._work_generic(output)
+        
+        n = len(chirp)
+        out_len = len(output)
+        
+        # 補完目前chirp剩餘的樣本
+        head = min(out_len, n - self.chirp_index)
+        output[:head] = chirp[self.chirp_index:self.chirp_index + head]
+        self.chirp_index += head
+        if head == out_len:
+            return out_len
+        
+        # 整數個完整chirp以廣播一次寫入，再寫入尾端部分chirp
+        full, tail = divmod(out_len - head, n)
+        pos = head + full * n
+        if full:
+            output[head:pos].reshape(full, n)[...] = chirp
+        output[pos:] = chirp[:tail]
+        
+        new_chirps = full + (tail > 0)
+        self.chirp_index = tail if tail else n
+        
+        # 批次更新統計與beam掃描 (等同逐chirp呼叫_generate_radar_chirp)
+        self._advance_radar_beam(new_chirps)
+        self.stats['beam_scans'] += new_chirps
+        self.stats['chirps_generated'] += new_chirps
+        return out_len
     
     def _mock_work(self, output_items):
         """模擬GNU Radio work函數"""
+        self._last_tick = time.monotonic()
         # 在沒有GNU Radio的環境中模擬工作
         if hasattr(output_items, '__len__') and len(output_items) > 0:
             output_size = len(output_items[0]) if hasattr(output_items[0], '__len__') else 1024
         else:
             output_size = 1024
         
-        chirp_data = self.generate_next_chirp()
-        signal = chirp_data['signal']
+        chirp = self.generate_next_chirp()
         
         # 模擬輸出
-        samples_to_output = min(output_size, len(signal))
+        samples_to_output = min(output_size, chirp.n_samples)
         return samples_to_output
     
     def get_stats(self):
         """取得統計資訊"""
-        current_time = time.time()
-        runtime = current_time - self.stats['start_time']
-        
-        stats = self.stats.copy()
-        stats.update({
-            'runtime_seconds': runtime,
-            'chirp_rate': stats['chirps_generated'] / runtime if runtime > 0 else 0,
-            'data_rate': stats['data_bits_sent'] / runtime if runtime > 0 else 0,
-            'current_mode': self.mode,
-            'beam_angle': self.beam_params['tx_beam_angle']
-        })
-        
-        return stats
+        stats = self.stats
+        runtime = time.time() - stats['start_time']
+        
+        # 直接建立唯讀快照，不複製stats dict
+        return SourceStats(
+            chirps_generated=stats['chirps_generated'],
+            data_bits_sent=stats['data_bits_sent'],
+            beam_scans=stats['beam_scans'],
+            start_time=stats['start_time'],
+            runtime_seconds=runtime,
+            chirp_rate=stats['chirps_generated'] / runtime if runtime > 0 else 0,
+            data_rate=stats['data_bits_sent'] / runtime if runtime > 0 else 0,
+            current_mode=self.mode,
+            beam_angle=self.beam_params['tx_beam_angle']
+        )
     
     def print_stats(self):
         """印出統計資訊"""
@@ -385,14 +613,20 @@ class ChirpISACProcessor(gr.gr.sync_block):
         self.sample_rate = sample_rate
         self.processing_mode = processing_mode
         
-        # 處理緩衝區
-        self.input_buffer = deque(maxlen=10000)
+        # 處理緩衝區 (輸入樣本使用環形緩衝，避免逐樣本建立Python物件)
+        self.input_buffer = np.zeros(10000, dtype=np.complex64)
+        self._input_head = 0  # 下一個寫入位置
+        self._input_count = 0  # 已寫入的有效樣本數 (上限為緩衝容量)
         self.processing_results = deque(maxlen=1000)
         
         # 雷達處理參數
         self.radar_processor = RadarProcessor()
         self.comm_processor = CommunicationProcessor()
         
+        # "both"模式下雷達與通訊平行處理 (numpy FFT/向量運算會釋放GIL)
+        self.parallel_min_samples = 16384  # 輸入少於此長度時執行緒開銷大於收益，循序處理
+        self._pool = None
+        
         print(f"ChirpISAC Processor初始化完成 - 模式: {processing_mode}")
     
     def work(self, input_items, output_items):
@@ -404,24 +638,63 @@ class ChirpISACProcessor(gr.gr.sync_block):
         output = output_items[0]
         
         # 添加到處理緩衝區
-        self.input_buffer.extend(input_signal)
+        self._append_input(input_signal)
         
         # 處理信號
-        if self.processing_mode in ["radar", "both"]:
-            radar_result = self.radar_processor.process(input_signal)
-            if radar_result:
-                self.processing_results.append(('radar', radar_result))
-        
-        if self.processing_mode in ["communication", "both"]:
-            comm_result = self.comm_processor.process(input_signal)
-            if comm_result:
-                self.processing_results.append(('communication', comm_result))
+        self._process(input_signal)
         
         # 直接傳遞信號（或處理後的信號）
         output[:] = input_signal
         
         return len(input_signal)
     
+    def _process(self, input_signal):
+        """依處理模式執行雷達/通訊處理，結果依序加入processing_results"""
+        radar_result = comm_result = None
+        if (self.processing_mode == "both" and
+                len(input_signal) >= self.parallel_min_samples):
+            # 兩個處理器共用唯讀輸入，牆鐘時間為兩者的最大值而非總和
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ChirpISAC")
+            radar_future = self._pool.submit(self.radar_processor.process, input_signal)
+            comm_result = self.comm_processor.process(input_signal)
+            radar_result = radar_future.result()
+        else:
+            if self.processing_mode in ["radar", "both"]:
+                radar_result = self.radar_processor.process(input_signal)
+            if self.processing_mode in ["communication", "both"]:
+                comm_result = self.comm_processor.process(input_signal)
+        
+        if radar_result:
+            self.processing_results.append(('radar', radar_result))
+        if comm_result:
+            self.processing_results.append(('communication', comm_result))
+    
+    def stop(self):
+        """流程圖停止時釋放處理執行緒"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        return True
+    
+    def _append_input(self, samples):
+        """寫入環形輸入緩衝 (超過容量時只保留最新的樣本)"""
+        size = len(self.input_buffer)
+        samples = samples[-size:]
+        n = len(samples)
+        first = min(n, size - self._input_head)
+        self.input_buffer[self._input_head:self._input_head + first] = samples[:first]
+        self.input_buffer[:n - first] = samples[first:]
+        self._input_head = (self._input_head + n) % size
+        self._input_count = min(self._input_count + n, size)
+    
+    def get_recent_input(self):
+        """依時間順序取得環形緩衝中的有效輸入樣本 (複本，不含未寫入的零填充)"""
+        if self._input_count < len(self.input_buffer):
+            # 尚未繞回：有效樣本即緩衝開頭到寫入位置
+            return self.input_buffer[:self._input_count].copy()
+        return np.roll(self.input_buffer, -self._input_head)
+    
     def _mock_work(self, input_items, output_items):
         """模擬處理函數"""
         # 模擬信號處理
@@ -442,6 +715,9 @@ class RadarProcessor:
         self.matched_filter_template = None
         self.range_bins = 512
         self.detection_threshold = 0.5
+        self.min_peak_distance = None  # 峰值最小間隔 (樣本)，None表示不限制
+        self._fft_lengths = {}  # 信號長度 -> FFT長度
+        self.gpu_min_samples = 1 << 20  # 超過此長度的複數信號改用GPU FFT (若可用)
     
     def process(self, signal):
         """處理雷達信號"""
@@ -449,13 +725,17 @@ class RadarProcessor:
         if len(signal) < 100:
             return None
         
+        # 統一為連續單精度 (與GNU Radio串流相同)；實數信號保留實數以使用rfft
+        dtype = np.float32 if np.isrealobj(signal) else np.complex64
+        signal = np.ascontiguousarray(signal, dtype=dtype)
+        
         # 匹配濾波
         correlation = self._matched_filter(signal)
         
         # 峰值檢測
         peaks = self._detect_peaks(correlation)
         
-        if peaks:
+        if peaks.size:
             # 距離估算
             ranges = self._estimate_ranges(peaks)
             return {
@@ -469,35 +749,73 @@ class RadarProcessor:
     
     def _matched_filter(self, signal):
         """匹配濾波器"""
-        # 簡化的自相關
-        return np.correlate(signal, signal, mode='full')
+        # 簡化的自相關：以FFT計算 (O(N log N))，結果與np.correlate(..., mode='full')相同
+        n = len(signal)
+        nfft = self._fft_lengths.get(n)
+        if nfft is None:
+            nfft = self._fft_lengths[n] = _next_fast_len(2 * n - 1)
+        
+        gpu = _get_gpu_fft() if n >= self.gpu_min_samples else None
+        if gpu is not None and not np.isrealobj(signal):
+            return self._matched_filter_gpu(gpu, signal, nfft)
+        
+        if np.isrealobj(signal):
+            # 實數信號：rfft只計算一半頻譜，功率譜為實數
+            spectrum = _fft.rfft(signal, nfft, **_FFT_KWARGS)
+            power = spectrum.real ** 2 + spectrum.imag ** 2
+            circular = _fft.irfft(power, nfft, **_FFT_KWARGS)
+            # 循環相關重排為 -(n-1) ~ n-1 的延遲順序
+            return np.concatenate((circular[nfft - n + 1:], circular[:n]))
+        
+        # 複數信號：直接取實數功率譜|X|²，不建立X*conj(X)的複數暫存
+        spectrum = _fft.fft(signal, nfft, **_FFT_KWARGS)
+        power = np.square(spectrum.real)
+        power += np.square(spectrum.imag)
+        return self._lags_from_power(_fft.rfft(power, **_FFT_KWARGS), n, nfft)
+    
+    @staticmethod
+    def _lags_from_power(half, n, nfft):
+        """由實數功率譜的rfft組出 -(n-1) ~ n-1 延遲的自相關
+        
+        ifft(P) = conj(fft(P))/nfft，且自相關共軛對稱 r[-m] = conj(r[m])，
+        nfft >= 2n-1 保證所需延遲都落在rfft的半邊頻譜內
+        """
+        lags = half[:n].conj()
+        lags /= nfft
+        return np.concatenate((lags[:0:-1].conj(), lags))
+    
+    def _matched_filter_gpu(self, gpu, signal, nfft):
+        """GPU上的FFT自相關 (cuFFT計畫由CuPy依長度快取重用，|X|²以單一核心計算)"""
+        cp, magsq = gpu
+        n = len(signal)
+        spectrum = cp.fft.fft(cp.asarray(signal), nfft)
+        power = magsq(spectrum, cp.empty(nfft, dtype=spectrum.real.dtype))
+        return cp.asnumpy(self._lags_from_power(cp.fft.rfft(power), n, nfft))
     
     def _detect_peaks(self, correlation):
-        """峰值檢測"""
-        threshold = np.max(np.abs(correlation)) * self.detection_threshold
-        peaks = []
+        """峰值檢測 (回傳峰值索引陣列)"""
+        magnitude = np.abs(correlation)
+        threshold = magnitude.max() * self.detection_threshold
         
-        for i in range(1, len(correlation)-1):
-            if (abs(correlation[i]) > threshold and
-                abs(correlation[i]) > abs(correlation[i-1]) and
-                abs(correlation[i]) > abs(correlation[i+1])):
-                peaks.append(i)
+        if find_peaks is not None:
+            return find_peaks(magnitude, height=threshold,
+                              distance=self.min_peak_distance)[0]
         
-        return peaks
+        # 高於門檻且大於左右相鄰樣本的局部極大值
+        center = magnitude[1:-1]
+        is_peak = center > threshold
+        is_peak &= center > magnitude[:-2]
+        is_peak &= center > magnitude[2:]
+        return np.flatnonzero(is_peak) + 1
     
     def _estimate_ranges(self, peaks):
         """估算距離"""
         # 簡化的距離估算
         c = 3e8  # 光速
         sample_rate = 30e6
-        ranges = []
-        
-        for peak in peaks:
-            time_delay = peak / sample_rate
-            range_m = time_delay * c / 2
-            ranges.append(range_m)
         
-        return ranges
+        # 時間延遲 -> 來回距離的一半
+        return peaks * (c / 2 / sample_rate)
 
 class CommunicationProcessor:
     """通訊信號處理器"""
@@ -512,6 +830,8 @@ class CommunicationProcessor:
         if len(signal) < 100:
             return None
         
+        signal = np.ascontiguousarray(signal, dtype=np.complex64)
+        
         # Chirp解調
         demodulated_bits = self._demodulate_chirp(signal)
         
@@ -530,9 +850,12 @@ class CommunicationProcessor:
         # 簡化的方向檢測
         # 實際實現會更複雜
         
-        # 計算頻率變化方向
-        phase_diff = np.diff(np.angle(signal))
-        avg_phase_diff = np.mean(phase_diff)
+        # 計算頻率變化方向：相鄰樣本共軛乘積的相位即相位差 (不需先取angle再diff)
+        kernel = get_numba_kernel('mean_phase_diff')
+        if kernel is not None:
+            avg_phase_diff = kernel(signal)
+        else:
+            avg_phase_diff = np.angle(signal[1:] * signal[:-1].conj()).mean()
         
         # 根據相位變化判斷Chirp方向
         if avg_phase_diff > 0:
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chirp產生的Numba融合核心
+由chirp_generator.get_numba_kernel()在第一次需要時延遲匯入 (需安裝numba)，
+cache=True會將編譯結果存於__pycache__，之後的執行不需重新JIT
+作者: TMYTEK ISAC Lab
+"""
+
+import math
+
+from numba import njit, prange
+
+@njit(parallel=True, fastmath=True, cache=True)
+def linear_chirp_kernel(dt, start_freq, k, phase0, freq_out, signal_out, windowed_out):
+    """單次迴圈寫出瞬時頻率、信號與加窗信號 (時間軸不落地，phase0為初始相位)"""
+    samples = signal_out.shape[0]
+    two_pi = 2.0 * math.pi
+    half_k = 0.5 * k
+    denom = max(samples - 1, 1)
+    for i in prange(samples):
+        t = i * dt
+        phase = two_pi * t * (start_freq + half_k * t) + phase0  # Horner形式
+        sig = math.cos(phase) + 1j * math.sin(phase)
+        freq_out[i] = start_freq + k * t
+        signal_out[i] = sig
+        windowed_out[i] = sig * (0.5 - 0.5 * math.cos(two_pi * i / denom))
+
+@njit(fastmath=True, cache=True)
+def freq_stats(fft_signal, freqs):
+    """回傳 (峰值頻率, 3dB頻寬, 頻譜質心)，與analyze_chirp的NumPy版本定義相同"""
+    n = fft_signal.shape[0]
+    peak = 0.0
+    peak_idx = 0
+    total = 0.0
+    weighted = 0.0
+    for i in range(n):
+        a = abs(fft_signal[i])
+        total += a
+        weighted += freqs[i] * a
+        if a > peak:
+            peak = a
+            peak_idx = i
+    
+    # 第一個與最後一個半功率點
+    half_power = peak / math.sqrt(2.0)
+    first = 0
+    while first < n and abs(fft_signal[first]) < half_power:
+        first += 1
+    if first == n:
+        return freqs[peak_idx], 0.0, weighted / total
+    last = n - 1
+    while abs(fft_signal[last]) < half_power:
+        last -= 1
+    return freqs[peak_idx], freqs[last] - freqs[first], weighted / total
+
+@njit(fastmath=True, cache=True)
+def mean_phase_diff(signal):
+    """相鄰樣本相位差的平均 (共軛乘積的atan2，自動處理±π折返)"""
+    n = signal.shape[0]
+    acc = 0.0
+    for i in range(1, n):
+        a = signal[i]
+        b = signal[i - 1]
+        acc += math.atan2(a.imag * b.real - a.real * b.imag,
+                          a.real * b.real + a.imag * b.imag)
+    return acc / (n - 1)
+
+@njit(parallel=True, cache=True)
+def nonlinear_chirp_kernel(kind, dt, k, alpha, time_out, freq_out, signal_out):
+    """非線性chirp (kind: 0=quadratic, 1=logarithmic, 2=exponential)
+    
+    類型分支位於prange迴圈外；不使用fastmath，exponential的相位常數項很大，
+    需與NumPy版本相同的運算順序
+    """
+    samples = signal_out.shape[0]
+    two_pi = 2.0 * math.pi
+    if kind == 0:
+        scale = two_pi * k / (alpha + 1)
+        for i in prange(samples):
+            t = i * dt
+            t_alpha = t ** alpha
+            time_out[i] = t
+            freq_out[i] = k * t_alpha
+            phase = scale * (t_alpha * t)
+            signal_out[i] = math.cos(phase) + 1j * math.sin(phase)
+    elif kind == 1:
+        scale = two_pi * k / alpha
+        for i in prange(samples):
+            t = i * dt
+            alpha_t = alpha * t
+            log_term = math.log1p(alpha_t)
+            time_out[i] = t
+            freq_out[i] = k * log_term
+            phase = scale * ((1 + alpha_t) * log_term - alpha_t)
+            signal_out[i] = math.cos(phase) + 1j * math.sin(phase)
+    else:
+        scale = two_pi * k
+        for i in prange(samples):
+            t = i * dt
+            exp_term = math.exp(alpha * t)
+            time_out[i] = t
+            freq_out[i] = k * (exp_term - 1)
+            phase = scale * (exp_term / alpha - t)
+            signal_out[i] = math.cos(phase) + 1j * math.sin(phase)
+
+@njit(fastmath=True, cache=True)
+def cw_tone(out, fs, freq):
+    """單次迴圈寫出連續波 exp(j2πf·i/fs) (週期數先取小數部分，長串流也保持相位精度)"""
+    step = freq / fs
+    two_pi = 2.0 * math.pi
+    for i in range(out.shape[0]):
+        cycles = i * step
+        phase = two_pi * (cycles - math.floor(cycles))
+        out[i] = math.cos(phase) + 1j * math.sin(phase)
+
+@njit(fastmath=True, cache=True)
+def linear_chirp(out, fs, start_freq, k):
+    """單次迴圈寫出線性chirp exp(j2π(f0·t + k·t²/2)) (只輸出信號，硬體測試用)"""
+    two_pi = 2.0 * math.pi
+    half_k = 0.5 * k
+    for i in range(out.shape[0]):
+        t = i / fs
+        phase = two_pi * t * (start_freq + half_k * t)
+        out[i] = math.cos(phase) + 1j * math.sin(phase)
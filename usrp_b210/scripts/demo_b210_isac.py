@@ -7,12 +7,23 @@ USRP B210 ISAC系統 - 完整功能演示
 """
 
 import sys
+import io
+import os
+import logging
 import numpy as np
 import time
+from contextlib import nullcontext, redirect_stdout
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # 添加路徑
-sys.path.append(str(Path(__file__).parent.parent / "config"))
+_config_dir = str(Path(__file__).parent.parent / "config")
+if _config_dir not in sys.path:  # 子行程重新匯入時不再加長sys.path
+    sys.path.append(_config_dir)
+
+# 逐Chirp的細節訊息走DEBUG層級 (--verbose 開啟)，避免輸出拖慢產生迴圈
+logger = logging.getLogger("ISACDemo")
 
 def test_config_system():
     """測試配置系統"""
@@ -146,7 +157,7 @@ def test_gnuradio_blocks():
         
         # 測試信號產生
         chirp_data = source.generate_next_chirp()
-        print(f"   ✅ Chirp產生成功: {len(chirp_data['signal'])} 樣本")
+        print(f"   ✅ Chirp產生成功: {chirp_data.n_samples} 樣本")
         
         # 測試模式切換
         for mode in ["radar", "communication", "hybrid"]:
@@ -172,7 +183,7 @@ def test_gnuradio_blocks():
             flowgraph.run()
         else:
             # 手動測試work函數
-            mock_output = [np.zeros(1024, dtype=np.complex64)]
+            mock_output = [np.empty(1024, dtype=np.complex64)]  # _mock_work不讀取內容，免去清零
             result = source._mock_work(mock_output)
             print(f"   ✅ 模擬運行成功: 輸出 {result} 樣本")
         
@@ -201,6 +212,7 @@ def test_platform_compatibility():
     try:
         import platform
         import os
+        from importlib.util import find_spec
         
         # 檢測平台
         system = platform.system()
@@ -214,30 +226,32 @@ def test_platform_compatibility():
         required_modules = ['numpy', 'pathlib', 'json', 'time', 'collections']
         available_modules = []
         
+        # 只查找模組規格，不實際執行匯入 (scipy/gnuradio初始化很耗時)
         for module in required_modules:
-            try:
-                __import__(module)
+            if find_spec(module) is not None:
                 available_modules.append(module)
                 print(f"   ✅ {module}: 可用")
-            except ImportError:
+            else:
                 print(f"   ❌ {module}: 不可用")
         
         # 檢查可選模組
         optional_modules = ['matplotlib', 'scipy', 'gnuradio']
         for module in optional_modules:
-            try:
-                __import__(module)
+            if find_spec(module) is not None:
                 print(f"   ✅ {module}: 可用 (可選)")
-            except ImportError:
+            else:
                 print(f"   ⚠️  {module}: 不可用 (可選)")
         
         # 檢查檔案系統
         current_dir = Path(__file__).parent.parent
         required_dirs = ['config', 'scripts', 'tests', 'docs']
         
+        # 一次讀取目錄內容，取代逐一stat每個子目錄
+        with os.scandir(current_dir) as entries:
+            existing_dirs = {entry.name for entry in entries if entry.is_dir()}
+        
         for dir_name in required_dirs:
-            dir_path = current_dir / dir_name
-            if dir_path.exists():
+            if dir_name in existing_dirs:
                 print(f"   ✅ 目錄 {dir_name}: 存在")
             else:
                 print(f"   ❌ 目錄 {dir_name}: 不存在")
@@ -301,19 +315,22 @@ def test_system_integration():
         # 雷達模式
         source.set_mode("radar")
         radar_chirp = source.generate_next_chirp()
-        print(f"   ✅ 雷達Chirp: {len(radar_chirp['signal'])} 樣本")
+        print(f"   ✅ 雷達Chirp: {radar_chirp.n_samples} 樣本")
         
         # 通訊模式
         source.set_mode("communication")
         source.add_data_to_send([1, 0, 1, 1])
         comm_chirp = source.generate_next_chirp()
-        print(f"   ✅ 通訊Chirp: {len(comm_chirp['signal'])} 樣本")
+        print(f"   ✅ 通訊Chirp: {comm_chirp.n_samples} 樣本")
         
         # 混合模式
         source.set_mode("hybrid")
+        hybrid_samples = 0
         for i in range(5):
             hybrid_chirp = source.generate_next_chirp()
-            print(f"   ✅ 混合模式Chirp {i+1}: {len(hybrid_chirp['signal'])} 樣本")
+            hybrid_samples += hybrid_chirp.n_samples
+            logger.debug("混合模式Chirp %d: %d 樣本", i + 1, hybrid_chirp.n_samples)
+        print(f"   ✅ 混合模式Chirp: 5 個, 共 {hybrid_samples} 樣本")
         
         # 5. Beam掃描模擬
         print("5.3 Beam掃描模擬...")
@@ -321,7 +338,8 @@ def test_system_integration():
         for angle in scan_angles:
             source.set_beam_angle(angle)
             beam_chirp = source.generate_next_chirp()
-            print(f"   ✅ Beam角度 {angle}°: 信號產生成功")
+            logger.debug("Beam角度 %d°: %d 樣本", angle, beam_chirp.n_samples)
+        print(f"   ✅ Beam角度 {scan_angles}°: 信號產生成功")
         
         # 6. 統計資訊檢查
         stats = source.get_stats()
@@ -342,8 +360,36 @@ def test_system_integration():
         print(f"❌ 系統整合測試失敗: {e}")
         return {'success': False, 'error': str(e)}
 
-def run_comprehensive_demo():
-    """執行完整演示"""
+@dataclass(frozen=True, slots=True)
+class DemoResult:
+    """單項演示測試結果"""
+    name: str
+    success: bool
+    details: dict = field(default_factory=dict)
+    error: str = ''
+
+def _preload_modules():
+    """預先匯入各測試使用的模組並預熱Numba核心 (測試內的import只會命中sys.modules)"""
+    for module in ('hardware_verified_config', 'chirp_generator', 'chirp_isac_block'):
+        try:
+            __import__(module)
+        except ImportError:
+            pass  # 由各測試回報匯入失敗
+    
+    chirp_generator = sys.modules.get('chirp_generator')
+    if chirp_generator is not None and chirp_generator.NUMBA_AVAILABLE:
+        # 觸發JIT (cache=True時由__pycache__載入)，避免計入第一個chirp測試
+        chirp_generator.ChirpGenerator().generate_linear_chirp()
+
+def _run_captured(test_func):
+    """在子行程執行測試，回傳 (結果, 輸出文字) 以便依序印出"""
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        result = test_func()
+    return result, buffer.getvalue()
+
+def run_comprehensive_demo(parallel=True):
+    """執行完整演示 (parallel=True時各測試互相獨立，以多行程同時執行；單核心時自動依序執行)"""
     print("🚀 USRP B210 ISAC系統 - 完整功能演示")
     print("=" * 60)
     print("注意: 此演示不需要硬體，純軟體功能驗證")
@@ -358,33 +404,50 @@ def run_comprehensive_demo():
         ("系統整合", test_system_integration)
     ]
     
-    results = {}
-    passed = 0
+    results = []  # DemoResult列表，依測試順序
     
-    for test_name, test_func in tests:
-        try:
-            result = test_func()
-            results[test_name] = result
-            if result['success']:
-                passed += 1
-                print(f"\n✅ {test_name}: 通過")
-            else:
-                print(f"\n❌ {test_name}: 失敗")
-                if 'error' in result:
-                    print(f"   錯誤: {result['error']}")
-        except Exception as e:
-            print(f"\n💥 {test_name}: 異常 - {e}")
-            results[test_name] = {'success': False, 'error': str(e)}
+    # 在建立子行程前載入，子行程 (fork) 可直接沿用已載入的模組
+    _preload_modules()
+    
+    # 單核心時多行程只會增加啟動與重複匯入的開銷
+    workers = min(len(tests), os.cpu_count() or 1)
+    parallel = parallel and workers > 1
+    with ProcessPoolExecutor(max_workers=workers) if parallel else nullcontext() as executor:
+        # 例外離開時仍會關閉行程池
+        if parallel:
+            futures = [executor.submit(_run_captured, test_func) for _, test_func in tests]
+        
+        # 依原順序收集結果並印出各測試的輸出
+        for i, (test_name, test_func) in enumerate(tests):
+            try:
+                if parallel:
+                    result, output = futures[i].result()
+                    print(output, end="")
+                else:
+                    result = test_func()
+                result = DemoResult(test_name, bool(result.get('success')),
+                                    result.get('details', {}), result.get('error', ''))
+                if result.success:
+                    print(f"\n✅ {test_name}: 通過")
+                else:
+                    print(f"\n❌ {test_name}: 失敗")
+                    if result.error:
+                        print(f"   錯誤: {result.error}")
+            except Exception as e:
+                print(f"\n💥 {test_name}: 異常 - {e}")
+                result = DemoResult(test_name, False, error=str(e))
+            results.append(result)
     
     # 總結
     print("\n" + "=" * 60)
     print("📊 演示結果總結")
     print("=" * 60)
     
-    for test_name, result in results.items():
-        status = "✅ 通過" if result['success'] else "❌ 失敗"
-        print(f"{status} {test_name}")
+    for result in results:
+        status = "✅ 通過" if result.success else "❌ 失敗"
+        print(f"{status} {result.name}")
     
+    passed = sum(result.success for result in results)
     success_rate = passed / len(tests)
     print(f"\n總計: {passed}/{len(tests)} 測試通過 ({success_rate*100:.1f}%)")
     
@@ -405,4 +468,11 @@ def run_comprehensive_demo():
     return results
 
 if __name__ == "__main__":
-    run_comprehensive_demo()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="USRP B210 ISAC系統完整功能演示")
+    parser.add_argument("--verbose", action="store_true", help="輸出逐Chirp的細節訊息")
+    parser.add_argument("--serial", action="store_true", help="依序執行各測試 (不使用多行程)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format="   %(message)s")
+    run_comprehensive_demo(parallel=not args.serial)
\ No newline at end of file
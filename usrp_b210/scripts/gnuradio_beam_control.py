@@ -85,3 +85,139 @@ class GNURadioBeamController:
         
         logger.propagate = False
         return logger
+    
+    def initialize(self, target_freq=28.0, mode="TX"):
+        """
+        啟動TLKCoreService並設置第一台BBox (簡化自beam_control.BeamDeviceManager)
+        
+        Args:
+            target_freq: 工作頻率 (GHz)，不支援時使用設備的第一個可用頻率
+            mode: BBox RF模式 "TX" 或 "RX"
+            
+        Returns:
+            bool: 是否初始化成功
+        """
+        if not TLKCORE_AVAILABLE:
+            self.logger.warning("TMYTEK庫不可用，無法初始化Beam控制器")
+            return False
+        
+        try:
+            service = TLKCoreService()
+            if not service.running:
+                self.logger.error("TLKCoreService啟動失敗")
+                return False
+            
+            # 掃描並初始化設備，依類型名稱分配BBox與Power Detector
+            ret = service.scanDevices(interface=DevInterface.ALL)
+            if getattr(ret, 'RetCode', None) != RetCode.OK:
+                self.logger.error("設備掃描失敗")
+                return False
+            bbox_sn = pd_sn = None
+            for sn, (addr, devtype, in_dfu) in service.getScanInfo().RetData.items():
+                if in_dfu or service.initDev(sn).RetCode != RetCode.OK:
+                    self.logger.warning(f"設備 {sn} 無法使用，跳過")
+                    continue
+                dev_type = str(getattr(service.getDevTypeName(sn), 'RetData', ''))
+                if "BBox" in dev_type and bbox_sn is None:
+                    bbox_sn = sn
+                elif "PD" in dev_type:
+                    pd_sn = sn
+            if bbox_sn is None:
+                self.logger.error("未發現BBox設備")
+                return False
+            
+            # RF模式 -> 工作頻率 -> 增益範圍
+            rf_mode = RFMode.RX if mode.upper() == "RX" else RFMode.TX
+            ret = service.setRFMode(bbox_sn, rf_mode)
+            if ret.RetCode != RetCode.OK:
+                self.logger.error(f"設置RF模式失敗: {ret.RetMsg}")
+                return False
+            
+            freq_list = getattr(service.getFrequencyList(bbox_sn), 'RetData', None)
+            if not freq_list:
+                self.logger.error(f"無法獲取頻率列表: {bbox_sn}")
+                return False
+            if target_freq not in freq_list:
+                self.logger.warning(f"目標頻率 {target_freq} 不支援，使用 {freq_list[0]}")
+                target_freq = freq_list[0]
+            ret = service.setOperatingFreq(bbox_sn, target_freq)
+            if ret.RetCode != RetCode.OK:
+                self.logger.error(f"設置頻率失敗: {ret.RetMsg}")
+                return False
+            
+            ret = service.getDR(bbox_sn, rf_mode)
+            if ret.RetCode != RetCode.OK:
+                self.logger.error(f"獲取增益範圍失敗: {ret.RetMsg}")
+                return False
+            if len(ret.RetData) > 1:
+                self.gain_max = ret.RetData[1]
+            
+            self.service = service
+            self.bbox_sn = bbox_sn
+            self.pd_sn = pd_sn
+            self.current_mode = rf_mode.name
+            self.is_initialized = True
+            self.logger.info(f"Beam控制器初始化完成: BBox={bbox_sn}, 頻率={target_freq} GHz")
+            return True
+            
+        except Exception:
+            self.logger.exception("Beam控制器初始化失敗")
+            return False
+    
+    def set_beam_angle(self, theta, phi=0):
+        """設定波束角度 (通信鎖只保護硬體呼叫，角度狀態為一般屬性)"""
+        if not self.is_initialized or self.service is None or self.bbox_sn is None:
+            self.logger.warning("系統未初始化或BBox設備不可用，未設置波束角度")
+            return False
+        with self.comm_lock:
+            ret = self.service.setBeamAngle(self.bbox_sn, self.gain_max, theta, phi)
+        if ret.RetCode != RetCode.OK:
+            self.logger.error(f"設置波束角度失敗: {ret.RetMsg}")
+            return False
+        # 遙測讀取只需要最後寫入的值，單一屬性指派在GIL下即為原子操作
+        self.current_theta = theta
+        self.current_phi = phi
+        return True
+    
+    def get_beam_angle(self):
+        """取得目前波束角度 (theta, phi)"""
+        return self.current_theta, self.current_phi
+    
+    def start_scan(self, dwell_time=0.1):
+        """在背景執行緒中來回掃描scan_range，每個角度停留dwell_time秒"""
+        if not self.is_initialized:
+            self.logger.warning("系統未初始化，不啟動波束掃描")
+            return
+        if self.scan_thread is not None and self.scan_thread.is_alive():
+            return
+        self.scan_stop_event.clear()
+        self.scan_enabled = True
+        self.scan_thread = threading.Thread(target=self._scan_loop, args=(dwell_time,),
+                                            name="GNURadioBeamScan", daemon=True)
+        self.scan_thread.start()
+    
+    def stop_scan(self):
+        """停止掃描 (停留計時以Event等待，設定後立即喚醒掃描執行緒)"""
+        self.scan_stop_event.set()
+        if self.scan_thread is not None:
+            self.scan_thread.join()
+            self.scan_thread = None
+        self.scan_enabled = False
+    
+    def _scan_loop(self, dwell_time):
+        """掃描執行緒主迴圈 (例外記錄到日誌，不讓背景執行緒無聲結束)"""
+        try:
+            start, stop = self.scan_range
+            angles = np.arange(start, stop + self.scan_step, self.scan_step).tolist()
+            sweep = angles + angles[-2:0:-1]  # 來回掃描
+            while not self.scan_stop_event.is_set():
+                for theta in sweep:
+                    if not self.set_beam_angle(theta, self.current_phi):
+                        self.logger.error(f"波束角度 {theta}° 設置失敗，停止掃描")
+                        self.scan_enabled = False
+                        return
+                    if self.scan_stop_event.wait(dwell_time):
+                        return
+        except Exception:
+            self.logger.exception("波束掃描執行緒發生錯誤，掃描已停止")
+            self.scan_enabled = False
@@ -104,11 +104,15 @@ def test_basic_tx_rx():
         # 產生測試信號 (簡單正弦波)
         duration = 0.001  # 1ms
         samples = int(duration * sample_rate)
-        t = np.linspace(0, duration, samples, endpoint=False)
-        test_signal = np.exp(1j * 2 * np.pi * 1e6 * t)  # 1MHz正弦波
-        
-        # 轉換為float32格式
-        test_signal = test_signal.astype(np.complex64)
+        # 1MHz正弦波，直接寫入complex64緩衝 (不建立時間軸與複數指數暫存)
+        test_signal = np.empty(samples, dtype=np.complex64)
+        try:
+            from chirp_kernels import cw_tone  # 可選：Numba單次迴圈核心
+            cw_tone(test_signal, sample_rate, 1e6)
+        except ImportError:
+            phase = np.arange(samples) * (2 * np.pi * 1e6 / sample_rate)
+            np.cos(phase, out=test_signal.real)
+            np.sin(phase, out=test_signal.imag)
         
         print("✅ 測試信號產生成功")
         
@@ -9,8 +9,13 @@ USRP B210 硬體診斷腳本
 import sys
 import subprocess
 import os
+import re
+from functools import lru_cache
 from pathlib import Path
 
+USB_DEVICES_DIR = Path("/sys/bus/usb/devices")
+UDEV_RULES_FILE = Path("/etc/udev/rules.d/70-usrp.rules")
+
 def run_command(cmd, sudo=False):
     """執行命令並返回結果"""
     try:
@@ -39,6 +44,18 @@ def run_command(cmd, sudo=False):
             'returncode': -1
         }
 
+@lru_cache(maxsize=None)
+def lsusb():
+    """執行一次lsusb並快取結果 (各項USB檢查共用)"""
+    return run_command("lsusb")
+
+def read_sysfs(path):
+    """直接讀取sysfs屬性檔，不存在或無權限時回傳None"""
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
 def check_uhd_installation():
     """檢查UHD安裝狀態"""
     print("🔍 檢查UHD安裝狀態...")
@@ -56,16 +73,15 @@ def check_udev_rules():
     """檢查UHD udev規則"""
     print("\n🔍 檢查UHD udev規則...")
     
-    # 檢查規則檔案
-    result = run_command("ls -la /etc/udev/rules.d/70-usrp.rules")
-    if result['success']:
+    # 檢查規則檔案 (直接讀取，不另開子行程)
+    if UDEV_RULES_FILE.exists():
         print("✅ UHD udev規則檔案存在")
         
         # 檢查規則內容
-        result = run_command("cat /etc/udev/rules.d/70-usrp.rules")
-        if result['success']:
+        rules = read_sysfs(UDEV_RULES_FILE)
+        if rules is not None:
             print("✅ UHD udev規則內容:")
-            for line in result['stdout'].split('\n'):
+            for line in rules.split('\n'):
                 if 'idVendor' in line and 'idProduct' in line:
                     print(f"   {line.strip()}")
         return True
@@ -78,7 +94,7 @@ def check_usb_devices():
     print("\n🔍 檢查USB設備...")
     
     # 檢查所有USB設備
-    result = run_command("lsusb")
+    result = lsusb()
     if result['success']:
         print("✅ USB設備列表:")
         for line in result['stdout'].split('\n'):
@@ -106,20 +122,23 @@ def check_specific_usrp_ids():
     """檢查特定的USRP設備ID"""
     print("\n🔍 檢查特定USRP設備ID...")
     
-    usrp_ids = [
+    usrp_ids = {
         "2500:0020",  # B200
         "2500:0021",  # B200
         "2500:0022",  # B200
         "3923:7813",  # B200
         "3923:7814"   # B200
-    ]
+    }
     
+    # 以同一次lsusb輸出比對所有ID，取代逐一執行 lsusb -d
     found_any = False
-    for usrp_id in usrp_ids:
-        result = run_command(f"lsusb -d {usrp_id}")
-        if result['success'] and result['stdout'].strip():
-            print(f"✅ 發現USRP設備 {usrp_id}: {result['stdout'].strip()}")
-            found_any = True
+    result = lsusb()
+    if result['success']:
+        for line in result['stdout'].split('\n'):
+            match = re.search(r'ID ([0-9a-fA-F]{4}:[0-9a-fA-F]{4})', line)
+            if match and match.group(1).lower() in usrp_ids:
+                print(f"✅ 發現USRP設備 {match.group(1)}: {line.strip()}")
+                found_any = True
     
     if not found_any:
         print("❌ 未發現任何USRP設備")
@@ -131,28 +150,30 @@ def check_sys_usb_devices():
     """檢查/sys/bus/usb/devices/中的設備"""
     print("\n🔍 檢查系統USB設備詳細資訊...")
     
-    result = run_command("ls /sys/bus/usb/devices/ | grep -v 'usb'")
-    if result['success']:
+    # 直接列出並讀取sysfs (idVendor/idProduct為所有人可讀，不需sudo與子行程)
+    try:
+        devices = sorted(name for name in os.listdir(USB_DEVICES_DIR) if 'usb' not in name)
+    except OSError as e:
+        print(f"❌ 無法讀取 {USB_DEVICES_DIR}: {e}")
+        devices = None
+    
+    if devices is not None:
         print("✅ 系統USB設備:")
-        for device in result['stdout'].split('\n'):
-            if device.strip():
-                print(f"   {device.strip()}")
+        for device in devices:
+            print(f"   {device}")
         
         # 檢查每個設備的vendor和product ID
         print("\n🔍 檢查設備詳細資訊...")
-        for device in result['stdout'].split('\n'):
-            if device.strip() and not device.startswith('usb'):
-                vendor_result = run_command(f"cat /sys/bus/usb/devices/{device}/idVendor 2>/dev/null", sudo=True)
-                product_result = run_command(f"cat /sys/bus/usb/devices/{device}/idProduct 2>/dev/null", sudo=True)
+        for device in devices:
+            vendor_id = read_sysfs(USB_DEVICES_DIR / device / "idVendor")
+            product_id = read_sysfs(USB_DEVICES_DIR / device / "idProduct")
+            
+            if vendor_id is not None and product_id is not None:
+                print(f"   設備 {device}: Vendor={vendor_id}, Product={product_id}")
                 
-                if vendor_result['success'] and product_result['success']:
-                    vendor_id = vendor_result['stdout'].strip()
-                    product_id = product_result['stdout'].strip()
-                    print(f"   設備 {device}: Vendor={vendor_id}, Product={product_id}")
-                    
-                    # 檢查是否是USRP設備
-                    if vendor_id in ['2500', '3923']:
-                        print(f"   🎯 這可能是USRP設備!")
+                # 檢查是否是USRP設備
+                if vendor_id in ['2500', '3923']:
+                    print(f"   🎯 這可能是USRP設備!")
     
     return True
 
@@ -6,9 +6,52 @@
 作者: TMYTEK ISAC Lab
 """
 
+import os
 import sys
 import time
+import functools
 import numpy as np
+from pathlib import Path
+
+# 可選：Numba單次迴圈核心 (未安裝numba時以NumPy產生)
+_scripts_dir = str(Path(__file__).parent.parent / "scripts")
+if _scripts_dir not in sys.path:
+    sys.path.append(_scripts_dir)
+try:
+    from chirp_kernels import cw_tone
+except ImportError:
+    cw_tone = None
+
+# 發射測試只驗證send成功，預設送短burst (--full 時送完整1ms波形)
+SMOKE_TX_DURATION = 50e-6   # 50μs
+FULL_TX_DURATION = 1e-3     # 1ms
+
+@functools.lru_cache(maxsize=8)
+def _make_tone(sample_rate, duration, freq):
+    """產生單頻複數正弦波 (complex64唯讀陣列，相同參數重複使用)"""
+    samples = int(duration * sample_rate)
+    signal = np.empty(samples, dtype=np.complex64)
+    if cw_tone is not None:
+        cw_tone(signal, sample_rate, freq)
+    else:
+        phase = np.arange(samples) * (2 * np.pi * freq / sample_rate)
+        np.cos(phase, out=signal.real)
+        np.sin(phase, out=signal.imag)
+    signal.flags.writeable = False
+    return signal
+
+def _enable_realtime(cpu=None):
+    """將目前執行緒固定在單一CPU並使用SCHED_FIFO排程 (需root或CAP_SYS_NICE，失敗時只警告)"""
+    try:
+        if cpu is None:
+            cpu = max(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cpu})
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(50))
+        print(f"   即時排程已啟用: CPU {cpu}, SCHED_FIFO 50")
+        return True
+    except (AttributeError, OSError) as e:
+        print(f"⚠️  無法啟用即時排程: {e}")
+        return False
 
 def test_uhd_import():
     """測試UHD導入"""
@@ -107,20 +150,22 @@ def test_basic_parameters(usrp):
         print(f"❌ 參數設定失敗: {e}")
         return False
 
-def test_simple_tx_rx(usrp):
+def test_simple_tx_rx(usrp, realtime=False, full=False):
     """測試簡單TX/RX功能"""
     print("\n🔍 測試簡單TX/RX功能...")
     try:
+        if realtime:
+            _enable_realtime()
+        
         # 產生1MHz正弦波
-        duration = 0.001  # 1ms
+        duration = FULL_TX_DURATION if full else SMOKE_TX_DURATION
         sample_rate = usrp.get_tx_rate()
-        samples = int(duration * sample_rate)
-        t = np.linspace(0, duration, samples)
-        signal = np.exp(1j * 2 * np.pi * 1e6 * t)
+        signal = _make_tone(sample_rate, duration, 1e6)
         
         # 設定發射參數
         import uhd  # 重新導入uhd模組
-        stream_args = uhd.usrp.StreamArgs("fc32", "fc32")
+        # 主機端complex64，USB線上以sc16傳輸 (每樣本4位元組，為fc32的一半)
+        stream_args = uhd.usrp.StreamArgs("fc32", "sc16")
         stream_args.channels = [0]
         tx_stream = usrp.get_tx_stream(stream_args)
         
@@ -137,7 +182,7 @@ def test_simple_tx_rx(usrp):
         print(f"❌ TX/RX測試失敗: {e}")
         return False
 
-def main():
+def main(realtime=False, full=False):
     """主函數"""
     print("🚀 快速USRP B210測試開始")
     print("=" * 50)
@@ -166,7 +211,7 @@ def main():
         return False
     
     # 測試簡單TX/RX
-    if not test_simple_tx_rx(usrp):
+    if not test_simple_tx_rx(usrp, realtime, full):
         print("❌ TX/RX功能測試失敗")
         return False
     
@@ -177,7 +222,14 @@ def main():
     return True
 
 if __name__ == "__main__":
-    success = main()
+    import argparse
+    parser = argparse.ArgumentParser(description="快速USRP B210測試")
+    parser.add_argument("--realtime", action="store_true",
+                        help="發射前固定CPU並使用SCHED_FIFO排程")
+    parser.add_argument("--full", action="store_true",
+                        help="發射測試送完整1ms波形 (預設為短burst)")
+    args = parser.parse_args()
+    success = main(realtime=args.realtime, full=args.full)
     if not success:
         print("\n💡 建議:")
         print("   1. 檢查USB連接")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ChirpISAC Block 迴歸測試 (純軟體，不需要硬體)
+作者: TMYTEK ISAC Lab
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+_scripts_dir = str(Path(__file__).parent.parent / "scripts")
+if _scripts_dir not in sys.path:
+    sys.path.append(_scripts_dir)
+
+import chirp_isac_block
+from chirp_generator import ChirpGenerator
+from chirp_isac_block import ChirpISACProcessor, ChirpISACSource, ChirpPacket
+
+def test_chirp_packet_is_dict_compatible():
+    """generate_next_chirp()的回傳值可當作dict使用"""
+    source = ChirpISACSource(mode="radar")
+    chirp = source.generate_next_chirp()
+
+    assert 'signal' in chirp
+    assert 'time' not in chirp
+    assert chirp.get('time') is None
+    assert set(dict(chirp)) >= {'signal', 'parameters'}
+    assert len(chirp['signal']) == chirp.n_samples
+    assert chirp.as_dict() == dict(chirp)
+    assert chirp == dict(chirp)
+
+    analysis = ChirpGenerator().analyze_chirp(chirp)
+    assert analysis['time_domain']['power'] > 0
+
+def test_chirp_packet_equality():
+    """ChirpPacket以內容比較 (含陣列欄位也不會拋出例外)"""
+    packet = ChirpPacket(np.zeros(4, np.complex64), {}, 4)
+    assert packet == ChirpPacket(np.zeros(4, np.complex64), {}, 4)
+    assert packet != ChirpPacket(np.ones(4, np.complex64), {}, 4)
+
+def test_recent_input_excludes_zero_padding():
+    """輸入緩衝未填滿時只回傳已寫入的樣本，填滿後回傳最新的樣本"""
+    processor = ChirpISACProcessor()
+    assert len(processor.get_recent_input()) == 0
+
+    samples = np.arange(1, 301, dtype=np.complex64)
+    processor._append_input(samples)
+    np.testing.assert_array_equal(processor.get_recent_input(), samples)
+
+    size = len(processor.input_buffer)
+    processor._append_input(np.arange(size, dtype=np.complex64))
+    recent = processor.get_recent_input()
+    assert len(recent) == size
+    assert recent[-1] == size - 1
+
+def test_hybrid_mode_time_division_ratio(monkeypatch):
+    """混合模式依時間分配時槽：每100ms週期雷達70%、通訊30%"""
+    clock = iter(np.arange(0, 1, 1e-3))  # 每次取樣前進1ms
+    monkeypatch.setattr(chirp_isac_block.time, "monotonic", lambda: next(clock))
+    source = ChirpISACSource(mode="hybrid")
+    source._start_tick = 0.0
+    source.add_data_to_send([1, 0] * 100)
+
+    for _ in range(200):
+        source.generate_next_chirp()
+
+    assert source.stats['beam_scans'] == 140
+    assert source.stats['data_bits_sent'] == 60
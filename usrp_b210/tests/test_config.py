@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+B210配置迴歸測試 (純軟體，不需要硬體)
+作者: TMYTEK ISAC Lab
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+_config_dir = str(Path(__file__).parent.parent / "config")
+if _config_dir not in sys.path:
+    sys.path.append(_config_dir)
+
+from b210_config import B210ISACConfig
+import b210_config
+import hardware_verified_config
+
+def test_params_refresh_after_field_edit():
+    """修改配置欄位後，衍生值、參數物件與驗證結果隨之更新"""
+    config = B210ISACConfig()
+    samples = config.get_chirp_params().samples
+    assert config.validate_config()['valid']
+
+    config.chirp_duration *= 2
+    assert config.chirp_samples == 2 * samples
+    assert config.get_chirp_params().samples == 2 * samples
+    assert len(config.get_chirp_waveform()) == 2 * samples
+
+    config.sample_rate = config.max_sample_rate * 2
+    assert not config.validate_config()['valid']
+
+def test_transport_edit_refreshes_uhd_args():
+    """修改傳輸參數後，UHD device_args隨之更新"""
+    config = B210ISACConfig()
+    config.num_recv_frames = 512
+    assert "num_recv_frames=512" in config.uhd_args['device_args']
+
+def test_socket_buffers_reach_device_args():
+    """socket緩衝以recv/send_buff_size傳入UHD device_args"""
+    config = B210ISACConfig()
+    config.socket_rmem = 1 << 20
+    device_args = config.uhd_args['device_args']
+    assert f"recv_buff_size={1 << 20}" in device_args
+    assert f"send_buff_size={config.socket_wmem}" in device_args
+
+@pytest.mark.parametrize("module", [b210_config, hardware_verified_config])
+def test_get_config_instances(module):
+    """get_config()預設回傳新實例，shared=True才共用"""
+    config = module.get_config()
+    config.range_bins = 7
+    assert module.get_config() is not config
+    assert module.get_config().range_bins != 7
+    assert module.get_config(shared=True) is module.get_config(shared=True)
+    assert module.CONFIG is module.get_config(shared=True)
+
+def test_grouped_params_are_read_only_views():
+    """分組參數為唯讀視圖，修改需透過配置屬性"""
+    config = hardware_verified_config.HardwareVerifiedConfig()
+    with pytest.raises(TypeError):
+        config.radar_params['range_bins'] = 7
+
+    config.range_bins = 7
+    assert config.radar_params['range_bins'] == 7
+
+def test_gain_and_range_limits_follow_field_edits():
+    """安全增益與距離解析度隨硬體上限與頻寬更新"""
+    config = hardware_verified_config.HardwareVerifiedConfig()
+    config.max_tx_gain = 10
+    assert config.get_usrp_params().tx_gain == 10
+    assert config.current_config['tx_gain'] == 10
+
+    config.chirp_bandwidth = 10e6
+    assert config.range_resolution == pytest.approx(15.0)
+    assert config.max_range == pytest.approx(15.0 * config.range_bins)
+    assert config.get_radar_params().range_resolution == pytest.approx(15.0)
@@ -5,9 +5,41 @@
 檢查Linux環境中的UHD、GNU Radio和Python套件
 """
 
+import re
 import sys
 import subprocess
 import importlib
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+
+# === 外部命令 (同時啟動，各檢查共用同一次執行結果) ===
+_COMMANDS = {
+    'uhd_usrp_probe': (['uhd_usrp_probe'], 15),
+    'gnuradio-companion': (['gnuradio-companion', '--version'], 10),
+}
+_command_futures = {}
+
+# uhd_usrp_probe輸出中關注的行 (依序判斷：B200/B210、設備類型、序列號)
+_PROBE_LINE_RE = re.compile(
+    r'^(?:(?P<b210>.*B2[01]0).*'
+    r'|(?P<type>.*Device.*type.*|.*type.*Device.*)'
+    r'|(?P<serial>.*Serial.*))$',
+    re.MULTILINE)
+
+def _start_commands():
+    """同時啟動所有外部命令 (多半在等待裝置探測，重疊執行縮短總時間)"""
+    executor = ThreadPoolExecutor(max_workers=len(_COMMANDS))
+    for name, (cmd, timeout) in _COMMANDS.items():
+        if name not in _command_futures:
+            _command_futures[name] = executor.submit(
+                subprocess.run, cmd, capture_output=True, text=True, timeout=timeout)
+    executor.shutdown(wait=False)
+
+def _run_command(name):
+    """取得命令執行結果 (FileNotFoundError/TimeoutExpired在此拋出)"""
+    if name not in _command_futures:
+        _start_commands()
+    return _command_futures[name].result()
 
 def check_python_version():
     """檢查Python版本"""
@@ -27,12 +59,11 @@ def check_uhd_installation():
     
     # 檢查UHD命令列工具
     try:
-        result = subprocess.run(['uhd_usrp_probe'], 
-                              capture_output=True, text=True, timeout=10)
+        result = _run_command('uhd_usrp_probe')
         if result.returncode == 0:
             print("✅ UHD命令列工具可用")
             print("   輸出預覽:")
-            for line in result.stdout.split('\n')[:5]:
+            for line in islice(result.stdout.splitlines(), 5):
                 if line.strip():
                     print(f"   {line}")
         else:
@@ -68,12 +99,11 @@ def check_gnuradio_installation():
     
     # 檢查GNU Radio命令列工具
     try:
-        result = subprocess.run(['gnuradio-companion', '--version'], 
-                              capture_output=True, text=True, timeout=10)
+        result = _run_command('gnuradio-companion')
         if result.returncode == 0:
             print("✅ GNU Radio Companion可用")
             print("   輸出預覽:")
-            for line in result.stdout.split('\n')[:3]:
+            for line in islice(result.stdout.splitlines(), 3):
                 if line.strip():
                     print(f"   {line}")
         else:
@@ -122,11 +152,16 @@ def check_python_packages():
         'rich'
     ]
     
+    # 同時匯入所有套件 (載入共享函式庫時會釋放GIL)，再依原順序回報
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        imports = {package: executor.submit(importlib.import_module, package)
+                   for package in required_packages + optional_packages}
+    
     print("必要套件:")
     required_ok = True
     for package in required_packages:
         try:
-            module = importlib.import_module(package)
+            module = imports[package].result()
             version = getattr(module, '__version__', '未知')
             print(f"   ✅ {package}: {version}")
         except ImportError:
@@ -136,7 +171,7 @@ def check_python_packages():
     print("\n可選套件:")
     for package in optional_packages:
         try:
-            module = importlib.import_module(package)
+            module = imports[package].result()
             version = getattr(module, '__version__', '未知')
             print(f"   ✅ {package}: {version}")
         except ImportError:
@@ -149,24 +184,23 @@ def check_usrp_devices():
     print("\n=== USRP設備檢查 ===")
     
     try:
-        result = subprocess.run(['uhd_usrp_probe'], 
-                              capture_output=True, text=True, timeout=15)
+        result = _run_command('uhd_usrp_probe')  # 與UHD安裝檢查共用同一次探測
         
         if result.returncode == 0:
             print("✅ USRP設備檢測成功")
             
-            # 分析輸出找到設備信息
-            output_lines = result.stdout.split('\n')
+            # 分析輸出找到設備信息 (單次掃描，只處理相關行)
             device_found = False
             
-            for line in output_lines:
-                if 'B200' in line or 'B210' in line:
-                    print(f"   🎯 找到B200/B210設備: {line.strip()}")
+            for match in _PROBE_LINE_RE.finditer(result.stdout):
+                line = match.group().strip()
+                if match.lastgroup == 'b210':
+                    print(f"   🎯 找到B200/B210設備: {line}")
                     device_found = True
-                elif 'Device' in line and 'type' in line:
-                    print(f"   設備類型: {line.strip()}")
-                elif 'Serial' in line:
-                    print(f"   序列號: {line.strip()}")
+                elif match.lastgroup == 'type':
+                    print(f"   設備類型: {line}")
+                else:
+                    print(f"   序列號: {line}")
             
             if not device_found:
                 print("   ⚠️  未檢測到B200/B210設備")
@@ -187,6 +221,8 @@ def main():
     print("🔍 USRP B210 ISAC 系統環境檢查")
     print("=" * 50)
     
+    _start_commands()
+    
     checks = [
         ("Python版本", check_python_version),
         ("UHD安裝", check_uhd_installation),
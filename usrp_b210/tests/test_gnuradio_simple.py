@@ -7,18 +7,18 @@
 """
 
 import sys
-import numpy as np
+from pathlib import Path
 
 def test_gnuradio_import():
     """測試GNU Radio導入"""
     print("🔍 測試GNU Radio導入...")
     
     try:
-        # 添加正確的GNU Radio路徑
-        sys.path.extend([
-            "/usr/local/lib/python3.10/dist-packages",
-            "/usr/lib/python3/dist-packages/gnuradio"
-        ])
+        # 添加正確的GNU Radio路徑 (已存在的不重複加入)
+        for path in ("/usr/local/lib/python3.10/dist-packages",
+                     "/usr/lib/python3/dist-packages/gnuradio"):
+            if path not in sys.path:
+                sys.path.append(path)
         
         from gnuradio import gr
         print("✅ gnuradio.gr模組載入成功")
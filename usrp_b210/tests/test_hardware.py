@@ -6,28 +6,123 @@ USRP B210 硬體功能驗證測試腳本
 作者: TMYTEK ISAC Lab
 """
 
-import uhd
 import numpy as np
+import os
 import time
 import sys
+import functools
 from pathlib import Path
 
+# 可選：Numba單次迴圈核心 (未安裝numba時以NumPy產生)
+_scripts_dir = str(Path(__file__).parent.parent / "scripts")
+if _scripts_dir not in sys.path:
+    sys.path.append(_scripts_dir)
+try:
+    from chirp_kernels import cw_tone, linear_chirp
+except ImportError:
+    cw_tone = linear_chirp = None
+
+# 發射測試只驗證send成功，預設送短burst (--full 時送完整1ms波形)
+SMOKE_TX_DURATION = 50e-6   # 50μs
+FULL_TX_DURATION = 1e-3     # 1ms
+
+@functools.cache
+def _import_uhd():
+    """延遲匯入UHD (載入共享函式庫較慢，只在實際操作設備時匯入)"""
+    import uhd
+    return uhd
+
+# FFT後端：scipy.fft可多執行緒，否則使用numpy
+try:
+    import scipy.fft as _fft
+    _FFT_KWARGS = {'workers': -1}
+    _next_fast_len = _fft.next_fast_len
+except ImportError:
+    _fft = np.fft
+    _FFT_KWARGS = {}
+    
+    def _next_fast_len(n):
+        """numpy不補零，維持原長度"""
+        return n
+
+# === 測試信號 (只由參數決定，重複測試時共用同一份唯讀complex64陣列) ===
+@functools.lru_cache(maxsize=8)
+def _make_tone(sample_rate, duration, freq):
+    """產生單頻複數正弦波"""
+    samples = int(duration * sample_rate)
+    signal = np.empty(samples, dtype=np.complex64)
+    if cw_tone is not None:
+        cw_tone(signal, sample_rate, freq)
+    else:
+        phase = np.arange(samples) * (2 * np.pi * freq / sample_rate)
+        np.cos(phase, out=signal.real)
+        np.sin(phase, out=signal.imag)
+    signal.flags.writeable = False
+    return signal
+
+@functools.lru_cache(maxsize=8)
+def _make_chirp(sample_rate, duration, bandwidth, start_freq=0.0):
+    """產生線性調頻Chirp信號"""
+    samples = int(duration * sample_rate)
+    k = bandwidth / duration
+    signal = np.empty(samples, dtype=np.complex64)
+    if linear_chirp is not None:
+        linear_chirp(signal, sample_rate, start_freq, k)
+    else:
+        # Horner形式原地計算 φ = 2πt(f0 + k·t/2)，除時間軸外不產生暫存陣列
+        t = np.arange(samples) / sample_rate
+        phase = t * (0.5 * k)
+        phase += start_freq
+        phase *= t
+        phase *= 2 * np.pi
+        np.cos(phase, out=signal.real)
+        np.sin(phase, out=signal.imag)
+    signal.flags.writeable = False
+    return signal
+
+def _enable_realtime(cpu=None):
+    """將目前執行緒固定在單一CPU並使用SCHED_FIFO排程 (需root或CAP_SYS_NICE，失敗時只警告)"""
+    try:
+        if cpu is None:
+            cpu = max(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cpu})
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(50))
+        print(f"   即時排程已啟用: CPU {cpu}, SCHED_FIFO 50")
+        return True
+    except (AttributeError, OSError) as e:
+        print(f"⚠️  無法啟用即時排程: {e}")
+        return False
+
 class B210HardwareTest:
     """B210硬體功能測試類別"""
     
-    def __init__(self):
+    def __init__(self, realtime=False, full=False):
         self.usrp = None
+        self.full = full             # 發射測試是否送完整波形
+        self.realtime = realtime     # 發射前固定CPU並提高排程優先權 (降低串流抖動)
         self.test_results = {}
         self.sample_rate = 30e6      # 30 Msps
         self.center_freq = 2e9       # 2 GHz IF
         self.bandwidth = 20e6        # 20 MHz
+        self._tx_stream = None       # TX串流 (建立時需設定FPGA與DMA，各測試共用)
         
+    def _get_tx_stream(self):
+        """取得TX串流 (第一次使用時建立)"""
+        if self._tx_stream is None:
+            if self.realtime:
+                _enable_realtime()
+            # 主機端complex64，USB線上以sc16傳輸 (每樣本4位元組，為fc32的一半)
+            stream_args = _import_uhd().usrp.StreamArgs("fc32", "sc16")
+            stream_args.channels = [0]
+            self._tx_stream = self.usrp.get_tx_stream(stream_args)
+        return self._tx_stream
+    
     def test_device_connection(self):
         """測試設備連接"""
         print("=== 測試1: 設備連接 ===")
         try:
             # 嘗試連接B210
-            self.usrp = uhd.usrp.MultiUSRP("type=b200")
+            self.usrp = _import_uhd().usrp.MultiUSRP("type=b200")
             print(f"✅ 成功連接USRP設備")
             print(f"   設備類型: {self.usrp.get_pp_string()}")
             print(f"   序列號: {self.usrp.get_serial()}")
@@ -81,18 +176,14 @@ class B210HardwareTest:
         print("\n=== 測試3: 簡單信號傳輸 ===")
         try:
             # 產生1MHz正弦波
-            duration = 0.001  # 1ms
-            samples = int(duration * self.sample_rate)
-            t = np.linspace(0, duration, samples)
-            signal = np.exp(1j * 2 * np.pi * 1e6 * t)
+            duration = FULL_TX_DURATION if self.full else SMOKE_TX_DURATION
+            signal = _make_tone(self.sample_rate, duration, 1e6)
             
-            # 設定發射參數
-            stream_args = uhd.usrp.StreamArgs("fc32", "fc32")
-            stream_args.channels = [0]
-            tx_stream = self.usrp.get_tx_stream(stream_args)
+            # 取得發射串流
+            tx_stream = self._get_tx_stream()
             
             # 發射信號
-            tx_metadata = uhd.types.TXMetadata()
+            tx_metadata = _import_uhd().types.TXMetadata()
             tx_metadata.start_of_burst = True
             tx_metadata.end_of_burst = True
             
@@ -100,7 +191,7 @@ class B210HardwareTest:
             print(f"✅ 信號發射成功")
             print(f"   信號長度: {len(signal)} 樣本")
             print(f"   信號頻率: 1 MHz")
-            print(f"   發射時間: {duration*1000:.1f} ms")
+            print(f"   發射時間: {duration*1000:.2f} ms")
             
             return True
         except Exception as e:
@@ -116,14 +207,10 @@ class B210HardwareTest:
             start_freq = 0                # 相對於載波
             stop_freq = self.bandwidth    # 20 MHz
             
-            # 產生Chirp信號
-            samples = int(chirp_duration * self.sample_rate)
-            t = np.linspace(0, chirp_duration, samples)
-            
-            # 線性調頻
+            # 產生線性調頻Chirp信號
             k = (stop_freq - start_freq) / chirp_duration
-            phase = 2 * np.pi * (start_freq * t + 0.5 * k * t**2)
-            chirp_signal = np.exp(1j * phase)
+            chirp_signal = _make_chirp(self.sample_rate, chirp_duration,
+                                       stop_freq - start_freq, start_freq)
             
             print(f"✅ Chirp信號產生成功")
             print(f"   信號長度: {len(chirp_signal)} 樣本")
@@ -134,7 +221,7 @@ class B210HardwareTest:
             # 儲存信號供後續分析
             output_dir = Path("test_signals")
             output_dir.mkdir(exist_ok=True)
-            np.save(output_dir / "chirp_signal.npy", chirp_signal)
+            np.save(output_dir / "chirp_signal.npy", chirp_signal, allow_pickle=False)
             print(f"   信號已儲存至: {output_dir / 'chirp_signal.npy'}")
             
             return True
@@ -148,31 +235,31 @@ class B210HardwareTest:
         try:
             # 產生測試信號
             duration = 0.001  # 1ms
-            samples = int(duration * self.sample_rate)
-            t = np.linspace(0, duration, samples)
             
-            # 多頻率信號
-            signal = (np.exp(1j * 2 * np.pi * 1e6 * t) + 
-                     np.exp(1j * 2 * np.pi * 5e6 * t) +
-                     np.exp(1j * 2 * np.pi * 10e6 * t))
+            # 多頻率信號 (三個快取的單頻信號相加)
+            signal = _make_tone(self.sample_rate, duration, 1e6) + _make_tone(self.sample_rate, duration, 5e6)
+            signal += _make_tone(self.sample_rate, duration, 10e6)
             
             # 頻譜分析
-            fft_signal = np.fft.fft(signal)
-            freqs = np.fft.fftfreq(len(signal), 1/self.sample_rate)
+            n_fft = _next_fast_len(len(signal))
+            fft_signal = _fft.fft(signal, n_fft, **_FFT_KWARGS)
+            freqs = _fft.fftfreq(n_fft, 1/self.sample_rate)
             
-            # 找到峰值頻率
-            peak_idx = np.argmax(np.abs(fft_signal))
+            # 找到峰值頻率 (比較功率即可，不需開根號)
+            power = fft_signal.real * fft_signal.real
+            power += fft_signal.imag * fft_signal.imag
+            peak_idx = np.argmax(power)
             peak_freq = freqs[peak_idx]
             
             print(f"✅ 信號品質分析成功")
             print(f"   信號長度: {len(signal)} 樣本")
             print(f"   峰值頻率: {peak_freq/1e6:.1f} MHz")
-            print(f"   頻譜解析度: {self.sample_rate/len(signal)/1e3:.1f} kHz")
+            print(f"   頻譜解析度: {self.sample_rate/n_fft/1e3:.1f} kHz")
             
-            # 儲存頻譜數據
+            # 儲存頻譜數據 (原始.npy格式，後續分析可用 np.load(mmap_mode='r') 直接映射)
             output_dir = Path("test_signals")
-            np.save(output_dir / "spectrum_freqs.npy", freqs)
-            np.save(output_dir / "spectrum_data.npy", fft_signal)
+            np.save(output_dir / "spectrum_freqs.npy", freqs, allow_pickle=False)
+            np.save(output_dir / "spectrum_data.npy", fft_signal, allow_pickle=False)
             print(f"   頻譜數據已儲存")
             
             return True
@@ -247,13 +334,21 @@ class B210HardwareTest:
 
 def main():
     """主函數"""
+    import argparse
+    parser = argparse.ArgumentParser(description="USRP B210 硬體功能驗證測試")
+    parser.add_argument("--realtime", action="store_true",
+                        help="發射前固定CPU並使用SCHED_FIFO排程")
+    parser.add_argument("--full", action="store_true",
+                        help="發射測試送完整1ms波形 (預設為短burst)")
+    args = parser.parse_args()
+    
     print("USRP B210 硬體功能驗證測試")
     print("測試環境: Linux + UHD 4.8 + GNU Radio + Python 3.10.12")
     print("=" * 60)
     
     # 檢查UHD版本
     try:
-        uhd_version = uhd.__version__
+        uhd_version = _import_uhd().__version__
         print(f"UHD版本: {uhd_version}")
     except:
         print("UHD版本: 未知")
@@ -262,7 +357,7 @@ def main():
     print(f"Python版本: {sys.version}")
     
     # 執行測試
-    tester = B210HardwareTest()
+    tester = B210HardwareTest(realtime=args.realtime, full=args.full)
     success = tester.run_all_tests()
     
     if success:
@@ -6,62 +6,101 @@ Compatible with GNU Radio 3.10 + UHD 4.8
 Author: TMYTEK ISAC Lab
 """
 
+import functools
+from dataclasses import dataclass, field
+
 import numpy as np
 
+# ==== 星座圖與子載波索引 (依參數快取，回傳唯讀陣列) ====
+_QAM_ORDER = {"qam16": 4, "qam64": 8}
+
+@functools.lru_cache(maxsize=None)
+def _constellation(modulation):
+    """依調變方式產生complex64星座圖點 (實部為外層、虛部為內層順序)"""
+    if modulation == "qpsk":
+        points = np.array([1+1j, -1+1j, 1-1j, -1-1j], dtype=np.complex64)
+    elif modulation in _QAM_ORDER:
+        m = _QAM_ORDER[modulation]
+        levels = np.arange(-(m - 1), m, 2, dtype=np.float32)
+        points = (levels[:, None] + 1j * levels[None, :]).astype(np.complex64).ravel()
+    else:
+        raise ValueError(f"不支援的調變方式: {modulation}")
+    points.flags.writeable = False
+    return points
+
+@functools.lru_cache(maxsize=None)
+def _occupied_carrier_indices(n_carriers):
+    """-n/2 ~ n/2 的子載波索引 (不含DC)"""
+    indices = np.arange(-n_carriers//2, n_carriers//2 + 1)
+    indices = indices[indices != 0]
+    indices.flags.writeable = False
+    return indices
+
 # ==== 基本系統參數 ====
+@dataclass(slots=True, eq=False)  # 含numpy陣列欄位，維持以物件身分比較
 class OFDMConfig:
-    def __init__(self):
-        # 採樣率與頻率
-        self.sample_rate = 30.72e6      # 30.72 Msps (LTE numerology)
-        self.center_freq = 2.0e9        # 2 GHz IF (USRP)
-        self.rf_freq = 28.0e9           # 28 GHz RF (via UDB)
-        
-        # OFDM參數
-        self.fft_len = 2048             # FFT size
-        self.cp_len = 144               # CP length (1/14 ≈ 7%)
-        self.occupied_carriers = 1200   # 實際使用的子載波
-        self.pilot_carriers = ()        # 導頻子載波位置（稍後定義）
-        self.pilot_symbols = ()         # 導頻符號
-        
-        # 子載波分配
-        self.subcarrier_spacing = self.sample_rate / self.fft_len  # 15 kHz
-        self.bandwidth = self.occupied_carriers * self.subcarrier_spacing  # ~18 MHz
-        
-        # 調變參數
-        self.modulation = "qam16"       # qpsk, qam16, qam64
-        self.constellation = self._get_constellation()
-        
-        # 同步參數
-        self.sync_word1 = [1, 1, 1, 1, 1, 1, -1, -1, -1, -1, -1, -1, 1, 1, 1, 1]  # Schmidl-Cox
-        self.sync_word2 = [1, 1, -1, -1, 1, 1, -1, -1, 1, 1, -1, -1, 1, 1, -1, -1] # Frame sync
-        
-        # 導頻設計
-        self.pilot_carriers = tuple(range(-600, 601, 50))  # 每50個子載波一個導頻
-        self.pilot_symbols = tuple([1, 1, 1, -1] * (len(self.pilot_carriers)//4 + 1))[:len(self.pilot_carriers)]
-        
-        # USRP參數
-        self.usrp_device_args = ""      # 空字串使用預設
-        self.usrp_tx_gain = 20.0        # dB
-        self.usrp_rx_gain = 20.0        # dB
-        self.usrp_tx_antenna = "TX/RX"
-        self.usrp_rx_antenna = "RX2"
-        
-        # 除錯參數
-        self.enable_file_sink = True    # 是否儲存中間資料
-        self.file_sink_path = "./debug_data/"
-        
+    """OFDM參數 (slots版面；衍生值以property計算，修改基本參數後保持一致)"""
+    
+    # 採樣率與頻率
+    sample_rate: float = 30.72e6      # 30.72 Msps (LTE numerology)
+    center_freq: float = 2.0e9        # 2 GHz IF (USRP)
+    rf_freq: float = 28.0e9           # 28 GHz RF (via UDB)
+    
+    # OFDM參數
+    fft_len: int = 2048               # FFT size
+    cp_len: int = 144                 # CP length (1/14 ≈ 7%)
+    occupied_carriers: int = 1200     # 實際使用的子載波
+    
+    # 調變參數
+    modulation: str = "qam16"         # qpsk, qam16, qam64
+    
+    # 同步參數
+    sync_word1: np.ndarray = field(default_factory=lambda: np.array(
+        [1, 1, 1, 1, 1, 1, -1, -1, -1, -1, -1, -1, 1, 1, 1, 1], dtype=np.int8))   # Schmidl-Cox
+    sync_word2: np.ndarray = field(default_factory=lambda: np.array(
+        [1, 1, -1, -1, 1, 1, -1, -1, 1, 1, -1, -1, 1, 1, -1, -1], dtype=np.int8))  # Frame sync
+    
+    # 導頻設計
+    pilot_carriers: tuple = tuple(range(-600, 601, 50))  # 每50個子載波一個導頻
+    pilot_symbols: np.ndarray = field(init=False)        # 導頻符號 (依導頻數產生)
+    
+    # USRP參數
+    usrp_device_args: str = ""        # 空字串使用預設
+    usrp_tx_gain: float = 20.0        # dB
+    usrp_rx_gain: float = 20.0        # dB
+    usrp_tx_antenna: str = "TX/RX"
+    usrp_rx_antenna: str = "RX2"
+    
+    # 除錯參數
+    enable_file_sink: bool = True     # 是否儲存中間資料
+    file_sink_path: str = "./debug_data/"
+    
+    def __post_init__(self):
+        self.pilot_symbols = np.resize(np.array([1, 1, 1, -1], dtype=np.complex64), len(self.pilot_carriers))
+    
+    # === 衍生參數 ===
+    @property
+    def subcarrier_spacing(self):
+        """子載波間距 (15 kHz)"""
+        return self.sample_rate / self.fft_len
+    
+    @property
+    def bandwidth(self):
+        """佔用頻寬 (~18 MHz)"""
+        return self.occupied_carriers * self.subcarrier_spacing
+    
+    @property
+    def constellation(self):
+        """目前調變方式的星座圖點"""
+        return _constellation(self.modulation)
+    
     def _get_constellation(self):
-        """取得星座圖點"""
-        if self.modulation == "qpsk":
-            return [1+1j, -1+1j, 1-1j, -1-1j]
-        elif self.modulation == "qam16":
-            return [complex(real, imag) for real in [-3, -1, 1, 3] 
-                   for imag in [-3, -1, 1, 3]]
-        elif self.modulation == "qam64":
-            return [complex(real, imag) for real in [-7, -5, -3, -1, 1, 3, 5, 7] 
-                   for imag in [-7, -5, -3, -1, 1, 3, 5, 7]]
-        else:
-            raise ValueError(f"不支援的調變方式: {self.modulation}")
+        """取得星座圖點 (complex64陣列，同一調變方式共用)"""
+        return _constellation(self.modulation)
+    
+    def get_constellation(self):
+        """取得目前調變方式的星座圖點"""
+        return _constellation(self.modulation)
     
     def get_packet_length_tag_key(self):
         """取得封包長度標籤鍵值"""
@@ -73,10 +112,8 @@ class OFDMConfig:
     
     def get_occupied_carriers(self):
         """取得佔用的子載波索引"""
-        # 避開DC與邊緣子載波
-        occupied = list(range(-self.occupied_carriers//2, self.occupied_carriers//2 + 1))
-        occupied.remove(0)  # 移除DC
-        return tuple(occupied)
+        # 避開DC與邊緣子載波 (依子載波數快取)
+        return _occupied_carrier_indices(self.occupied_carriers)
     
     def print_config(self):
         """印出配置摘要"""
@@ -94,27 +131,29 @@ class OFDMConfig:
         print("============================")
 
 # ==== TDM-ISAC 參數 ====
+@dataclass(slots=True)
 class TDMConfig:
-    def __init__(self):
-        # 時框參數
-        self.frame_duration_ms = 10.0    # 10ms frame
-        self.radar_duration_ms = 2.0     # 2ms radar slot  
-        self.comms_duration_ms = 7.85    # 7.85ms comms slot
-        self.guard_duration_us = 50.0    # 50μs guard time
-        
-        # 波束掃描參數
-        self.n_beams = 9                 # 波束數量
-        self.azimuth_range = [-45, 45]   # 掃描角度範圍
-        self.beam_dwell_us = 180.0       # 每個beam的停留時間
-        self.beam_settle_us = 30.0       # beam切換穩定時間
-        
-        # 雷達參數
-        self.prf_hz = 5000              # 脈衝重複頻率
-        self.range_bins = 1024          # 距離bins
-        self.doppler_bins = 128         # 都卜勒bins
-        self.cfar_guard = [2, 2]        # CFAR保護cell
-        self.cfar_training = [8, 8]     # CFAR訓練cell
-        self.cfar_pfa = 1e-3            # 虛警機率
+    """TDM-ISAC時框、波束掃描與雷達參數"""
+    
+    # 時框參數
+    frame_duration_ms: float = 10.0    # 10ms frame
+    radar_duration_ms: float = 2.0     # 2ms radar slot  
+    comms_duration_ms: float = 7.85    # 7.85ms comms slot
+    guard_duration_us: float = 50.0    # 50μs guard time
+    
+    # 波束掃描參數
+    n_beams: int = 9                   # 波束數量
+    azimuth_range: list = field(default_factory=lambda: [-45, 45])  # 掃描角度範圍
+    beam_dwell_us: float = 180.0       # 每個beam的停留時間
+    beam_settle_us: float = 30.0       # beam切換穩定時間
+    
+    # 雷達參數
+    prf_hz: int = 5000                 # 脈衝重複頻率
+    range_bins: int = 1024             # 距離bins
+    doppler_bins: int = 128            # 都卜勒bins
+    cfar_guard: list = field(default_factory=lambda: [2, 2])      # CFAR保護cell
+    cfar_training: list = field(default_factory=lambda: [8, 8])   # CFAR訓練cell
+    cfar_pfa: float = 1e-3             # 虛警機率
 
 # ==== 使用範例 ====
 if __name__ == "__main__":